@@ -2,7 +2,8 @@
 Analysis module for DataCL project.
 
 This module provides a complete set of analysis functions for the exports dataset:
-- Data loading with schema enforcement
+- Data loading with schema enforcement, pinned to versioned snapshots
+- Star-schema (integer-keyed) fact table support
 - KPI calculations
 - Top N rankings
 - Filtering functions
@@ -11,6 +12,7 @@ This module provides a complete set of analysis functions for the exports datase
 
 from .loader import (
     load_data,
+    get_loaded_snapshot,
     get_unique_values,
     get_years,
     get_countries,
@@ -19,6 +21,16 @@ from .loader import (
     get_seasons,
 )
 
+from .snapshots import (
+    list_snapshots,
+)
+
+from .star import (
+    load_star_data,
+    load_dimension,
+    decode_dimensions,
+)
+
 from .kpis import (
     get_total_boxes,
     get_total_kilos,
@@ -59,12 +71,19 @@ from .timeseries import (
 __all__ = [
     # Loader
     "load_data",
+    "get_loaded_snapshot",
     "get_unique_values",
     "get_years",
     "get_countries",
     "get_products",
     "get_exporters",
     "get_seasons",
+    # Snapshots
+    "list_snapshots",
+    # Star schema
+    "load_star_data",
+    "load_dimension",
+    "decode_dimensions",
     # KPIs
     "get_total_boxes",
     "get_total_kilos",
@@ -7,22 +7,27 @@ This module provides functions to filter the dataset by:
 - Exporter
 - Product
 - Season
+
+Filters keep the input type: a LazyFrame (load_data(lazy=True)) stays lazy,
+so the predicate is pushed down to the Parquet reader when it is collected.
 """
 
 from typing import Optional
 import polars as pl
+from .star import dimension_filter
+from .utils import FrameLike
 
 
-def filter_by_year(df: pl.DataFrame, year: int) -> pl.DataFrame:
+def filter_by_year(df: FrameLike, year: int) -> FrameLike:
     """
     Filter dataset by a specific year.
     
     Args:
-        df: Input DataFrame
+        df: Input DataFrame or LazyFrame
         year: Year to filter
     
     Returns:
-        Filtered DataFrame
+        Filtered DataFrame (LazyFrame if df is lazy)
     
     Example:
         >>> df = load_data()
@@ -33,17 +38,17 @@ def filter_by_year(df: pl.DataFrame, year: int) -> pl.DataFrame:
     return df.filter(pl.col("year") == year)
 
 
-def filter_by_range_years(df: pl.DataFrame, start_year: int, end_year: int) -> pl.DataFrame:
+def filter_by_range_years(df: FrameLike, start_year: int, end_year: int) -> FrameLike:
     """
     Filter dataset by a range of years (inclusive).
     
     Args:
-        df: Input DataFrame
+        df: Input DataFrame or LazyFrame
         start_year: Start year (inclusive)
         end_year: End year (inclusive)
     
     Returns:
-        Filtered DataFrame
+        Filtered DataFrame (LazyFrame if df is lazy)
     
     Example:
         >>> df = load_data()
@@ -56,16 +61,16 @@ def filter_by_range_years(df: pl.DataFrame, start_year: int, end_year: int) -> p
     )
 
 
-def filter_by_country(df: pl.DataFrame, country: str) -> pl.DataFrame:
+def filter_by_country(df: FrameLike, country: str) -> FrameLike:
     """
     Filter dataset by a specific country.
     
     Args:
-        df: Input DataFrame
+        df: Input DataFrame or LazyFrame
         country: Country name (case-sensitive)
     
     Returns:
-        Filtered DataFrame
+        Filtered DataFrame (LazyFrame if df is lazy)
     
     Example:
         >>> df = load_data()
@@ -73,19 +78,19 @@ def filter_by_country(df: pl.DataFrame, country: str) -> pl.DataFrame:
         >>> print(f"USA rows: {len(df_usa):,}")
         USA rows: 200,000
     """
-    return df.filter(pl.col("country") == country)
+    return df.filter(dimension_filter(df, "country", country))
 
 
-def filter_by_exporter(df: pl.DataFrame, exporter: str) -> pl.DataFrame:
+def filter_by_exporter(df: FrameLike, exporter: str) -> FrameLike:
     """
     Filter dataset by a specific exporter.
     
     Args:
-        df: Input DataFrame
+        df: Input DataFrame or LazyFrame
         exporter: Exporter name (case-sensitive)
     
     Returns:
-        Filtered DataFrame
+        Filtered DataFrame (LazyFrame if df is lazy)
     
     Example:
         >>> df = load_data()
@@ -93,19 +98,19 @@ def filter_by_exporter(df: pl.DataFrame, exporter: str) -> pl.DataFrame:
         >>> print(f"Copefrut rows: {len(df_copefrut):,}")
         Copefrut rows: 50,000
     """
-    return df.filter(pl.col("exporter") == exporter)
+    return df.filter(dimension_filter(df, "exporter", exporter))
 
 
-def filter_by_product(df: pl.DataFrame, product: str) -> pl.DataFrame:
+def filter_by_product(df: FrameLike, product: str) -> FrameLike:
     """
     Filter dataset by a specific product.
     
     Args:
-        df: Input DataFrame
+        df: Input DataFrame or LazyFrame
         product: Product name (case-sensitive)
     
     Returns:
-        Filtered DataFrame
+        Filtered DataFrame (LazyFrame if df is lazy)
     
     Example:
         >>> df = load_data()
@@ -113,19 +118,19 @@ def filter_by_product(df: pl.DataFrame, product: str) -> pl.DataFrame:
         >>> print(f"Kiwifruit rows: {len(df_kiwi):,}")
         Kiwifruit rows: 300,000
     """
-    return df.filter(pl.col("product") == product)
+    return df.filter(dimension_filter(df, "product", product))
 
 
-def filter_by_season(df: pl.DataFrame, season: str) -> pl.DataFrame:
+def filter_by_season(df: FrameLike, season: str) -> FrameLike:
     """
     Filter dataset by a specific season.
     
     Args:
-        df: Input DataFrame
+        df: Input DataFrame or LazyFrame
         season: Season string (e.g., "2010-2011")
     
     Returns:
-        Filtered DataFrame
+        Filtered DataFrame (LazyFrame if df is lazy)
     
     Example:
         >>> df = load_data()
@@ -4,18 +4,152 @@ KPI calculation functions.
 This module provides:
 - Global KPIs: total boxes, kilos, rows, unique counts
 - KPIs by dimension: totals filtered by year, country, product, exporter
+
+Sums are scaled by the sample_weight column of the stratified samples
+(scripts/sample_dataset.py), so totals computed on a sample estimate the
+full-data totals. Unique counts are not scaled.
+
+All functions accept a DataFrame or a LazyFrame (load_data(lazy=True)); with
+a LazyFrame only the columns and rows each KPI needs are read from disk.
 """
 
-from typing import Dict, Optional, Union
+from typing import Any, Dict, List, Union
 import polars as pl
+from .loader import import_script
+from .star import dimension_filter, dimension_key
+from .utils import FrameLike, collect_frame, frame_columns
+
+
+WEIGHT_COLUMN = "sample_weight"
+
+
+def _rows_expr(columns: List[str]) -> pl.Expr:
+    """Original row count, honoring row_count (compacted) and sample_weight."""
+    if WEIGHT_COLUMN in columns:
+        counts = pl.col("row_count") if "row_count" in columns else 1
+        return (pl.col(WEIGHT_COLUMN) * counts).sum()
+    if "row_count" in columns:
+        return pl.col("row_count").sum()
+    return pl.len()
+
+
+def _boxes_expr(columns: List[str]) -> pl.Expr:
+    """Total boxes, scaled by sample_weight in sampled data."""
+    if WEIGHT_COLUMN in columns:
+        return (pl.col("boxes") * pl.col(WEIGHT_COLUMN)).sum()
+    return pl.col("boxes").sum()
+
+
+def _kilos_expr(columns: List[str]) -> pl.Expr:
+    """
+    Total net weight in integer grams.
+    
+    Uses net_weight_g (scripts/normalize.py --fixed-point) when present and
+    otherwise converts net_weight_kg row by row with
+    scripts/fixed_point.py to_fixed_kilos, the same sum validate and the
+    audit use, so it does not depend on summation order.
+    """
+    if "net_weight_g" in columns:
+        kilos = pl.col("net_weight_g")
+    else:
+        kilos = import_script("fixed_point").to_fixed_kilos(pl.col("net_weight_kg"))
+    if WEIGHT_COLUMN in columns:
+        return (kilos * pl.col(WEIGHT_COLUMN)).sum()
+    return kilos.sum()
+
+
+def _to_count(value: Any, columns: List[str]) -> int:
+    """Integer total (weighted sums are rounded)."""
+    return int(round(value)) if WEIGHT_COLUMN in columns else int(value)
+
+
+def _to_kilos(value: Any, columns: List[str]) -> float:
+    """Kilos from the grams returned by _kilos_expr()."""
+    return import_script("fixed_point").fixed_to_kilos(_to_count(value, columns))
 
 
-def get_total_boxes(df: pl.DataFrame) -> int:
+def _aggregate(df: FrameLike, exprs: Dict[str, pl.Expr]) -> Dict[str, Any]:
+    """Evaluate scalar aggregations in a single pass (one scan for a LazyFrame)."""
+    return collect_frame(df.select([expr.alias(name) for name, expr in exprs.items()])).row(0, named=True)
+
+
+def _count_rows(df: FrameLike) -> int:
+    """
+    Count original rows, honoring the row_count multiplicity of compacted data.
+    
+    Args:
+        df: Input DataFrame or LazyFrame (clean, compacted or sampled)
+    
+    Returns:
+        Number of source rows represented by df
+    """
+    columns = frame_columns(df)
+    return _to_count(_aggregate(df, {"rows": _rows_expr(columns)})["rows"], columns)
+
+
+def _sum_boxes(df: FrameLike) -> int:
+    """
+    Sum boxes, scaled by sample_weight in sampled data.
+    
+    Args:
+        df: Input DataFrame or LazyFrame
+    
+    Returns:
+        Total boxes as integer
+    """
+    columns = frame_columns(df)
+    return _to_count(_aggregate(df, {"boxes": _boxes_expr(columns)})["boxes"], columns)
+
+
+def _sum_kilos(df: FrameLike) -> float:
+    """
+    Sum net weight in kilograms, as an exact sum of integer grams.
+    
+    Args:
+        df: Input DataFrame or LazyFrame
+    
+    Returns:
+        Total kilos as float
+    """
+    columns = frame_columns(df)
+    return _to_kilos(_aggregate(df, {"kilos": _kilos_expr(columns)})["kilos"], columns)
+
+
+def _totals(df: FrameLike) -> Dict[str, Union[int, float]]:
+    """
+    Boxes, kilos and rows in a single pass.
+    
+    Args:
+        df: Input DataFrame or LazyFrame
+    
+    Returns:
+        Dictionary with 'boxes', 'kilos', and 'rows'
+    """
+    columns = frame_columns(df)
+    values = _aggregate(df, {
+        "boxes": _boxes_expr(columns),
+        "kilos": _kilos_expr(columns),
+        "rows": _rows_expr(columns),
+    })
+    return {
+        "boxes": _to_count(values["boxes"], columns),
+        "kilos": _to_kilos(values["kilos"], columns),
+        "rows": _to_count(values["rows"], columns),
+    }
+
+
+def _count_unique(df: FrameLike, column: str) -> int:
+    """Number of unique values of a dimension (string or star key)."""
+    key = dimension_key(df, column)
+    return _aggregate(df, {"unique": pl.col(key).n_unique()})["unique"]
+
+
+def get_total_boxes(df: FrameLike) -> int:
     """
     Calculate total boxes across all records.
     
     Args:
-        df: Input DataFrame
+        df: Input DataFrame or LazyFrame
     
     Returns:
         Total boxes as integer
@@ -26,15 +160,15 @@ def get_total_boxes(df: pl.DataFrame) -> int:
         >>> print(f"Total boxes: {total:,}")
         Total boxes: 5,144,111,652
     """
-    return int(df["boxes"].sum())
+    return _sum_boxes(df)
 
 
-def get_total_kilos(df: pl.DataFrame) -> float:
+def get_total_kilos(df: FrameLike) -> float:
     """
     Calculate total net weight in kilograms across all records.
     
     Args:
-        df: Input DataFrame
+        df: Input DataFrame or LazyFrame
     
     Returns:
         Total kilos as float
@@ -45,15 +179,18 @@ def get_total_kilos(df: pl.DataFrame) -> float:
         >>> print(f"Total kilos: {total:,.2f}")
         Total kilos: 25,412,581,716.00
     """
-    return float(df["net_weight_kg"].sum())
+    return _sum_kilos(df)
 
 
-def get_total_rows(df: pl.DataFrame) -> int:
+def get_total_rows(df: FrameLike) -> int:
     """
     Get total number of rows in the dataset.
     
+    For compacted data (with a row_count column) this returns the number of
+    original rows, not the number of compacted rows.
+    
     Args:
-        df: Input DataFrame
+        df: Input DataFrame or LazyFrame
     
     Returns:
         Total row count
@@ -64,15 +201,15 @@ def get_total_rows(df: pl.DataFrame) -> int:
         >>> print(f"Total rows: {rows:,}")
         Total rows: 1,754,553
     """
-    return len(df)
+    return _count_rows(df)
 
 
-def get_total_exporters(df: pl.DataFrame) -> int:
+def get_total_exporters(df: FrameLike) -> int:
     """
     Get total number of unique exporters.
     
     Args:
-        df: Input DataFrame
+        df: Input DataFrame or LazyFrame
     
     Returns:
         Count of unique exporters
@@ -83,15 +220,15 @@ def get_total_exporters(df: pl.DataFrame) -> int:
         >>> print(f"Unique exporters: {exporters}")
         Unique exporters: 150
     """
-    return df["exporter"].n_unique()
+    return _count_unique(df, "exporter")
 
 
-def get_total_products(df: pl.DataFrame) -> int:
+def get_total_products(df: FrameLike) -> int:
     """
     Get total number of unique products.
     
     Args:
-        df: Input DataFrame
+        df: Input DataFrame or LazyFrame
     
     Returns:
         Count of unique products
@@ -102,15 +239,15 @@ def get_total_products(df: pl.DataFrame) -> int:
         >>> print(f"Unique products: {products}")
         Unique products: 25
     """
-    return df["product"].n_unique()
+    return _count_unique(df, "product")
 
 
-def get_total_countries(df: pl.DataFrame) -> int:
+def get_total_countries(df: FrameLike) -> int:
     """
     Get total number of unique countries.
     
     Args:
-        df: Input DataFrame
+        df: Input DataFrame or LazyFrame
     
     Returns:
         Count of unique countries
@@ -121,15 +258,15 @@ def get_total_countries(df: pl.DataFrame) -> int:
         >>> print(f"Unique countries: {countries}")
         Unique countries: 50
     """
-    return df["country"].n_unique()
+    return _count_unique(df, "country")
 
 
-def get_total_by_year(df: pl.DataFrame, year: int) -> Dict[str, Union[int, float]]:
+def get_total_by_year(df: FrameLike, year: int) -> Dict[str, Union[int, float]]:
     """
     Calculate totals (boxes and kilos) for a specific year.
     
     Args:
-        df: Input DataFrame
+        df: Input DataFrame or LazyFrame
         year: Year to filter
     
     Returns:
@@ -143,19 +280,15 @@ def get_total_by_year(df: pl.DataFrame, year: int) -> Dict[str, Union[int, float
     """
     df_filtered = df.filter(pl.col("year") == year)
     
-    return {
-        "boxes": int(df_filtered["boxes"].sum()),
-        "kilos": float(df_filtered["net_weight_kg"].sum()),
-        "rows": len(df_filtered),
-    }
+    return _totals(df_filtered)
 
 
-def get_total_by_country(df: pl.DataFrame, country: str) -> Dict[str, Union[int, float]]:
+def get_total_by_country(df: FrameLike, country: str) -> Dict[str, Union[int, float]]:
     """
     Calculate totals (boxes and kilos) for a specific country.
     
     Args:
-        df: Input DataFrame
+        df: Input DataFrame or LazyFrame
         country: Country name (case-sensitive)
     
     Returns:
@@ -167,21 +300,17 @@ def get_total_by_country(df: pl.DataFrame, country: str) -> Dict[str, Union[int,
         >>> print(f"USA: {totals['boxes']:,} boxes")
         USA: 1,000,000,000 boxes
     """
-    df_filtered = df.filter(pl.col("country") == country)
+    df_filtered = df.filter(dimension_filter(df, "country", country))
     
-    return {
-        "boxes": int(df_filtered["boxes"].sum()),
-        "kilos": float(df_filtered["net_weight_kg"].sum()),
-        "rows": len(df_filtered),
-    }
+    return _totals(df_filtered)
 
 
-def get_total_by_product(df: pl.DataFrame, product: str) -> Dict[str, Union[int, float]]:
+def get_total_by_product(df: FrameLike, product: str) -> Dict[str, Union[int, float]]:
     """
     Calculate totals (boxes and kilos) for a specific product.
     
     Args:
-        df: Input DataFrame
+        df: Input DataFrame or LazyFrame
         product: Product name (case-sensitive)
     
     Returns:
@@ -193,21 +322,17 @@ def get_total_by_product(df: pl.DataFrame, product: str) -> Dict[str, Union[int,
         >>> print(f"Kiwifruit: {totals['kilos']:,.2f} kilos")
         Kiwifruit: 500,000,000.00 kilos
     """
-    df_filtered = df.filter(pl.col("product") == product)
+    df_filtered = df.filter(dimension_filter(df, "product", product))
     
-    return {
-        "boxes": int(df_filtered["boxes"].sum()),
-        "kilos": float(df_filtered["net_weight_kg"].sum()),
-        "rows": len(df_filtered),
-    }
+    return _totals(df_filtered)
 
 
-def get_total_by_exporter(df: pl.DataFrame, exporter: str) -> Dict[str, Union[int, float]]:
+def get_total_by_exporter(df: FrameLike, exporter: str) -> Dict[str, Union[int, float]]:
     """
     Calculate totals (boxes and kilos) for a specific exporter.
     
     Args:
-        df: Input DataFrame
+        df: Input DataFrame or LazyFrame
         exporter: Exporter name (case-sensitive)
     
     Returns:
@@ -219,11 +344,7 @@ def get_total_by_exporter(df: pl.DataFrame, exporter: str) -> Dict[str, Union[in
         >>> print(f"Copefrut: {totals['boxes']:,} boxes")
         Copefrut: 100,000,000 boxes
     """
-    df_filtered = df.filter(pl.col("exporter") == exporter)
+    df_filtered = df.filter(dimension_filter(df, "exporter", exporter))
     
-    return {
-        "boxes": int(df_filtered["boxes"].sum()),
-        "kilos": float(df_filtered["net_weight_kg"].sum()),
-        "rows": len(df_filtered),
-    }
+    return _totals(df_filtered)
 
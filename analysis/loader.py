@@ -2,18 +2,31 @@
 Data loader module with schema enforcement and caching.
 
 This module provides:
-- load_data(): Load and cache the cleaned dataset
+- load_data(): Load and cache the cleaned dataset (pinned to a snapshot, from
+  the hot/cold split files, or resolved as a virtual view of its parent), or
+  return it as a LazyFrame with column selection and filters pushed down
 - Helper functions to get unique values from columns
+
+Dataset names are resolved through the registry in
+scripts/dataset_registry.py, so a dataset can be a materialized file or a
+virtual view applied at scan time.
 """
 
+import importlib
+import sys
 from pathlib import Path
-from typing import List, Optional
+from types import ModuleType
+from typing import Any, Dict, List, Optional, Tuple, Union
 import polars as pl
-from .utils import ensure_columns, validate_types
+from .utils import FrameLike, collect_frame, ensure_columns, frame_columns, validate_types
+from .star import STAR_DIMENSIONS, decode_unique_values
+from .split import scan_split_files, split_paths
 
 
-# Global cache for loaded data
+# Global cache for loaded data, keyed by (file name, snapshot, split, columns, filters)
 _cached_df: Optional[pl.DataFrame] = None
+_cached_key: Optional[Tuple] = None
+_cached_snapshot_id: Optional[str] = None
 
 # Expected schema for analysis (only core columns)
 EXPECTED_SCHEMA = {
@@ -28,60 +41,238 @@ EXPECTED_SCHEMA = {
     "net_weight_kg": "float",
 }
 
+# Optional columns kept when present (row_count comes from scripts/compact.py,
+# net_weight_g from scripts/normalize.py --fixed-point, sample_weight from
+# scripts/sample_dataset.py)
+OPTIONAL_SCHEMA = {
+    "row_count": "int",
+    "net_weight_g": "int",
+    "sample_weight": "float",
+}
+
+# Remaining columns, loaded only when requested via load_data(columns=...)
+EXTRA_SCHEMA = {
+    "region": "str",
+    "market": "str",
+    "transport": "str",
+    "variety": "str",
+    "importer": "str",
+    "source_week": "int",
+    "source_row": "int",
+}
+
+SCRIPTS_DIR = Path(__file__).parent.parent / "scripts"
+
+
+def import_script(name: str) -> ModuleType:
+    """Import a module from scripts/ (the scripts use flat imports)."""
+    if str(SCRIPTS_DIR) not in sys.path:
+        sys.path.insert(0, str(SCRIPTS_DIR))
+    return importlib.import_module(name)
+
+
+def get_dataset_registry() -> ModuleType:
+    """Import scripts/dataset_registry.py."""
+    return import_script("dataset_registry")
+
+
+def filter_predicate(filters: Dict[str, Any]) -> pl.Expr:
+    """
+    Build a predicate from column -> value filters.
+    
+    Args:
+        filters: Dict column -> value (None = null; a list, tuple or set
+            matches any of its values)
+    
+    Returns:
+        Polars expression usable in filter()
+    
+    Example:
+        >>> filter_predicate({"exporter": "Copefrut S.A.", "year": [2023, 2024]})
+    """
+    predicates = []
+    for col, value in filters.items():
+        if value is None:
+            predicates.append(pl.col(col).is_null())
+        elif isinstance(value, (list, tuple, set)):
+            predicates.append(pl.col(col).is_in(list(value)))
+        else:
+            predicates.append(pl.col(col) == value)
+    return pl.all_horizontal(predicates)
+
+
+def _filters_key(filters: Optional[Dict[str, Any]]) -> Optional[Tuple]:
+    """Hashable form of filters for the cache key."""
+    if not filters:
+        return None
+    return tuple(
+        (col, tuple(sorted(value, key=str)) if isinstance(value, (list, tuple, set)) else value)
+        for col, value in sorted(filters.items())
+    )
 
-def load_data(force_reload: bool = False) -> pl.DataFrame:
+
+def load_data(
+    force_reload: bool = False,
+    compact: bool = False,
+    snapshot: Optional[str] = None,
+    split: bool = False,
+    columns: Optional[List[str]] = None,
+    sample: Optional[str] = None,
+    lazy: bool = False,
+    filters: Optional[Dict[str, Any]] = None,
+) -> Union[pl.DataFrame, pl.LazyFrame]:
     """
     Load the cleaned dataset with schema enforcement and caching.
     
+    The file is resolved through data/snapshots/manifest.json when the dataset
+    has published snapshots, so a refresh never exposes a partially written
+    file. The cached frame stays pinned to the snapshot it was loaded from
+    until force_reload=True.
+    
+    With split=True the data is read from the hot/cold split files
+    (scripts/clean_nulls.py --split): only the hot file is read unless a cold
+    column (importer, variety, port_destination, ...) is requested, and the
+    default columns are those of EXPECTED_SCHEMA in the hot file.
+    
+    The dataset is resolved through scripts/dataset_registry.py: if it is
+    virtual (e.g. after scripts/clean_nulls.py --virtual) no copy exists and
+    its view is applied at scan time on top of the parent dataset (the null
+    fill "SN" / 0 over the master dataset).
+    
+    Only the selected columns are read, and filters are applied while
+    scanning. With lazy=True nothing is read: the result is a LazyFrame over
+    the resolved file (not cached), so the analysis functions and further
+    filters push their own columns and predicates down to the Parquet reader.
+    
     Args:
         force_reload: If True, reload data even if cached
+        compact: If True, load the compacted dataset (one row per key with
+            a row_count multiplicity column) instead of the clean one
+        snapshot: Snapshot id to load (time travel); None = current snapshot.
+            With split=True, an id of the "<dataset>_split" snapshots
+        split: If True, read the hot/cold split files instead of the snapshot
+        columns: Columns to load; None = EXPECTED_SCHEMA (plus row_count);
+            with split=True, only the expected columns in the hot file
+        sample: Stratified sample to load instead ("1pct", "5pct"; see
+            scripts/sample_dataset.py). Rows carry a sample_weight that the
+            KPI functions use to scale totals to the full dataset
+        lazy: If True, return a LazyFrame instead of loading the data
+        filters: Keep only rows matching column -> value (see
+            filter_predicate); filter columns need not be in columns
     
     Returns:
-        Polars DataFrame with enforced schema
+        Polars DataFrame (LazyFrame if lazy=True) with enforced schema
     
     Example:
         >>> df = load_data()
         >>> print(df.shape)
         (1754553, 9)
+        >>> df_old = load_data(snapshot="20250101T000000Z-a1b2c3")
+        >>> df_hot = load_data(split=True, columns=["season", "product", "boxes"])
+        >>> df_dev = load_data(sample="1pct")
+        >>> lf = load_data(lazy=True, columns=["year", "boxes", "net_weight_kg"], filters={"exporter": "Copefrut S.A."})
+        >>> time_series_total(lf)  # reads year, boxes and kilos of one exporter only
     """
-    global _cached_df
-    
-    if _cached_df is not None and not force_reload:
+    global _cached_df, _cached_key, _cached_snapshot_id
+    
+    registry = get_dataset_registry()
+    if sample is not None:
+        if compact or split:
+            raise ValueError("sample cannot be combined with compact or split")
+        dataset = f"sample_{sample}"
+        if dataset not in registry.REGISTRY:
+            raise ValueError(f"Unknown sample: {sample}")
+        # Weights always travel with the sampled rows
+        if columns is not None and "sample_weight" not in columns:
+            columns = [*columns, "sample_weight"]
+    else:
+        dataset = "compact" if compact else "clean"
+    file_name = registry.REGISTRY[dataset]["file"]
+    cache_key = (file_name, snapshot, split, tuple(columns) if columns else None, _filters_key(filters))
+    
+    if not lazy and _cached_df is not None and _cached_key == cache_key and not force_reload:
         return _cached_df
     
-    # Get project root (parent of analysis directory)
-    project_root = Path(__file__).parent.parent
-    parquet_path = project_root / "data" / "exports_10_years_clean.parquet"
-    
-    if not parquet_path.exists():
-        raise FileNotFoundError(
-            f"Dataset not found: {parquet_path}\n"
-            "Please ensure exports_10_years_clean.parquet exists in the data/ directory."
-        )
-    
-    # Load data
-    df = pl.read_parquet(parquet_path)
-    
-    # Enforce schema (select only expected columns and cast types)
-    df = ensure_columns(df, EXPECTED_SCHEMA)
+    known_schema = {**EXPECTED_SCHEMA, **OPTIONAL_SCHEMA, **EXTRA_SCHEMA}
+    if columns is not None:
+        unknown = set(columns) - set(known_schema)
+        if unknown:
+            raise ValueError(f"Unknown columns: {unknown}")
+    filter_columns = list(filters or {})
+    
+    if split:
+        snapshot_id, hot_path, cold_path = split_paths(Path(file_name).stem, snapshot)
+        if not hot_path.exists():
+            raise FileNotFoundError(
+                f"Split files not found for {file_name}\n"
+                "Please run: python scripts/clean_nulls.py --split"
+            )
+        if columns is not None:
+            schema = {col: known_schema[col] for col in columns}
+        else:
+            # The default read stays on the hot file (no cold column stitched in)
+            hot_columns = pl.scan_parquet(hot_path).collect_schema().names()
+            schema = {col: t for col, t in {**EXPECTED_SCHEMA, **OPTIONAL_SCHEMA}.items() if col in hot_columns}
+        # Filter columns are read too (a cold one stitches the cold file)
+        lf = scan_split_files(hot_path, cold_path, [*schema, *(col for col in filter_columns if col not in schema)])
+    else:
+        # Resolve through the registry: snapshot manifest, data/<file_name>, or
+        # the virtual view over the parent dataset
+        snapshot_id, lf = registry.open_dataset(dataset, snapshot)
+        if columns is not None:
+            schema = {col: known_schema[col] for col in columns}
+        else:
+            # Expected columns plus the optional ones present in the file
+            available = frame_columns(lf)
+            schema = dict(EXPECTED_SCHEMA)
+            schema.update({col: t for col, t in OPTIONAL_SCHEMA.items() if col in available})
+    
+    # Filters before the projection, so they can use columns that are not returned
+    if filters:
+        lf = lf.filter(filter_predicate(filters))
+    
+    # Enforce schema (select only the requested columns and cast types)
+    lf = ensure_columns(lf, schema)
     
     # Validate types
-    if not validate_types(df, EXPECTED_SCHEMA):
+    if not validate_types(lf, schema):
         raise ValueError("Schema validation failed after type casting")
     
+    if lazy:
+        return lf
+    
+    df = lf.collect()
+    
     # Cache the result
     _cached_df = df
+    _cached_key = cache_key
+    _cached_snapshot_id = snapshot_id
     
     return df
 
 
-def get_unique_values(column: str, df: Optional[pl.DataFrame] = None) -> List[str]:
+def get_loaded_snapshot() -> Optional[str]:
+    """
+    Get the snapshot id the cached dataset is pinned to.
+    
+    Returns:
+        Snapshot id, or None if nothing is loaded or the file had no snapshots
+    
+    Example:
+        >>> df = load_data()
+        >>> print(get_loaded_snapshot())
+        20250101T000000Z-a1b2c3
+    """
+    return _cached_snapshot_id
+
+
+def get_unique_values(column: str, df: Optional[FrameLike] = None) -> List[str]:
     """
     Get unique values from a column, sorted alphabetically.
     
     Args:
         column: Column name
-        df: DataFrame (if None, uses cached data)
+        df: DataFrame or LazyFrame (if None, uses cached data)
     
     Returns:
         List of unique values, sorted
@@ -94,18 +285,22 @@ def get_unique_values(column: str, df: Optional[pl.DataFrame] = None) -> List[st
     if df is None:
         df = load_data()
     
-    if column not in df.columns:
+    columns = frame_columns(df)
+    if column not in columns and column in STAR_DIMENSIONS and f"{column}_id" in columns:
+        return decode_unique_values(df, column)
+    
+    if column not in columns:
         raise ValueError(f"Column '{column}' not found in dataset")
     
-    return sorted(df[column].unique().to_list())
+    return sorted(collect_frame(df.select(pl.col(column).unique()))[column].to_list())
 
 
-def get_years(df: Optional[pl.DataFrame] = None) -> List[int]:
+def get_years(df: Optional[FrameLike] = None) -> List[int]:
     """
     Get unique years from the dataset, sorted.
     
     Args:
-        df: DataFrame (if None, uses cached data)
+        df: DataFrame or LazyFrame (if None, uses cached data)
     
     Returns:
         List of unique years, sorted
@@ -118,15 +313,15 @@ def get_years(df: Optional[pl.DataFrame] = None) -> List[int]:
     if df is None:
         df = load_data()
     
-    return sorted(df["year"].unique().to_list())
+    return get_unique_values("year", df)
 
 
-def get_countries(df: Optional[pl.DataFrame] = None) -> List[str]:
+def get_countries(df: Optional[FrameLike] = None) -> List[str]:
     """
     Get unique countries from the dataset, sorted.
     
     Args:
-        df: DataFrame (if None, uses cached data)
+        df: DataFrame or LazyFrame (if None, uses cached data)
     
     Returns:
         List of unique countries, sorted
@@ -139,12 +334,12 @@ def get_countries(df: Optional[pl.DataFrame] = None) -> List[str]:
     return get_unique_values("country", df)
 
 
-def get_products(df: Optional[pl.DataFrame] = None) -> List[str]:
+def get_products(df: Optional[FrameLike] = None) -> List[str]:
     """
     Get unique products from the dataset, sorted.
     
     Args:
-        df: DataFrame (if None, uses cached data)
+        df: DataFrame or LazyFrame (if None, uses cached data)
     
     Returns:
         List of unique products, sorted
@@ -157,12 +352,12 @@ def get_products(df: Optional[pl.DataFrame] = None) -> List[str]:
     return get_unique_values("product", df)
 
 
-def get_exporters(df: Optional[pl.DataFrame] = None) -> List[str]:
+def get_exporters(df: Optional[FrameLike] = None) -> List[str]:
     """
     Get unique exporters from the dataset, sorted.
     
     Args:
-        df: DataFrame (if None, uses cached data)
+        df: DataFrame or LazyFrame (if None, uses cached data)
     
     Returns:
         List of unique exporters, sorted
@@ -175,12 +370,12 @@ def get_exporters(df: Optional[pl.DataFrame] = None) -> List[str]:
     return get_unique_values("exporter", df)
 
 
-def get_seasons(df: Optional[pl.DataFrame] = None) -> List[str]:
+def get_seasons(df: Optional[FrameLike] = None) -> List[str]:
     """
     Get unique seasons from the dataset, sorted.
     
     Args:
-        df: DataFrame (if None, uses cached data)
+        df: DataFrame or LazyFrame (if None, uses cached data)
     
     Returns:
         List of unique seasons, sorted
@@ -0,0 +1,125 @@
+"""
+Snapshot resolution for versioned datasets.
+
+Datasets published by the pipeline scripts live under data/snapshots/ and are
+indexed by data/snapshots/manifest.json, which is replaced atomically on every
+publish (see scripts/snapshots.py). This module only reads the manifest:
+- resolve_snapshot(): Path of the current (or a given) snapshot of a dataset
+- resolve_snapshot_files(): Every file of a multi-file snapshot, by name
+- list_snapshots(): Snapshot ids available for a dataset, oldest first
+"""
+
+import json
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+
+def get_manifest_path() -> Path:
+    """Return the path of data/snapshots/manifest.json."""
+    return Path(__file__).parent.parent / "data" / "snapshots" / "manifest.json"
+
+
+def read_manifest() -> Dict[str, Any]:
+    """
+    Read the snapshot manifest.
+
+    Returns:
+        Manifest dict (with an empty "datasets" mapping if none was published)
+    """
+    manifest_path = get_manifest_path()
+    if not manifest_path.exists():
+        return {"datasets": {}}
+    with open(manifest_path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def resolve_snapshot(dataset: str, snapshot: Optional[str] = None) -> Optional[Tuple[str, Path]]:
+    """
+    Resolve a dataset name to the Parquet file of one of its snapshots.
+
+    Args:
+        dataset: Dataset name (e.g., "exports_10_years_clean")
+        snapshot: Snapshot id; if None, the current snapshot is used
+
+    Returns:
+        Tuple (snapshot_id, path), or None if the dataset has no snapshots
+
+    Raises:
+        ValueError: If snapshot is given but does not exist
+
+    Example:
+        >>> snapshot_id, path = resolve_snapshot("exports_10_years_clean")
+    """
+    resolved = _resolve_entry(dataset, snapshot)
+    if resolved is None:
+        return None
+    snapshot_id, entry = resolved
+    return snapshot_id, Path(__file__).parent.parent / entry["file"]
+
+
+def resolve_snapshot_files(dataset: str, snapshot: Optional[str] = None) -> Optional[Tuple[str, Dict[str, Path]]]:
+    """
+    Resolve a dataset name to all the files of one of its snapshots.
+
+    Files published together (scripts/snapshots.py publish_files) become
+    visible in the same manifest update, so they always belong to one write.
+
+    Args:
+        dataset: Dataset name (e.g., "exports_10_years_clean_split")
+        snapshot: Snapshot id; if None, the current snapshot is used
+
+    Returns:
+        Tuple (snapshot_id, {file name: path}), or None if the dataset has
+        no snapshots
+
+    Raises:
+        ValueError: If snapshot is given but does not exist
+    """
+    resolved = _resolve_entry(dataset, snapshot)
+    if resolved is None:
+        return None
+    snapshot_id, entry = resolved
+    root = Path(__file__).parent.parent
+    files = entry.get("files") or {Path(entry["file"]).name: entry["file"]}
+    return snapshot_id, {name: root / file for name, file in files.items()}
+
+
+def _resolve_entry(dataset: str, snapshot: Optional[str]) -> Optional[Tuple[str, Dict[str, Any]]]:
+    """Manifest entry of the current (or a given) snapshot of a dataset."""
+    info = read_manifest()["datasets"].get(dataset)
+
+    # No snapshots, or unpublished (scripts/snapshots.py unpublish)
+    if info is None or (snapshot is None and info["current"] is None):
+        if snapshot is not None:
+            raise ValueError(f"Dataset '{dataset}' has no published snapshots")
+        return None
+
+    snapshot_id = snapshot or info["current"]
+    for entry in info["snapshots"]:
+        if entry["id"] == snapshot_id:
+            return snapshot_id, entry
+
+    raise ValueError(
+        f"Snapshot '{snapshot_id}' not found for dataset '{dataset}'. "
+        f"Available: {[entry['id'] for entry in info['snapshots']]}"
+    )
+
+
+def list_snapshots(dataset: str) -> List[str]:
+    """
+    List snapshot ids of a dataset, oldest first.
+
+    Args:
+        dataset: Dataset name
+
+    Returns:
+        List of snapshot ids (empty if the dataset has no snapshots)
+
+    Example:
+        >>> ids = list_snapshots("exports_10_years_clean")
+        >>> df_old = load_data(snapshot=ids[0])
+    """
+    info = read_manifest()["datasets"].get(dataset)
+    if info is None:
+        return []
+    return sorted(entry["id"] for entry in info["snapshots"])
@@ -0,0 +1,113 @@
+"""
+Hot/cold column split support for the analysis module.
+
+scripts/combine.py --split and scripts/clean_nulls.py --split write a dataset
+as two aligned files (same rows, same order) under data/split/:
+- <dataset>_hot.parquet: columns read by almost every query
+- <dataset>_cold.parquet: the remaining, rarely used string columns
+
+The pair is published as one snapshot of "<dataset>_split" (see
+scripts/column_split.py), so split_paths() resolves both files from the same
+write through the manifest; data/split/ is the fallback for files written
+before the pair was versioned.
+
+scan_split() reads only the hot file and stitches the cold one lazily when a
+cold column is requested.
+"""
+
+from pathlib import Path
+from typing import List, Optional, Tuple
+import polars as pl
+from .snapshots import resolve_snapshot_files
+
+
+def get_split_dir() -> Path:
+    """Return the directory holding <dataset>_hot.parquet and <dataset>_cold.parquet."""
+    return Path(__file__).parent.parent / "data" / "split"
+
+
+def split_paths(dataset: str, snapshot: Optional[str] = None) -> Tuple[Optional[str], Path, Path]:
+    """
+    Resolve the hot and cold files of a split dataset.
+
+    Args:
+        dataset: Dataset name (e.g., "exports_10_years_clean")
+        snapshot: Snapshot id of "<dataset>_split"; None = current snapshot
+
+    Returns:
+        Tuple (snapshot_id or None, hot path, cold path); the paths may not
+        exist if the dataset was never split
+    """
+    resolved = resolve_snapshot_files(f"{dataset}_split", snapshot)
+    if resolved is not None:
+        snapshot_id, files = resolved
+        return snapshot_id, files[f"{dataset}_hot.parquet"], files[f"{dataset}_cold.parquet"]
+    return None, get_split_dir() / f"{dataset}_hot.parquet", get_split_dir() / f"{dataset}_cold.parquet"
+
+
+def _count_rows(path: Path) -> int:
+    """Row count from Parquet metadata (no column data is read)."""
+    return pl.scan_parquet(path).select(pl.len()).collect().item()
+
+
+def scan_split(dataset: str, columns: List[str], snapshot: Optional[str] = None) -> Optional[pl.LazyFrame]:
+    """
+    Lazily scan a split dataset, touching the cold file only if needed.
+
+    Args:
+        dataset: Dataset name (e.g., "exports_10_years_clean")
+        columns: Columns to read, in output order
+        snapshot: Snapshot id of "<dataset>_split"; None = current snapshot
+
+    Returns:
+        LazyFrame with the requested columns, or None if the dataset has
+        no split files
+
+    Raises:
+        ValueError: If the hot and cold files are not aligned
+
+    Example:
+        >>> lf = scan_split("exports_10_years_clean", ["season", "boxes"])  # hot file only
+    """
+    _, hot_path, cold_path = split_paths(dataset, snapshot)
+    if not hot_path.exists():
+        return None
+    return scan_split_files(hot_path, cold_path, columns)
+
+
+def scan_split_files(hot_path: Path, cold_path: Path, columns: List[str]) -> pl.LazyFrame:
+    """
+    Lazily scan a resolved hot/cold pair (see split_paths and scan_split).
+
+    Args:
+        hot_path: Hot column file
+        cold_path: Cold column file, read only if a cold column is requested
+        columns: Columns to read, in output order
+
+    Returns:
+        LazyFrame with the requested columns
+    """
+    hot = pl.scan_parquet(hot_path)
+    hot_columns = hot.collect_schema().names()
+    cold_needed = [col for col in columns if col not in hot_columns]
+
+    if not cold_needed:
+        return hot.select(columns)
+
+    if not cold_path.exists():
+        raise FileNotFoundError(
+            f"Cold column file not found: {cold_path}\n"
+            "Please run: python scripts/clean_nulls.py --split"
+        )
+
+    # Rows are matched by position, so both files must come from the same write
+    hot_rows, cold_rows = _count_rows(hot_path), _count_rows(cold_path)
+    if hot_rows != cold_rows:
+        raise ValueError(
+            f"Split files are not aligned: {hot_path.name} has {hot_rows:,} rows, "
+            f"{cold_path.name} has {cold_rows:,}"
+        )
+
+    hot = hot.select([col for col in columns if col in hot_columns])
+    cold = pl.scan_parquet(cold_path).select(cold_needed)
+    return pl.concat([hot, cold], how="horizontal").select(columns)
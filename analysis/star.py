@@ -0,0 +1,209 @@
+"""
+Star-schema support for the analysis module.
+
+This module provides:
+- load_star_data(): Load the integer-keyed fact table written by combine.py --star
+- Dimension helpers so analysis functions group and filter on integer keys
+  and decode names only on the (small) result
+"""
+
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+import polars as pl
+from .utils import FrameLike, collect_frame, ensure_columns, frame_columns, validate_types
+
+
+# Dimensions encoded as <column>_id in the fact table (see scripts/combine.py)
+STAR_DIMENSIONS = [
+    "country",
+    "product",
+    "variety",
+    "exporter",
+    "importer",
+    "port_destination",
+    "market",
+    "region",
+    "transport",
+]
+
+# Star counterpart of loader.EXPECTED_SCHEMA
+STAR_EXPECTED_SCHEMA = {
+    "season": "str",
+    "week": "int",
+    "year": "int",
+    "country_id": "id",
+    "product_id": "id",
+    "exporter_id": "id",
+    "port_destination_id": "id",
+    "boxes": "int",
+    "net_weight_kg": "float",
+}
+
+# Global caches
+_cached_fact: Optional[pl.DataFrame] = None
+_cached_dims: Dict[str, pl.DataFrame] = {}
+
+
+def get_star_dir() -> Path:
+    """Return the directory holding fact_exports.parquet and dim_*.parquet."""
+    return Path(__file__).parent.parent / "data" / "star"
+
+
+def load_dimension(column: str) -> pl.DataFrame:
+    """
+    Load (and cache) the dimension table for a column.
+
+    Args:
+        column: Dimension name (e.g., "exporter")
+
+    Returns:
+        DataFrame with columns <column>_id and <column>
+
+    Example:
+        >>> dim = load_dimension("country")
+        >>> print(dim.columns)
+        ['country_id', 'country']
+    """
+    if column not in STAR_DIMENSIONS:
+        raise ValueError(f"'{column}' is not a star dimension")
+
+    if column not in _cached_dims:
+        dim_path = get_star_dir() / f"dim_{column}.parquet"
+        if not dim_path.exists():
+            raise FileNotFoundError(
+                f"Dimension table not found: {dim_path}\n"
+                "Please run: python scripts/combine.py --star"
+            )
+        _cached_dims[column] = pl.read_parquet(dim_path)
+
+    return _cached_dims[column]
+
+
+def load_star_data(force_reload: bool = False) -> pl.DataFrame:
+    """
+    Load the star-schema fact table with schema enforcement and caching.
+
+    Dimension columns are kept as UInt32 keys; all analysis functions accept
+    this frame and decode names only in their results.
+
+    Args:
+        force_reload: If True, reload data even if cached
+
+    Returns:
+        Polars DataFrame with integer dimension keys
+
+    Example:
+        >>> fact = load_star_data()
+        >>> top = top_exporters(fact, n=5)  # grouped on exporter_id
+    """
+    global _cached_fact
+
+    if _cached_fact is not None and not force_reload:
+        return _cached_fact
+
+    if force_reload:
+        _cached_dims.clear()
+
+    fact_path = get_star_dir() / "fact_exports.parquet"
+    if not fact_path.exists():
+        raise FileNotFoundError(
+            f"Fact table not found: {fact_path}\n"
+            "Please run: python scripts/combine.py --star"
+        )
+
+    df = pl.read_parquet(fact_path)
+    df = ensure_columns(df, STAR_EXPECTED_SCHEMA)
+
+    if not validate_types(df, STAR_EXPECTED_SCHEMA):
+        raise ValueError("Schema validation failed after type casting")
+
+    _cached_fact = df
+    return df
+
+
+def dimension_key(df: FrameLike, column: str) -> str:
+    """
+    Return the physical column to use for a dimension.
+
+    Args:
+        df: Input DataFrame or LazyFrame (string or star schema)
+        column: Logical dimension name (e.g., "exporter")
+
+    Returns:
+        column itself if present, otherwise "<column>_id"
+    """
+    columns = frame_columns(df)
+    if column in columns:
+        return column
+    id_column = f"{column}_id"
+    if id_column in columns:
+        return id_column
+    raise ValueError(f"Column '{column}' not found in dataset")
+
+
+def dimension_filter(df: FrameLike, column: str, value: Any) -> pl.Expr:
+    """
+    Build an equality predicate on a dimension, encoding value if needed.
+
+    Args:
+        df: Input DataFrame or LazyFrame (string or star schema)
+        column: Logical dimension name
+        value: Name to match (case-sensitive)
+
+    Returns:
+        Polars expression usable in df.filter()
+    """
+    key = dimension_key(df, column)
+    if key == column:
+        return pl.col(column) == value
+
+    dim = load_dimension(column)
+    ids = dim.filter(pl.col(column) == value)[key]
+    if len(ids) == 0:
+        return pl.lit(False)
+    return pl.col(key) == ids[0]
+
+
+def decode_dimensions(df: pl.DataFrame) -> pl.DataFrame:
+    """
+    Replace <column>_id keys with names from the dimension tables.
+
+    Columns keep their position; frames without id columns are returned as is.
+
+    Args:
+        df: DataFrame (typically a small aggregation result)
+
+    Returns:
+        DataFrame with decoded dimension names
+    """
+    decoded = []
+    for col in df.columns:
+        name = col[:-3] if col.endswith("_id") else None
+        if name in STAR_DIMENSIONS:
+            dim = load_dimension(name)
+            decoded.append(
+                pl.col(col)
+                .replace_strict(dim[col], dim[name], default=None, return_dtype=pl.Utf8)
+                .alias(name)
+            )
+        else:
+            decoded.append(pl.col(col))
+
+    return df.select(decoded)
+
+
+def decode_unique_values(df: FrameLike, column: str) -> List[str]:
+    """
+    Get sorted unique names of a dimension present in a star fact frame.
+
+    Args:
+        df: Star-schema DataFrame or LazyFrame
+        column: Logical dimension name
+
+    Returns:
+        List of unique names, sorted
+    """
+    id_column = f"{column}_id"
+    ids = collect_frame(df.select(pl.col(id_column).drop_nulls().unique()))[id_column]
+    dim = load_dimension(column)
+    return sorted(dim.filter(pl.col(id_column).is_in(ids.to_list()))[column].to_list())
@@ -6,17 +6,22 @@ This module provides functions to generate time series data aggregated by year:
 - Time series by country
 - Time series by product
 - Time series by exporter
+
+Each function accepts a DataFrame or a LazyFrame; with a LazyFrame only
+year, boxes, net_weight_kg and the filtered dimension are read.
 """
 
 import polars as pl
+from .star import dimension_filter
+from .utils import FrameLike, collect_frame
 
 
-def time_series_total(df: pl.DataFrame) -> pl.DataFrame:
+def time_series_total(df: FrameLike) -> pl.DataFrame:
     """
     Generate time series of total boxes and kilos aggregated by year.
     
     Args:
-        df: Input DataFrame
+        df: Input DataFrame or LazyFrame
     
     Returns:
         DataFrame with columns: year, boxes, net_weight_kg
@@ -42,15 +47,16 @@ def time_series_total(df: pl.DataFrame) -> pl.DataFrame:
             pl.col("net_weight_kg").sum().alias("net_weight_kg"),
         ])
         .sort("year")
+        .pipe(collect_frame)
     )
 
 
-def time_series_by_country(df: pl.DataFrame, country: str) -> pl.DataFrame:
+def time_series_by_country(df: FrameLike, country: str) -> pl.DataFrame:
     """
     Generate time series of boxes and kilos for a specific country, aggregated by year.
     
     Args:
-        df: Input DataFrame
+        df: Input DataFrame or LazyFrame
         country: Country name (case-sensitive)
     
     Returns:
@@ -71,22 +77,23 @@ def time_series_by_country(df: pl.DataFrame, country: str) -> pl.DataFrame:
     """
     return (
         df
-        .filter(pl.col("country") == country)
+        .filter(dimension_filter(df, "country", country))
         .group_by("year")
         .agg([
             pl.col("boxes").sum().alias("boxes"),
             pl.col("net_weight_kg").sum().alias("net_weight_kg"),
         ])
         .sort("year")
+        .pipe(collect_frame)
     )
 
 
-def time_series_by_product(df: pl.DataFrame, product: str) -> pl.DataFrame:
+def time_series_by_product(df: FrameLike, product: str) -> pl.DataFrame:
     """
     Generate time series of boxes and kilos for a specific product, aggregated by year.
     
     Args:
-        df: Input DataFrame
+        df: Input DataFrame or LazyFrame
         product: Product name (case-sensitive)
     
     Returns:
@@ -107,22 +114,23 @@ def time_series_by_product(df: pl.DataFrame, product: str) -> pl.DataFrame:
     """
     return (
         df
-        .filter(pl.col("product") == product)
+        .filter(dimension_filter(df, "product", product))
         .group_by("year")
         .agg([
             pl.col("boxes").sum().alias("boxes"),
             pl.col("net_weight_kg").sum().alias("net_weight_kg"),
         ])
         .sort("year")
+        .pipe(collect_frame)
     )
 
 
-def time_series_by_exporter(df: pl.DataFrame, exporter: str) -> pl.DataFrame:
+def time_series_by_exporter(df: FrameLike, exporter: str) -> pl.DataFrame:
     """
     Generate time series of boxes and kilos for a specific exporter, aggregated by year.
     
     Args:
-        df: Input DataFrame
+        df: Input DataFrame or LazyFrame
         exporter: Exporter name (case-sensitive)
     
     Returns:
@@ -143,13 +151,14 @@ def time_series_by_exporter(df: pl.DataFrame, exporter: str) -> pl.DataFrame:
     """
     return (
         df
-        .filter(pl.col("exporter") == exporter)
+        .filter(dimension_filter(df, "exporter", exporter))
         .group_by("year")
         .agg([
             pl.col("boxes").sum().alias("boxes"),
             pl.col("net_weight_kg").sum().alias("net_weight_kg"),
         ])
         .sort("year")
+        .pipe(collect_frame)
     )
 
 
@@ -7,18 +7,23 @@ This module provides functions to get top rankings by:
 - Exporters (by boxes or kilos)
 - Products by country
 - Countries by product
+
+Rankings accept a DataFrame or a LazyFrame; only the ranked rows are
+collected before decoding star-schema keys.
 """
 
 from typing import Optional
 import polars as pl
+from .star import decode_dimensions, dimension_filter, dimension_key
+from .utils import FrameLike, collect_frame
 
 
-def top_products(df: pl.DataFrame, year: Optional[int] = None, n: int = 10) -> pl.DataFrame:
+def top_products(df: FrameLike, year: Optional[int] = None, n: int = 10) -> pl.DataFrame:
     """
     Get top N products by total boxes and kilos.
     
     Args:
-        df: Input DataFrame
+        df: Input DataFrame or LazyFrame
         year: Optional year filter (if None, uses all data)
         n: Number of top products to return
     
@@ -41,22 +46,24 @@ def top_products(df: pl.DataFrame, year: Optional[int] = None, n: int = 10) -> p
     
     return (
         df_filtered
-        .group_by("product")
+        .group_by(dimension_key(df, "product"))
         .agg([
             pl.col("boxes").sum().alias("boxes"),
             pl.col("net_weight_kg").sum().alias("net_weight_kg"),
         ])
         .sort("boxes", descending=True)
         .head(n)
+        .pipe(collect_frame)
+        .pipe(decode_dimensions)
     )
 
 
-def top_countries(df: pl.DataFrame, year: Optional[int] = None, n: int = 10) -> pl.DataFrame:
+def top_countries(df: FrameLike, year: Optional[int] = None, n: int = 10) -> pl.DataFrame:
     """
     Get top N countries by total boxes and kilos.
     
     Args:
-        df: Input DataFrame
+        df: Input DataFrame or LazyFrame
         year: Optional year filter (if None, uses all data)
         n: Number of top countries to return
     
@@ -79,22 +86,24 @@ def top_countries(df: pl.DataFrame, year: Optional[int] = None, n: int = 10) ->
     
     return (
         df_filtered
-        .group_by("country")
+        .group_by(dimension_key(df, "country"))
         .agg([
             pl.col("boxes").sum().alias("boxes"),
             pl.col("net_weight_kg").sum().alias("net_weight_kg"),
         ])
         .sort("boxes", descending=True)
         .head(n)
+        .pipe(collect_frame)
+        .pipe(decode_dimensions)
     )
 
 
-def top_exporters(df: pl.DataFrame, year: Optional[int] = None, n: int = 10) -> pl.DataFrame:
+def top_exporters(df: FrameLike, year: Optional[int] = None, n: int = 10) -> pl.DataFrame:
     """
     Get top N exporters by total boxes and kilos.
     
     Args:
-        df: Input DataFrame
+        df: Input DataFrame or LazyFrame
         year: Optional year filter (if None, uses all data)
         n: Number of top exporters to return
     
@@ -117,22 +126,24 @@ def top_exporters(df: pl.DataFrame, year: Optional[int] = None, n: int = 10) ->
     
     return (
         df_filtered
-        .group_by("exporter")
+        .group_by(dimension_key(df, "exporter"))
         .agg([
             pl.col("boxes").sum().alias("boxes"),
             pl.col("net_weight_kg").sum().alias("net_weight_kg"),
         ])
         .sort("boxes", descending=True)
         .head(n)
+        .pipe(collect_frame)
+        .pipe(decode_dimensions)
     )
 
 
-def top_products_by_country(df: pl.DataFrame, country: str, n: int = 10) -> pl.DataFrame:
+def top_products_by_country(df: FrameLike, country: str, n: int = 10) -> pl.DataFrame:
     """
     Get top N products for a specific country.
     
     Args:
-        df: Input DataFrame
+        df: Input DataFrame or LazyFrame
         country: Country name (case-sensitive)
         n: Number of top products to return
     
@@ -153,23 +164,25 @@ def top_products_by_country(df: pl.DataFrame, country: str, n: int = 10) -> pl.D
     """
     return (
         df
-        .filter(pl.col("country") == country)
-        .group_by("product")
+        .filter(dimension_filter(df, "country", country))
+        .group_by(dimension_key(df, "product"))
         .agg([
             pl.col("boxes").sum().alias("boxes"),
             pl.col("net_weight_kg").sum().alias("net_weight_kg"),
         ])
         .sort("boxes", descending=True)
         .head(n)
+        .pipe(collect_frame)
+        .pipe(decode_dimensions)
     )
 
 
-def top_countries_by_product(df: pl.DataFrame, product: str, n: int = 10) -> pl.DataFrame:
+def top_countries_by_product(df: FrameLike, product: str, n: int = 10) -> pl.DataFrame:
     """
     Get top N countries for a specific product.
     
     Args:
-        df: Input DataFrame
+        df: Input DataFrame or LazyFrame
         product: Product name (case-sensitive)
         n: Number of top countries to return
     
@@ -190,14 +203,16 @@ def top_countries_by_product(df: pl.DataFrame, product: str, n: int = 10) -> pl.
     """
     return (
         df
-        .filter(pl.col("product") == product)
-        .group_by("country")
+        .filter(dimension_filter(df, "product", product))
+        .group_by(dimension_key(df, "country"))
         .agg([
             pl.col("boxes").sum().alias("boxes"),
             pl.col("net_weight_kg").sum().alias("net_weight_kg"),
         ])
         .sort("boxes", descending=True)
         .head(n)
+        .pipe(collect_frame)
+        .pipe(decode_dimensions)
     )
 
 
@@ -6,20 +6,59 @@ This module provides helper functions for:
 - Type casting with error handling
 - String cleaning
 - Number formatting
+- Handling DataFrames and LazyFrames alike
 """
 
-from typing import Dict, Any, Optional, Union
+from typing import Dict, Any, List, Optional, Union
 import polars as pl
 
 
-def ensure_columns(df: pl.DataFrame, expected_schema: Dict[str, str]) -> pl.DataFrame:
+# Analysis functions accept either an eager frame or a lazy query; a
+# LazyFrame lets column selection and filters reach the Parquet reader
+FrameLike = Union[pl.DataFrame, pl.LazyFrame]
+
+
+def frame_columns(df: FrameLike) -> List[str]:
+    """
+    Column names of a DataFrame or LazyFrame (without reading data).
+    
+    Args:
+        df: Input DataFrame or LazyFrame
+    
+    Returns:
+        List of column names
+    """
+    if isinstance(df, pl.LazyFrame):
+        return df.collect_schema().names()
+    return df.columns
+
+
+def collect_frame(df: FrameLike) -> pl.DataFrame:
+    """
+    Materialize a LazyFrame; DataFrames are returned as is.
+    
+    Args:
+        df: Input DataFrame or LazyFrame
+    
+    Returns:
+        DataFrame
+    """
+    if isinstance(df, pl.LazyFrame):
+        return df.collect()
+    return df
+
+
+def ensure_columns(df: FrameLike, expected_schema: Dict[str, str]) -> FrameLike:
     """
     Ensure DataFrame has all required columns with correct types.
     
+    A LazyFrame stays lazy: the selection and casts are added to the query.
+    
     Args:
-        df: Input Polars DataFrame
+        df: Input Polars DataFrame or LazyFrame
         expected_schema: Dictionary mapping column names to expected types
             e.g., {"season": "str", "week": "int", "boxes": "int"}
+            ("id" is used for UInt32 star-schema dimension keys)
     
     Returns:
         DataFrame with only the expected columns in the correct order
@@ -31,7 +70,8 @@ def ensure_columns(df: pl.DataFrame, expected_schema: Dict[str, str]) -> pl.Data
         >>> schema = {"season": "str", "week": "int", "boxes": "int"}
         >>> df_clean = ensure_columns(df, schema)
     """
-    missing_cols = set(expected_schema.keys()) - set(df.columns)
+    schema = df.collect_schema()
+    missing_cols = set(expected_schema.keys()) - set(schema.names())
     if missing_cols:
         raise ValueError(f"Missing required columns: {missing_cols}")
     
@@ -43,12 +83,13 @@ def ensure_columns(df: pl.DataFrame, expected_schema: Dict[str, str]) -> pl.Data
         "str": pl.Utf8,
         "int": pl.Int64,
         "float": pl.Float64,
+        "id": pl.UInt32,
     }
     
     casts = []
     for col, expected_type in expected_schema.items():
         polars_type = type_mapping.get(expected_type)
-        if polars_type and df_selected[col].dtype != polars_type:
+        if polars_type and schema[col] != polars_type:
             casts.append(pl.col(col).cast(polars_type))
     
     if casts:
@@ -151,12 +192,12 @@ def remove_thousand_sep(x: Union[str, int, float]) -> str:
     return str(x).replace(".", "").replace(",", "")
 
 
-def validate_types(df: pl.DataFrame, expected_schema: Dict[str, str]) -> bool:
+def validate_types(df: FrameLike, expected_schema: Dict[str, str]) -> bool:
     """
     Validate that DataFrame columns match expected types.
     
     Args:
-        df: Input DataFrame
+        df: Input DataFrame or LazyFrame (only its schema is checked)
         expected_schema: Dictionary mapping column names to expected types
     
     Returns:
@@ -170,14 +211,16 @@ def validate_types(df: pl.DataFrame, expected_schema: Dict[str, str]) -> bool:
         "str": (pl.Utf8,),
         "int": (pl.Int64, pl.Int32, pl.Int16, pl.Int8),
         "float": (pl.Float64, pl.Float32),
+        "id": (pl.UInt32,),
     }
     
+    schema = df.collect_schema()
     for col, expected_type in expected_schema.items():
-        if col not in df.columns:
+        if col not in schema:
             return False
         
         polars_types = type_mapping.get(expected_type, ())
-        if df[col].dtype not in polars_types:
+        if schema[col] not in polars_types:
             return False
     
     return True
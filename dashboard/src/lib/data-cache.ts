@@ -4,13 +4,12 @@ import { access } from 'fs/promises';
 import { constants } from 'fs';
 import path from 'path';
 
-const DEFAULT_PARQUET_PATH = path.resolve(
-	process.cwd(),
-	'..',
-	'data',
-	'dataset_dashboard_mvp.parquet'
-);
-const PARQUET_PATH = process.env.DATA_DASHBOARD_PATH?.trim() || DEFAULT_PARQUET_PATH;
+// Sin DATA_DASHBOARD_PATH, el dataset se resuelve por nombre en el registro
+// de scripts/dataset_registry.py (archivo materializado o vista virtual)
+const SCRIPTS_DIR = path.resolve(process.cwd(), '..', 'scripts');
+const PARQUET_PATH = process.env.DATA_DASHBOARD_PATH?.trim() || null;
+const DATASET_NAME = process.env.DATA_DASHBOARD_DATASET?.trim() || 'dashboard_mvp';
+const DATA_SOURCE = PARQUET_PATH ?? `registro:${DATASET_NAME}`;
 const PYTHON_EXECUTABLE = process.env.DATA_PYTHON_BIN?.trim() || 'python3';
 
 const DEFAULT_MAX_CHUNK_SIZE = 512 * 1024 * 1024; // 512MB por defecto
@@ -80,6 +79,8 @@ class DataCache {
 	 * Valida que el archivo Parquet exista y sea accesible
 	 */
 	private async validateParquetFile(): Promise<void> {
+		// Los datasets del registro los valida Python (pueden ser virtuales)
+		if (PARQUET_PATH === null) return;
 		try {
 			await access(PARQUET_PATH, constants.F_OK | constants.R_OK);
 		} catch {
@@ -110,7 +111,7 @@ class DataCache {
 			};
 			
 			console.log(
-				`[INFO] Iniciando carga de datos desde: ${PARQUET_PATH} (límite ${MAX_CHUNK_SIZE} bytes)`
+				`[INFO] Iniciando carga de datos desde: ${DATA_SOURCE} (límite ${MAX_CHUNK_SIZE} bytes)`
 			);
 			if (DATA_CACHE_ROW_LIMIT !== null) {
 				console.log(`[INFO] Aplicando límite de ${DATA_CACHE_ROW_LIMIT} registros en Python`);
@@ -129,13 +130,20 @@ import sys
 
 ROW_LIMIT = ${rowLimitLiteral}
 COLUMNS = ${columnsLiteral}
+PARQUET_PATH = ${PARQUET_PATH !== null ? JSON.stringify(PARQUET_PATH) : 'None'}
 
 try:
-    df = pl.read_parquet("${PARQUET_PATH}")
+    if PARQUET_PATH:
+        lf = pl.scan_parquet(PARQUET_PATH)
+    else:
+        sys.path.insert(0, ${JSON.stringify(SCRIPTS_DIR)})
+        from dataset_registry import scan_dataset
+        lf = scan_dataset(${JSON.stringify(DATASET_NAME)})
     if ROW_LIMIT:
-        df = df.head(ROW_LIMIT)
+        lf = lf.head(ROW_LIMIT)
     if COLUMNS:
-        df = df.select(COLUMNS)
+        lf = lf.select(COLUMNS)
+    df = lf.collect()
     # Convertir a JSON línea por línea para streaming eficiente
     records = df.to_dicts()
     for record in records:
@@ -1,96 +1,163 @@
+import argparse
+import os
+import uuid
+from pathlib import Path
+
 import polars as pl
 
-def procesar_dataset_maestro(file_path, output_path="data/dataset_dashboard_ready.parquet"):
+from dashboard_columns import (
+    PARTS_SORT_COLUMNS,
+    add_dashboard_columns,
+    missing_dashboard_parts,
+    scan_dashboard_parts,
+)
+from dataset_registry import REGISTRY, scan_dataset
+from lineage import merge_season_totals, record_totals, season_totals
+from parquet_profiles import PROFILES, RowGroupWriter
+
+
+def procesar_dataset_maestro(file_path, output_path="data/dataset_dashboard_ready.parquet", profile="dashboard", parts_dir=None):
     """
     MOTOR DE TRANSFORMACIÓN DE DATOS (ETL)
     Autor: Me-Vi
-    
+
     Este script aplica las reglas de negocio definidas en el Plan Maestro:
     1. Ordenamiento Temporal Estricto (Season Sort).
     2. Creación de Índice de Semana Absoluta (para gráficos continuos).
     3. Normalización de Entidades.
     4. Cálculo de Métricas Base (Peso Unitario).
+
+    Procesa una season a la vez (lazy, streaming) y escribe cada partición ya
+    ordenada, con memoria acotada a la season más grande. El archivo
+    resultante es idéntico byte a byte al de ordenar el dataset completo con
+    orden estable (las filas empatadas conservan el orden de entrada).
+
+    Con parts_dir (normalize.py --dashboard) las columnas derivadas ya vienen
+    calculadas por semana: file_path es el directorio de Parquets semanales
+    (data_clean/, para detectar partes faltantes y huérfanas) y el dataset es
+    la concatenación de las partes de esas semanas, ordenada por season, sin
+    pasar por combine, clean_nulls ni la transformación completa.
+
+    file_path puede ser también el nombre de un dataset del registro
+    (dataset_registry.py), p. ej. "clean", que se resuelve aunque sea virtual.
     """
-    print(f"--- [ETL] INICIANDO PROCESAMIENTO: {file_path} ---")
-    
-    # 1. CARGA Y LIMPIEZA INICIAL
-    try:
-        df = pl.read_parquet(file_path)
-    except:
-        print("Error crítico: No se encontró el archivo.")
-        return
-
-    # Normalizar columnas a minúsculas y strip (si es necesario)
-    # Nota: El dataset ya viene con columnas en minúsculas, pero mantenemos esto por seguridad
-    df = df.rename({col: col.lower().strip() for col in df.columns})
-    
-    # Limpieza de Strings (Evita duplicados en Rankings)
-    cols_texto = ['variety', 'importer', 'exporter', 'market', 'region']
-    for col in cols_texto:
-        if col in df.columns:
-            df = df.with_columns(
-                pl.col(col).str.strip_chars().str.to_titlecase().alias(col)
-            )
+    if parts_dir is not None:
+        print(f"--- [ETL] INICIANDO ENSAMBLADO DESDE PARTES: {parts_dir} ---")
+        missing = missing_dashboard_parts(Path(file_path), Path(parts_dir))
+        if missing:
+            print(f"Error crítico: {len(missing)} semanas sin parte del dashboard o desactualizadas "
+                  f"(p. ej. {missing[0]}). Ejecuta: python scripts/normalize.py --dashboard")
+            return
+        lf = scan_dashboard_parts(Path(parts_dir), Path(file_path))
+        sort_columns = PARTS_SORT_COLUMNS
+    else:
+        print(f"--- [ETL] INICIANDO PROCESAMIENTO: {file_path} ---")
 
-    # 2. LÓGICA TEMPORAL (EL CORAZÓN DEL ORDENAMIENTO)
-    print("--- [ETL] Aplicando Lógica de Temporada (Season Sort) ---")
-    
-    # Extraer inicio y fin de temporada del string "2024-2025"
-    if 'season' in df.columns:
-        df = df.with_columns([
-            pl.col("season").str.split("-").list.get(0).cast(pl.Int32).alias("season_start_year"),
-            pl.col("season").str.split("-").list.get(1).cast(pl.Int32).alias("season_end_year")
-        ])
-
-    # CREACIÓN DE "ABSOLUTE SEASON WEEK"
-    # Lógica: Si la temporada empieza aprox en semana 35:
-    # - Semanas 35 a 53 del año 1 -> Índices 1 a 19
-    # - Semanas 1 a 34 del año 2 -> Índices 20 a 53
-    # Esto permite que al graficar, enero aparezca DESPUÉS de diciembre.
-    
-    SPLIT_WEEK = 35 # Semana de inicio de temporada (basado en análisis de datos reales)
-    
-    df = df.with_columns(
-        pl.when(pl.col("week") >= SPLIT_WEEK)
-        .then(pl.col("week") - SPLIT_WEEK + 1) # Ej: Sem 35 -> Indice 1, Sem 53 -> Indice 19
-        .otherwise(pl.col("week") + (53 - SPLIT_WEEK) + 1) # Ej: Sem 1 -> Indice 20, Sem 34 -> Indice 53
-        .alias("absolute_season_week")
-    )
-    
-    # 3. CÁLCULO DE MÉTRICAS DERIVADAS
-    print("--- [ETL] Calculando Métricas Derivadas ---")
-    
-    if 'boxes' in df.columns and 'net_weight_kg' in df.columns:
-        df = df.with_columns([
-            # Unit Weight (para detección de anomalías en gráficos)
-            (pl.col("net_weight_kg") / pl.col("boxes")).fill_nan(0).alias("unit_weight_kg"),
-            
-            # Flag de Outlier (Regla simple: < 1kg o > 25kg por caja)
-            pl.when((pl.col("net_weight_kg") / pl.col("boxes") < 1) | 
-                    (pl.col("net_weight_kg") / pl.col("boxes") > 25))
-              .then(True)
-              .otherwise(False)
-              .alias("is_data_outlier")
-        ])
+        # 1. CARGA Y LIMPIEZA INICIAL (lazy)
+        if file_path in REGISTRY:
+            try:
+                lf = scan_dataset(file_path)
+            except FileNotFoundError as e:
+                print(f"Error crítico: {e}")
+                return
+        elif Path(file_path).exists():
+            lf = pl.scan_parquet(file_path)
+        else:
+            print("Error crítico: No se encontró el archivo.")
+            return
+
+        # 2. LÓGICA TEMPORAL y 3. CÁLCULO DE MÉTRICAS DERIVADAS
+        print("--- [ETL] Aplicando Lógica de Temporada (Season Sort) ---")
+        print("--- [ETL] Calculando Métricas Derivadas ---")
+        lf = add_dashboard_columns(lf)
+        sort_columns = ["absolute_season_week"]
+
+    exportar_dataset(lf, output_path, profile, sort_columns)
+
+
+def exportar_dataset(lf, output_path="data/dataset_dashboard_ready.parquet", profile="dashboard", sort_columns=("absolute_season_week",), keep_seasons=None):
+    """
+    Ordenar por season y escribir el dataset del dashboard (pasos 4 y 5).
+
+    lf ya trae las columnas derivadas: viene de un Parquet, de las partes
+    semanales o de un DataFrame en memoria (datacl run-all).
 
+    Devuelve las particiones ya ordenadas de las seasons en keep_seasons (en
+    el orden del archivo), para que la etapa MVP no tenga que releerlas.
+    """
+    kept = []
     # 4. ORDENAMIENTO FINAL FÍSICO
-    # Importante para que los gráficos de línea salgan ordenados por defecto
-    df = df.sort(["season", "absolute_season_week"])
+    # Importante para que los gráficos de línea salgan ordenados por defecto.
+    # Equivale a sort(["season", "absolute_season_week"], maintain_order=True):
+    # las seasons se recorren en orden (nulos primero) y cada una se ordena
+    # por separado (las partes semanales se ordenan además como en combine.py)
+    seasons = lf.select(pl.col("season").unique().sort()).collect(engine="streaming")["season"].to_list()
+    total_rows = lf.select(pl.len()).collect().item()
 
     # 5. EXPORTACIÓN
-    print(f"--- [ETL] Exportando Dataset Maestro ({df.shape[0]} filas) ---")
-    # Usar compresión "snappy" para compatibilidad con parquetjs-lite
-    df.write_parquet(
-        output_path,
-        compression="snappy",
-        use_pyarrow=True
-    )
+    print(f"--- [ETL] Exportando Dataset Maestro ({total_rows} filas) ---")
+    # Perfil "dashboard" (snappy, data pages v1) para compatibilidad con parquetjs-lite
+    output_path = Path(output_path)
+    tmp_path = output_path.with_name(f".{output_path.name}.{uuid.uuid4().hex}.tmp")
+
+    # Row groups completos, como write_table sobre el dataset completo
+    writer = RowGroupWriter(tmp_path, profile)
+    seasons_totals = {}
+    previews = []
+    try:
+        for season in seasons:
+            predicate = pl.col("season").is_null() if season is None else pl.col("season") == season
+            part = (
+                lf.filter(predicate)
+                .collect(engine="streaming")
+                .sort(list(sort_columns), maintain_order=True)
+            )
+            merge_season_totals(seasons_totals, season_totals(part))
+            if keep_seasons is not None and season in keep_seasons:
+                kept.append(part)
+            previews.append(part.select(["season", "year", "week", "absolute_season_week"]).unique())
+            writer.write(part.to_arrow())
+
+        writer.close(empty=lf.limit(0).collect().to_arrow() if not seasons else None)
+        os.replace(tmp_path, output_path)
+    finally:
+        writer.abort()
+        tmp_path.unlink(missing_ok=True)
+
+    # Totales por season al ledger de linaje (ver lineage.py)
+    record_totals(seasons_totals, "transform", output_path)
     print(f"--- [ÉXITO] Archivo guardado en: {output_path}")
-    
-    # Vista previa de validación
+
+    # Vista previa de validación (solo las combinaciones únicas de cada partición)
     print("\nVista Previa de Ordenamiento Temporal (Check de Año Nuevo):")
-    print(df.select(["season", "year", "week", "absolute_season_week"]).unique().sort("absolute_season_week").head(20))
+    if previews:
+        print(pl.concat(previews).unique().sort("absolute_season_week", maintain_order=True).head(20))
+
+    return kept
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generar dataset listo para el dashboard.")
+    parser.add_argument(
+        "--profile",
+        choices=list(PROFILES),
+        default="dashboard",
+        help="Perfil de escritura Parquet (default: dashboard)",
+    )
+    parser.add_argument(
+        "--from-parts",
+        action="store_true",
+        help="Ensamblar desde las partes semanales de data_dashboard/ (normalize.py --dashboard)",
+    )
+    args = parser.parse_args()
+
+    if args.from_parts:
+        # Concatenar las partes semanales (sin recalcular columnas derivadas)
+        procesar_dataset_maestro("data_clean", profile=args.profile, parts_dir="data_dashboard")
+    else:
+        # Procesar el dataset maestro limpio (materializado o virtual, ver dataset_registry.py)
+        procesar_dataset_maestro("clean", profile=args.profile)
+
 
 if __name__ == "__main__":
-    # Procesar el dataset maestro limpio
-    procesar_dataset_maestro("data/exports_10_years_clean.parquet")
\ No newline at end of file
+    main()
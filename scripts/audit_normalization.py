@@ -3,13 +3,20 @@ Script de auditoría de normalización.
 
 Este script compara los datos CSV originales con los Parquets normalizados,
 calculando sumas de boxes y kilos para detectar discrepancias en la normalización.
+
+Los kilos se suman en gramos enteros (ver fixed_point.py), así que los deltas
+son exactos y no dependen del orden de suma.
 """
 
+import argparse
 import polars as pl
 from pathlib import Path
 from typing import Dict, Any, Optional, List
 from tqdm import tqdm
 
+from fixed_point import FIXED_KILOS_COLUMN, fixed_kilos_sum, fixed_to_kilos, to_fixed_kilos
+from resources import plan_stage, print_plan, process_pool, track_usage
+
 
 def detect_csv_encoding_and_separator(csv_path: Path) -> tuple[str, str]:
 	"""
@@ -38,12 +45,15 @@ def detect_csv_encoding_and_separator(csv_path: Path) -> tuple[str, str]:
 	return 'utf-8', ','
 
 
-def load_csv_totals(csv_path: Path) -> Optional[Dict[str, Any]]:
+def load_csv_totals(csv_path: Path, streaming: bool = False) -> Optional[Dict[str, Any]]:
 	"""
 	Cargar CSV y calcular totales de boxes y kilos.
 
 	Args:
 		csv_path: Path al archivo CSV
+		streaming: Si True (archivo grande, ver resources.py), los totales se
+			calculan con scan_csv en modo streaming sin cargar el CSV completo
+			(solo para CSV UTF-8; otros encodings se leen en memoria)
 
 	Returns:
 		Dict con totales calculados o None si hay error
@@ -53,17 +63,28 @@ def load_csv_totals(csv_path: Path) -> Optional[Dict[str, Any]]:
 		
 		# Cargar CSV sin inferir schema automáticamente (todo como string)
 		# Esto preserva los separadores de miles que Polars interpretaría como decimales
-		df = pl.read_csv(
-			csv_path,
-			encoding=encoding,
-			separator=separator,
-			ignore_errors=True,
-			try_parse_dates=False,
-			infer_schema_length=0  # No inferir schema, leer todo como string
-		)
+		if streaming and encoding == 'utf-8':
+			lf = pl.scan_csv(
+				csv_path,
+				separator=separator,
+				ignore_errors=True,
+				try_parse_dates=False,
+				infer_schema_length=0
+			)
+		else:
+			streaming = False
+			lf = pl.read_csv(
+				csv_path,
+				encoding=encoding,
+				separator=separator,
+				ignore_errors=True,
+				try_parse_dates=False,
+				infer_schema_length=0  # No inferir schema, leer todo como string
+			).lazy()
 		
 		# Verificar que existan las columnas necesarias
-		if "Boxes" not in df.columns or "Kilograms" not in df.columns:
+		columns = lf.collect_schema().names()
+		if "Boxes" not in columns or "Kilograms" not in columns:
 			return None
 		
 		# Remover separadores de miles "." y convertir a numérico
@@ -85,50 +106,53 @@ def load_csv_totals(csv_path: Path) -> Optional[Dict[str, Any]]:
 			.cast(pl.Float64, strict=False)
 		)
 		
-		df_processed = df.with_columns([
-			boxes_series.alias("boxes_clean"),
-			kilos_series.alias("kilos_clean")
-		])
-		
-		# Calcular sumas
-		boxes_sum = df_processed["boxes_clean"].sum()
-		kilos_sum = df_processed["kilos_clean"].sum()
-		rows_count = len(df_processed)
+		# Calcular sumas (kilos en gramos enteros)
+		boxes_sum, kilos_sum_g, rows_count = lf.select([
+			boxes_series.sum(),
+			to_fixed_kilos(kilos_series).sum(),
+			pl.len()
+		]).collect(engine="streaming" if streaming else "auto").row(0)
 		
 		return {
 			"boxes_csv_sum": boxes_sum if boxes_sum is not None else 0,
-			"kilos_csv_sum": kilos_sum if kilos_sum is not None else 0.0,
+			"kilos_csv_sum": fixed_to_kilos(kilos_sum_g),
+			"kilos_csv_g": kilos_sum_g or 0,
 			"rows_csv": rows_count
 		}
 	except Exception as e:
 		return None
 
 
-def load_parquet_totals(parquet_path: Path) -> Optional[Dict[str, Any]]:
+def load_parquet_totals(parquet_path: Path, streaming: bool = False) -> Optional[Dict[str, Any]]:
 	"""
 	Cargar Parquet y calcular totales de boxes y net_weight_kg.
 
 	Args:
 		parquet_path: Path al archivo Parquet
+		streaming: Si True, los totales se calculan en modo streaming
 
 	Returns:
 		Dict con totales calculados o None si hay error
 	"""
 	try:
-		df = pl.read_parquet(parquet_path)
+		lf = pl.scan_parquet(parquet_path)
+		columns = lf.collect_schema().names()
 		
 		# Verificar que existan las columnas necesarias
-		if "boxes" not in df.columns or "net_weight_kg" not in df.columns:
+		if "boxes" not in columns or ("net_weight_kg" not in columns and FIXED_KILOS_COLUMN not in columns):
 			return None
 		
-		# Calcular sumas
-		boxes_sum = df["boxes"].sum()
-		kilos_sum = df["net_weight_kg"].sum()
-		rows_count = len(df)
+		# Calcular sumas (kilos en gramos enteros; usa net_weight_g si existe)
+		boxes_sum, kilos_sum_g, rows_count = lf.select([
+			pl.col("boxes").sum(),
+			fixed_kilos_sum(columns),
+			pl.len()
+		]).collect(engine="streaming" if streaming else "auto").row(0)
 		
 		return {
 			"boxes_parquet_sum": boxes_sum if boxes_sum is not None else 0,
-			"kilos_parquet_sum": kilos_sum if kilos_sum is not None else 0.0,
+			"kilos_parquet_sum": fixed_to_kilos(kilos_sum_g),
+			"kilos_parquet_g": kilos_sum_g or 0,
 			"rows_parquet": rows_count
 		}
 	except Exception as e:
@@ -150,7 +174,7 @@ def compute_discrepancies(
 		Dict con discrepancias y status
 	"""
 	delta_boxes = parquet_totals["boxes_parquet_sum"] - csv_totals["boxes_csv_sum"]
-	delta_kilos = parquet_totals["kilos_parquet_sum"] - csv_totals["kilos_csv_sum"]
+	delta_kilos = fixed_to_kilos(parquet_totals["kilos_parquet_g"] - csv_totals["kilos_csv_g"])
 	
 	# Determinar status
 	if delta_boxes == 0 and delta_kilos == 0:
@@ -165,63 +189,98 @@ def compute_discrepancies(
 	}
 
 
-def audit_all_files(data_raw_dir: Path, data_clean_dir: Path) -> List[Dict[str, Any]]:
+def audit_file(csv_file: Path, data_clean_dir: Path, streaming: bool = False) -> Optional[Dict[str, Any]]:
+	"""
+	Auditar un CSV contra su Parquet normalizado (worker del pool de procesos).
+
+	Args:
+		csv_file: CSV original
+		data_clean_dir: Directorio con Parquets normalizados
+		streaming: Calcular los totales en modo streaming (archivos grandes)
+
+	Returns:
+		Resultado de auditoría, o None si alguno de los archivos no se pudo procesar
+	"""
+	# Obtener nombre del Parquet correspondiente
+	parquet_name = csv_file.stem + ".parquet"
+	parquet_path = data_clean_dir / parquet_name
+	
+	# Cargar totales del CSV
+	csv_totals = load_csv_totals(csv_file, streaming)
+	if csv_totals is None:
+		print(f"  ⚠️  No se pudo procesar CSV: {csv_file.name}")
+		return None
+	
+	# Cargar totales del Parquet
+	if not parquet_path.exists():
+		print(f"  ⚠️  Parquet no encontrado: {parquet_name}")
+		return None
+	
+	parquet_totals = load_parquet_totals(parquet_path, streaming)
+	if parquet_totals is None:
+		print(f"  ⚠️  No se pudo procesar Parquet: {parquet_name}")
+		return None
+	
+	# Calcular discrepancias
+	discrepancies = compute_discrepancies(csv_totals, parquet_totals)
+	
+	return {
+		"file": csv_file.name,
+		"boxes_csv": csv_totals["boxes_csv_sum"],
+		"boxes_parquet": parquet_totals["boxes_parquet_sum"],
+		"delta_boxes": discrepancies["delta_boxes"],
+		"kilos_csv": csv_totals["kilos_csv_sum"],
+		"kilos_parquet": parquet_totals["kilos_parquet_sum"],
+		"delta_kilos": discrepancies["delta_kilos"],
+		"rows_csv": csv_totals["rows_csv"],
+		"rows_parquet": parquet_totals["rows_parquet"],
+		"status": discrepancies["status"]
+	}
+
+
+def audit_all_files(
+	data_raw_dir: Path,
+	data_clean_dir: Path,
+	workers: Optional[int] = None
+) -> List[Dict[str, Any]]:
 	"""
 	Auditar todos los archivos CSV y sus Parquets correspondientes.
 
+	Los archivos se reparten en procesos según el plan de recursos (ver
+	resources.py); los resultados conservan el orden de los CSV.
+
 	Args:
 		data_raw_dir: Directorio con CSVs originales
 		data_clean_dir: Directorio con Parquets normalizados
+		workers: Procesos pedidos (None = según CPUs y memoria)
 
 	Returns:
 		Lista de resultados de auditoría
 	"""
 	csv_files = sorted(data_raw_dir.glob("*.csv"))
-	audit_results = []
 	
 	print(f"Auditando {len(csv_files)} archivos...\n")
+	if not csv_files:
+		return []
 	
-	for csv_file in tqdm(csv_files, desc="Auditando"):
-		# Obtener nombre del Parquet correspondiente
-		parquet_name = csv_file.stem + ".parquet"
-		parquet_path = data_clean_dir / parquet_name
-		
-		# Cargar totales del CSV
-		csv_totals = load_csv_totals(csv_file)
-		if csv_totals is None:
-			print(f"  ⚠️  No se pudo procesar CSV: {csv_file.name}")
-			continue
-		
-		# Cargar totales del Parquet
-		if not parquet_path.exists():
-			print(f"  ⚠️  Parquet no encontrado: {parquet_name}")
-			continue
-		
-		parquet_totals = load_parquet_totals(parquet_path)
-		if parquet_totals is None:
-			print(f"  ⚠️  No se pudo procesar Parquet: {parquet_name}")
-			continue
-		
-		# Calcular discrepancias
-		discrepancies = compute_discrepancies(csv_totals, parquet_totals)
-		
-		# Agregar resultado
-		result = {
-			"file": csv_file.name,
-			"boxes_csv": csv_totals["boxes_csv_sum"],
-			"boxes_parquet": parquet_totals["boxes_parquet_sum"],
-			"delta_boxes": discrepancies["delta_boxes"],
-			"kilos_csv": csv_totals["kilos_csv_sum"],
-			"kilos_parquet": parquet_totals["kilos_parquet_sum"],
-			"delta_kilos": discrepancies["delta_kilos"],
-			"rows_csv": csv_totals["rows_csv"],
-			"rows_parquet": parquet_totals["rows_parquet"],
-			"status": discrepancies["status"]
-		}
-		
-		audit_results.append(result)
+	plan = plan_stage("audit", max(path.stat().st_size for path in csv_files), len(csv_files), workers)
+	print_plan(plan)
+	
+	with track_usage("audit", plan):
+		if plan["workers"] == 1:
+			results = [
+				audit_file(csv_file, data_clean_dir, plan["streaming"])
+				for csv_file in tqdm(csv_files, desc="Auditando")
+			]
+		else:
+			with process_pool(plan) as pool:
+				results = list(tqdm(
+					pool.map(audit_file, csv_files, [data_clean_dir] * len(csv_files), [plan["streaming"]] * len(csv_files)),
+					total=len(csv_files),
+					desc="Auditando"
+				))
 	
-	return audit_results
+	return [result for result in results if result is not None]
 
 
 def generate_audit_report(audit_results: List[Dict[str, Any]], output_path: Path) -> None:
@@ -305,8 +364,20 @@ def print_summary(audit_results: List[Dict[str, Any]]) -> None:
 	print("="*60)
 
 
+def parse_args() -> argparse.Namespace:
+	parser = argparse.ArgumentParser(description="Auditar Parquets normalizados contra los CSV originales.")
+	parser.add_argument(
+		"--workers",
+		type=int,
+		default=None,
+		help="Procesos para auditar archivos en paralelo (default: según CPUs y memoria)",
+	)
+	return parser.parse_args()
+
+
 def main():
 	"""Función principal del script de auditoría."""
+	args = parse_args()
 	data_raw_dir = Path(__file__).parent.parent / "data_raw"
 	data_clean_dir = Path(__file__).parent.parent / "data_clean"
 	audit_dir = Path(__file__).parent.parent / "audit"
@@ -331,7 +402,7 @@ def main():
 	print(f"Reporte de salida: {output_path}")
 	
 	# Auditar todos los archivos
-	audit_results = audit_all_files(data_raw_dir, data_clean_dir)
+	audit_results = audit_all_files(data_raw_dir, data_clean_dir, args.workers)
 	
 	if not audit_results:
 		print("\nNo se encontraron archivos para auditar.")
@@ -0,0 +1,165 @@
+"""
+Benchmark de perfiles de escritura Parquet.
+
+Este script escribe el mismo dataset con cada perfil de parquet_profiles.py
+y mide, para cada uno:
+- Tamaño del archivo
+- Tiempo de escritura
+- Tiempo de lectura completa (scan de todas las columnas)
+- Tiempo de búsqueda puntual (filtro por un exporter)
+
+Uso:
+	python scripts/benchmark_profiles.py
+	python scripts/benchmark_profiles.py --input data/dataset_dashboard_ready.parquet --repeat 5
+"""
+
+import argparse
+import json
+import tempfile
+import time
+import polars as pl
+from pathlib import Path
+from typing import Any, Dict, List
+
+from parquet_profiles import PROFILES, write_parquet_profile
+
+
+def time_call(fn, repeat: int) -> float:
+	"""
+	Medir el mejor tiempo (segundos) de varias ejecuciones de fn.
+
+	Args:
+		fn: Función sin argumentos a medir
+		repeat: Número de repeticiones
+
+	Returns:
+		Mejor tiempo en segundos
+	"""
+	best = float("inf")
+	for _ in range(repeat):
+		start = time.perf_counter()
+		fn()
+		best = min(best, time.perf_counter() - start)
+	return best
+
+
+def benchmark_profile(
+	df: pl.DataFrame,
+	profile: str,
+	output_dir: Path,
+	lookup_value: str,
+	repeat: int
+) -> Dict[str, Any]:
+	"""
+	Escribir df con un perfil y medir tamaño, escritura, lectura y búsqueda.
+
+	Args:
+		df: Dataset a escribir
+		profile: Nombre del perfil
+		output_dir: Directorio temporal de salida
+		lookup_value: Exporter usado en la búsqueda puntual
+		repeat: Repeticiones por medición
+
+	Returns:
+		Dict con métricas del perfil
+	"""
+	path = output_dir / f"{profile}.parquet"
+
+	write_time = time_call(lambda: write_parquet_profile(df, path, profile), repeat)
+	scan_time = time_call(lambda: pl.read_parquet(path), repeat)
+	lookup_time = time_call(
+		lambda: pl.scan_parquet(path).filter(pl.col("exporter") == lookup_value).collect(),
+		repeat
+	)
+
+	return {
+		"profile": profile,
+		"size_mb": path.stat().st_size / (1024 * 1024),
+		"write_s": write_time,
+		"full_scan_s": scan_time,
+		"point_lookup_s": lookup_time,
+	}
+
+
+def print_results(results: List[Dict[str, Any]], lookup_value: str) -> None:
+	"""
+	Imprimir tabla comparativa de perfiles.
+
+	Args:
+		results: Lista de métricas por perfil
+		lookup_value: Exporter usado en la búsqueda puntual
+	"""
+	print("\n" + "="*72)
+	print("BENCHMARK DE PERFILES PARQUET")
+	print("="*72)
+	print(f"Búsqueda puntual: exporter == {lookup_value!r}\n")
+	print(f"{'Perfil':<12}{'Tamaño (MB)':>14}{'Escritura (s)':>15}{'Scan (s)':>12}{'Lookup (s)':>12}")
+	print("-"*72)
+	for r in results:
+		print(
+			f"{r['profile']:<12}{r['size_mb']:>14,.2f}{r['write_s']:>15.3f}"
+			f"{r['full_scan_s']:>12.3f}{r['point_lookup_s']:>12.3f}"
+		)
+	print("="*72)
+
+
+def parse_args() -> argparse.Namespace:
+	project_root = Path(__file__).parent.parent
+	parser = argparse.ArgumentParser(description="Comparar perfiles de escritura Parquet.")
+	parser.add_argument(
+		"--input",
+		type=Path,
+		default=project_root / "data" / "exports_10_years_clean.parquet",
+		help="Dataset de entrada (default: data/exports_10_years_clean.parquet)",
+	)
+	parser.add_argument(
+		"--profiles",
+		type=str,
+		default=",".join(PROFILES),
+		help="Perfiles separados por coma (default: todos)",
+	)
+	parser.add_argument("--repeat", type=int, default=3, help="Repeticiones por medición (default: 3)")
+	parser.add_argument(
+		"--output",
+		type=Path,
+		default=None,
+		help="Ruta opcional para guardar resultados en JSON",
+	)
+	return parser.parse_args()
+
+
+def main():
+	"""Función principal del benchmark."""
+	args = parse_args()
+
+	if not args.input.exists():
+		print(f"Error: Archivo {args.input} no existe")
+		return
+
+	profiles = [p.strip() for p in args.profiles.split(",") if p.strip()]
+
+	print(f"Cargando dataset: {args.input}")
+	df = pl.read_parquet(args.input)
+	print(f"Dataset cargado: {len(df):,} filas, {len(df.columns)} columnas")
+
+	# Exporter de frecuencia mediana: ni el más grande ni uno ausente
+	counts = df.group_by("exporter").len().drop_nulls("exporter").sort("len")
+	lookup_value = counts["exporter"][len(counts) // 2]
+
+	results = []
+	with tempfile.TemporaryDirectory() as tmp_dir:
+		for profile in profiles:
+			print(f"Midiendo perfil: {profile}...")
+			results.append(benchmark_profile(df, profile, Path(tmp_dir), lookup_value, args.repeat))
+
+	print_results(results, lookup_value)
+
+	if args.output:
+		args.output.parent.mkdir(parents=True, exist_ok=True)
+		with open(args.output, 'w', encoding='utf-8') as f:
+			json.dump({"input": str(args.input), "lookup_exporter": lookup_value, "results": results}, f, indent=2)
+		print(f"\n✓ Resultados guardados: {args.output}")
+
+
+if __name__ == "__main__":
+	main()
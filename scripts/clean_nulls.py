@@ -3,113 +3,362 @@ Script de limpieza de valores nulos del dataset maestro.
 
 Este script rellena valores nulos con "SN" (Sin Nombre):
 - Para columnas de tipo string: rellena con "SN"
+- Para columnas numéricas (Int64/Float64): rellena con 0
 - Mantiene duplicados (no los elimina)
 - Lo importante es mantener el total de cajas y kilos correcto
+
+El dataset se procesa por lotes (pyarrow iter_batches → ParquetWriter): el
+censo de nulos, el relleno y los totales del ledger de linaje se calculan en
+la misma pasada, con memoria acotada a un row group.
+
+Con --virtual no se escribe una segunda copia del dataset: solo se guarda la
+especificación de relleno en data/exports_10_years_clean.virtual.json y
+analysis/loader.py aplica el relleno al leer exports_10_years.parquet. La
+copia limpia que hubiera (ruta histórica y snapshots) se retira.
+
+Uso:
+	python scripts/clean_nulls.py
+	python scripts/clean_nulls.py --split
+	python scripts/clean_nulls.py --virtual
 """
 
+import argparse
+import json
+import os
+import uuid
 import polars as pl
+import pyarrow.parquet as pq
+from contextlib import ExitStack
+from datetime import datetime, timezone
 from pathlib import Path
-from typing import Dict, List
-from tqdm import tqdm
+from typing import Any, Dict, List, Optional
+
+from column_split import split_dataset_writer
+from lineage import merge_season_totals, record_totals, season_totals
+from parquet_profiles import PROFILES, PYARROW_ROW_GROUP_SIZE, get_profile, open_parquet_writer, row_group_tables
+from snapshots import publish_file, unpublish
+
+
+# Columnas de metadatos que no se rellenan
+METADATA_COLUMNS = ["source_week", "source_row"]
+
+STRING_FILL = "SN"
+NUMERIC_FILL = 0
+
+# Filas por lote de lectura (los row groups los fija el perfil, ver row_group_size)
+DEFAULT_BATCH_SIZE = 256_000
+
+# Especificación de relleno del modo virtual: data/<dataset>.virtual.json
+VIRTUAL_SPEC_SUFFIX = ".virtual.json"
+
+
+def fill_values(schema: pl.Schema) -> Dict[str, Any]:
+	"""
+	Valor de relleno por columna: "SN" para strings, 0 para Int64/Float64.
+
+	Args:
+		schema: Schema del dataset
+
+	Returns:
+		Dict columna -> valor de relleno (sin columnas de metadatos)
+	"""
+	fills = {}
+	for col, dtype in schema.items():
+		if col in METADATA_COLUMNS:
+			continue
+		if dtype == pl.Utf8:
+			fills[col] = STRING_FILL
+		elif dtype in [pl.Int64, pl.Float64]:
+			fills[col] = NUMERIC_FILL
+	return fills
+
+
+def fill_expressions(fills: Dict[str, Any]) -> List[pl.Expr]:
+	"""Expresiones fill_null para los valores de fill_values()."""
+	return [pl.col(col).fill_null(value) for col, value in fills.items()]
+
+
+def row_group_size(profile: str) -> int:
+	"""Filas por row group del dataset limpio: las del perfil o, sin ellas, las de pyarrow (como la escritura original)."""
+	return get_profile(profile)["row_group_size"] or PYARROW_ROW_GROUP_SIZE
+
+
+def stream_clean_nulls(
+	parquet_path: Path,
+	output_path: Path,
+	profile: str = "default",
+	batch_size: int = DEFAULT_BATCH_SIZE,
+	split_dir: Optional[Path] = None
+) -> Dict[str, Any]:
+	"""
+	Contar y rellenar nulos en una sola pasada por lotes.
+
+	Los lotes se reagrupan en row groups de row_group_size(profile) filas,
+	así que el archivo tiene el mismo layout que escribir el DataFrame
+	completo con ese perfil.
 
+	Args:
+		parquet_path: Dataset maestro
+		output_path: Parquet limpio a escribir
+		profile: Perfil de escritura (ver parquet_profiles.PROFILES)
+		batch_size: Filas por lote de lectura
+		split_dir: Si se indica, escribe también los archivos calientes/fríos
 
-def clean_nulls_with_sn(
-	df: pl.DataFrame,
-	columns_to_clean: List[str] = None
-) -> pl.DataFrame:
+	Returns:
+		Dict con rows, fills (valor por columna), null_counts (nulos antes de
+		limpiar) y seasons (totales por season del archivo escrito)
 	"""
-	Limpiar valores nulos rellenando con "SN" (Sin Nombre).
+	schema = pl.scan_parquet(parquet_path).collect_schema()
+	fills = fill_values(schema)
+	arrow_schema = pl.DataFrame(schema=schema).with_columns(fill_expressions(fills)).to_arrow().schema
+	
+	rows = 0
+	null_counts = {col: 0 for col in fills}
+	seasons: Dict[str, Dict[str, int]] = {}
+	
+	def cleaned_batches():
+		nonlocal rows
+		for batch in pq.ParquetFile(parquet_path).iter_batches(batch_size=batch_size):
+			df = pl.from_arrow(batch)
+			counts = df.select(pl.col(list(fills)).null_count()).row(0, named=True)
+			for col, count in counts.items():
+				null_counts[col] += count
+			
+			df = df.with_columns(fill_expressions(fills))
+			merge_season_totals(seasons, season_totals(df))
+			rows += df.height
+			yield df.to_arrow()
+	
+	group_rows = row_group_size(profile)
+	with ExitStack() as stack:
+		writer = open_parquet_writer(output_path, arrow_schema, profile)
+		stack.callback(writer.close)
+		write_split = None
+		if split_dir is not None:
+			write_split = stack.enter_context(
+				split_dataset_writer(output_path.stem, split_dir, arrow_schema, profile)
+			)
+		
+		for table in row_group_tables(cleaned_batches(), group_rows):
+			writer.write_table(table, row_group_size=group_rows)
+			if write_split is not None:
+				write_split(table, group_rows)
+	
+	return {"rows": rows, "fills": fills, "null_counts": null_counts, "seasons": seasons}
+
+
+def clean_frame(df: pl.DataFrame, output_path: Path, profile: str = "default") -> Dict[str, Any]:
+	"""
+	Rellenar y escribir un dataset maestro que ya está en memoria (datacl run-all).
+
+	Escribe los mismos row groups que stream_clean_nulls, sin releer el Parquet.
 
 	Args:
-		df: DataFrame con nulos
-		columns_to_clean: Lista de columnas a limpiar. Si None, limpia todas las columnas string.
+		df: Dataset maestro
+		output_path: Parquet limpio a escribir
+		profile: Perfil de escritura (ver parquet_profiles.PROFILES)
 
 	Returns:
-		DataFrame sin nulos (rellenados con "SN")
-	"""
-	print("Limpiando valores nulos rellenando con 'SN'...")
-	
-	# Si no se especifican columnas, identificar todas las columnas con nulos (excepto source_week)
-	if columns_to_clean is None:
-		columns_to_clean = [col for col in df.columns if col != "source_week" and df[col].null_count() > 0]
-	
-	# Filtrar solo columnas que existen en el DataFrame
-	columns_to_clean = [col for col in columns_to_clean if col in df.columns]
-	
-	# Contar nulos antes de limpiar
-	nulls_before = {}
-	for col in columns_to_clean:
-		null_count = df[col].null_count()
-		if null_count > 0:
-			nulls_before[col] = null_count
-	
-	if nulls_before:
-		print(f"\nNulos encontrados antes de limpieza:")
-		for col, count in nulls_before.items():
-			print(f"  {col}: {count:,} nulos")
-	else:
-		print("\n✓ No hay nulos. El dataset ya está limpio.")
-		return df
-	
-	# Separar columnas por tipo
-	string_columns = [col for col in columns_to_clean if df[col].dtype == pl.Utf8]
-	numeric_columns = [col for col in columns_to_clean if df[col].dtype in [pl.Int64, pl.Float64]]
-	
-	# Rellenar nulos: "SN" para strings, 0 para numéricos
-	print("\nRellenando nulos:")
-	if string_columns:
-		print(f"  Columnas string: rellenando con 'SN' ({len(string_columns)} columnas)")
-	if numeric_columns:
-		print(f"  Columnas numéricas: rellenando con 0 ({len(numeric_columns)} columnas)")
-	
-	df_cleaned = df.with_columns([
-		# Strings: rellenar con "SN"
-		pl.col(col).fill_null("SN") if col in string_columns else
-		# Numéricas: rellenar con 0
-		pl.col(col).fill_null(0) if col in numeric_columns else
-		# Otras: mantener como están
-		pl.col(col)
-		for col in df.columns
-	])
-	
-	# Contar nulos finales
-	nulls_after = {}
-	for col in columns_to_clean:
-		null_count = df_cleaned[col].null_count()
-		if null_count > 0:
-			nulls_after[col] = null_count
-	
-	if nulls_after:
-		print(f"\n⚠️  Nulos restantes después de limpieza:")
-		for col, count in nulls_after.items():
-			print(f"  {col}: {count:,} nulos")
-	else:
-		print("\n✓ Todos los nulos fueron rellenados (strings con 'SN', numéricas con 0)")
-	
-	# Resumen
+		Dict con el mismo formato que stream_clean_nulls, más df (el
+		DataFrame limpio, para las etapas siguientes)
+	"""
+	fills = fill_values(df.schema)
+	null_counts = df.select(pl.col(list(fills)).null_count()).row(0, named=True)
+	df = df.with_columns(fill_expressions(fills))
+	
+	table = df.to_arrow()
+	writer = open_parquet_writer(output_path, table.schema, profile)
+	try:
+		writer.write_table(table, row_group_size=row_group_size(profile))
+	finally:
+		writer.close()
+	
+	return {
+		"rows": df.height,
+		"fills": fills,
+		"null_counts": null_counts,
+		"seasons": season_totals(df),
+		"df": df,
+	}
+
+
+def metadata_null_counts(parquet_path: Path, columns: List[str]) -> Dict[str, int]:
+	"""
+	Nulos por columna desde las estadísticas del Parquet.
+
+	Si alguna columna no tiene estadísticas de nulos, se cuenta con una
+	pasada lazy sobre esa columna.
+
+	Args:
+		parquet_path: Dataset maestro
+		columns: Columnas a contar
+
+	Returns:
+		Dict columna -> nulos
+	"""
+	parquet_file = pq.ParquetFile(parquet_path)
+	names = parquet_file.schema_arrow.names
+	counts: Dict[str, int] = {}
+	missing = []
+	for col in columns:
+		total = 0
+		for i in range(parquet_file.metadata.num_row_groups):
+			stats = parquet_file.metadata.row_group(i).column(names.index(col)).statistics
+			if stats is None or stats.null_count is None:
+				total = None
+				break
+			total += stats.null_count
+		if total is None:
+			missing.append(col)
+		else:
+			counts[col] = total
+	
+	if missing:
+		counts.update(
+			pl.scan_parquet(parquet_path).select(pl.col(missing).null_count()).collect().row(0, named=True)
+		)
+	return {col: counts[col] for col in columns}
+
+
+def virtual_spec_path(output_path: Path) -> Path:
+	"""Path de la especificación virtual de un dataset limpio."""
+	return output_path.with_name(output_path.stem + VIRTUAL_SPEC_SUFFIX)
+
+
+def write_virtual_spec(parquet_path: Path, output_path: Path) -> Dict[str, Any]:
+	"""
+	Guardar la especificación de relleno en lugar de una copia limpia.
+
+	El censo de nulos sale de los metadatos del Parquet; los totales del
+	ledger se calculan con una pasada lazy que lee solo season, boxes y kilos.
+
+	Args:
+		parquet_path: Dataset maestro (fuente del dataset virtual)
+		output_path: Path del dataset limpio que reemplaza la especificación
+
+	Returns:
+		Especificación guardada (source, fills, null_counts, created_at) más
+		seasons (totales por season, no se guardan en el archivo)
+	"""
+	lf = pl.scan_parquet(parquet_path)
+	fills = fill_values(lf.collect_schema())
+	spec = {
+		"source": parquet_path.stem,
+		"fills": fills,
+		"null_counts": metadata_null_counts(parquet_path, list(fills)),
+		"created_at": datetime.now(timezone.utc).isoformat(),
+	}
+	
+	spec_path = virtual_spec_path(output_path)
+	tmp_path = spec_path.with_name(f".{spec_path.name}.{uuid.uuid4().hex}.tmp")
+	with open(tmp_path, 'w', encoding='utf-8') as f:
+		json.dump(spec, f, indent=2, ensure_ascii=False)
+	os.replace(tmp_path, spec_path)
+	
+	return {**spec, "seasons": season_totals(lf.with_columns(fill_expressions(fills)))}
+
+
+def print_null_summary(fills: Dict[str, Any], null_counts: Dict[str, int]) -> None:
+	"""
+	Imprimir el censo de nulos y el valor con que se rellenó cada columna.
+
+	Args:
+		fills: Valor de relleno por columna
+		null_counts: Nulos por columna antes de limpiar
+	"""
 	print("\n" + "="*60)
 	print("RESUMEN DE LIMPIEZA")
 	print("="*60)
-	for col in columns_to_clean:
-		before = nulls_before.get(col, 0)
-		after = nulls_after.get(col, 0)
-		if before > 0:
-			cleaned = before - after
-			pct = (cleaned / before * 100) if before > 0 else 0
-			print(f"{col}:")
-			print(f"  Antes: {before:,} nulos")
-			fill_value = "SN" if col in string_columns else "0"
-			print(f"  Rellenados con '{fill_value}': {cleaned:,} ({pct:.1f}%)")
-			print(f"  Restantes: {after:,} nulos")
+	with_nulls = {col: count for col, count in null_counts.items() if count > 0}
+	if not with_nulls:
+		print("✓ No hay nulos. El dataset ya está limpio.")
+		return
+	for col, count in with_nulls.items():
+		print(f"{col}:")
+		print(f"  Rellenados con '{fills[col]}': {count:,}")
+
+
+def materialize_clean(
+	parquet_path: Path,
+	output_path: Path,
+	profile: str = "default",
+	split_dir: Optional[Path] = None
+) -> Dict[str, Any]:
+	"""
+	Publicar la copia limpia como snapshot y retirar la especificación virtual.
+
+	Args:
+		parquet_path: Dataset maestro
+		output_path: Ruta histórica del dataset limpio
+		profile: Perfil de escritura (ver parquet_profiles.PROFILES)
+		split_dir: Si se indica, escribe también los archivos calientes/fríos
+
+	Returns:
+		Resultado de stream_clean_nulls
+	"""
+	spec_path = virtual_spec_path(output_path)
+	result = {}
+	
+	def write(path: Path) -> None:
+		result.update(stream_clean_nulls(parquet_path, path, profile, split_dir=split_dir))
+	
+	publish_file(write, output_path.stem, output_path)
+	record_totals(result["seasons"], "clean_nulls", output_path, replaces=[spec_path])
 	
-	return df_cleaned
+	# El dataset materializado reemplaza a la especificación virtual
+	spec_path.unlink(missing_ok=True)
+	return result
+
+
+def virtualize_clean(parquet_path: Path, output_path: Path) -> Dict[str, Any]:
+	"""
+	Guardar solo la especificación de relleno y retirar la copia limpia.
+
+	El ledger reemplaza la copia por la especificación, la ruta histórica se
+	borra y los snapshots del dataset limpio se despublican
+	(snapshots.unpublish), así que no queda una segunda copia en disco.
+
+	Args:
+		parquet_path: Dataset maestro
+		output_path: Ruta histórica del dataset limpio
+
+	Returns:
+		Resultado de write_virtual_spec
+	"""
+	spec = write_virtual_spec(parquet_path, output_path)
+	record_totals(spec["seasons"], "clean_nulls", virtual_spec_path(output_path), replaces=[output_path])
+	unpublish(output_path.stem, output_path)
+	return spec
+
+
+def parse_args() -> argparse.Namespace:
+	parser = argparse.ArgumentParser(description="Rellenar nulos del dataset maestro con 'SN' / 0.")
+	parser.add_argument(
+		"--profile",
+		choices=list(PROFILES),
+		default="default",
+		help="Perfil de escritura Parquet (default: default)",
+	)
+	parser.add_argument(
+		"--split",
+		action="store_true",
+		help="Generar además archivos alineados de columnas calientes/frías en data/split/",
+	)
+	parser.add_argument(
+		"--virtual",
+		action="store_true",
+		help="No escribir copia limpia; guardar solo la especificación de relleno (el loader la aplica al leer)",
+	)
+	return parser.parse_args()
 
 
 def main():
 	"""Función principal del script de limpieza."""
+	args = parse_args()
 	data_dir = Path(__file__).parent.parent / "data"
 	parquet_path = data_dir / "exports_10_years.parquet"
 	output_path = data_dir / "exports_10_years_clean.parquet"
+	spec_path = virtual_spec_path(output_path)
 	
 	print("="*60)
 	print("LIMPIEZA DE VALORES NULOS")
@@ -117,7 +366,7 @@ def main():
 	print("\nEste script limpia valores nulos rellenando con 'SN' (Sin Nombre).")
 	print("Mantiene duplicados. Lo importante es mantener totales de cajas y kilos correctos.")
 	print(f"Dataset origen: {parquet_path}")
-	print(f"Dataset destino: {output_path}")
+	print(f"Dataset destino: {spec_path if args.virtual else output_path}")
 	print("\nPara limpiar: python scripts/clean_nulls.py\n")
 	
 	if not parquet_path.exists():
@@ -125,44 +374,29 @@ def main():
 		print("Ejecuta primero scripts/combine.py")
 		return
 	
-	# Cargar dataset maestro
-	print("Cargando dataset maestro...")
-	df = pl.read_parquet(parquet_path)
-	
-	print(f"Dataset cargado: {len(df):,} filas, {len(df.columns)} columnas")
-	
-	# Identificar columnas con nulos (excluyendo source_week que es metadato)
-	columns_with_nulls = []
-	for col in df.columns:
-		if col != "source_week" and df[col].null_count() > 0:
-			columns_with_nulls.append(col)
-	
-	if not columns_with_nulls:
-		print("\n✓ No hay columnas con nulos. El dataset ya está limpio.")
+	if args.virtual:
+		if args.split:
+			print("Error: --split no se puede usar con --virtual")
+			return
+		spec = virtualize_clean(parquet_path, output_path)
+		print_null_summary(spec["fills"], spec["null_counts"])
+		print(f"\n✓ Especificación virtual guardada: {spec_path}")
+		print("  analysis/loader.py aplicará el relleno al leer el dataset maestro.")
 		return
 	
-	print(f"\nColumnas con nulos encontradas: {len(columns_with_nulls)}")
-	for col in columns_with_nulls:
-		null_count = df[col].null_count()
-		print(f"  {col}: {null_count:,} nulos")
-	
-	# Limpiar nulos (solo columnas string, rellenar con "SN")
-	df_cleaned = clean_nulls_with_sn(df, columns_with_nulls)
+	# Censo, relleno y escritura en una sola pasada por lotes
+	print(f"Limpiando por lotes de {DEFAULT_BATCH_SIZE:,} filas, row groups de {row_group_size(args.profile):,} "
+		f"(perfil: {args.profile})...")
+	split_dir = data_dir / "split" if args.split else None
+	result = materialize_clean(parquet_path, output_path, args.profile, split_dir)
 	
-	# Guardar dataset limpio
-	print(f"\nGuardando dataset limpio: {output_path}")
-	df_cleaned.write_parquet(
-		output_path,
-		compression="snappy",
-		use_pyarrow=True
-	)
+	print_null_summary(result["fills"], result["null_counts"])
 	
 	# Estadísticas finales
 	print("\n" + "="*60)
 	print("ESTADÍSTICAS FINALES")
 	print("="*60)
-	print(f"Filas originales: {len(df):,}")
-	print(f"Filas después de limpieza: {len(df_cleaned):,}")
+	print(f"Filas después de limpieza: {result['rows']:,}")
 	print(f"Tamaño del archivo: {output_path.stat().st_size / (1024*1024):.2f} MB")
 	
 	print(f"\n✓ Dataset limpio guardado: {output_path}")
@@ -171,5 +405,3 @@ def main():
 
 if __name__ == "__main__":
 	main()
-
-
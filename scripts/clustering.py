@@ -0,0 +1,228 @@
+"""
+Clustering multi-columna (Z-order) para datasets Parquet.
+
+Este módulo ordena un dataset intercalando los bits de los rangos densos de
+varias columnas (product, country, exporter, season por defecto), de modo que
+cada row group cubra un rango acotado de valores en todas ellas. Las
+estadísticas min/max de los row groups permiten entonces saltar la mayoría de
+los row groups para filtros típicos del dashboard.
+
+También genera un reporte de "skip ratio" para un conjunto de predicados de
+ejemplo, leyendo solo los metadatos del archivo.
+
+Uso:
+	python scripts/clustering.py data/exports_10_years.parquet
+"""
+
+import argparse
+import json
+import polars as pl
+import pyarrow.parquet as pq
+from pathlib import Path
+from typing import Any, Dict, List
+
+
+DEFAULT_CLUSTER_COLUMNS = ["product", "country", "exporter", "season"]
+DEFAULT_ROW_GROUP_SIZE = 64_000
+ZORDER_COLUMN = "__zorder"
+
+
+def zorder_expr(columns: List[str]) -> pl.Expr:
+	"""
+	Construir la expresión de la clave Z-order para las columnas dadas.
+
+	Cada columna se convierte a su rango denso (nulos primero) y se escala al
+	rango completo de 64 // len(columns) bits, para que columnas de baja
+	cardinalidad (season, product) pesen igual que exporter en los bits altos.
+	Luego los bits se intercalan en un UInt64.
+
+	Args:
+		columns: Columnas a intercalar (en orden de prioridad)
+
+	Returns:
+		Expresión UInt64 con la clave Z-order
+	"""
+	bits = 64 // len(columns)
+	max_code = 2 ** bits - 1
+
+	codes = []
+	for col in columns:
+		rank = pl.col(col).rank("dense").fill_null(0).cast(pl.UInt64)
+		codes.append(rank * max_code // pl.max_horizontal(rank.max(), 1))
+
+	z = pl.lit(0, dtype=pl.UInt64)
+	for bit in range(bits):
+		for i, code in enumerate(codes):
+			# Bit más significativo primero: la primera columna domina el orden
+			position = bit * len(columns) + (len(columns) - 1 - i)
+			z = z + ((code // (2 ** bit)) % 2) * pl.lit(2 ** position, dtype=pl.UInt64)
+
+	return z.alias(ZORDER_COLUMN)
+
+
+def cluster_zorder(df: pl.DataFrame, columns: List[str] = None) -> pl.DataFrame:
+	"""
+	Ordenar un DataFrame según la curva Z-order de las columnas dadas.
+
+	Args:
+		df: DataFrame a ordenar
+		columns: Columnas de clustering. Si None, usa DEFAULT_CLUSTER_COLUMNS.
+
+	Returns:
+		DataFrame ordenado (mismas columnas, mismo contenido)
+	"""
+	if columns is None:
+		columns = DEFAULT_CLUSTER_COLUMNS
+
+	columns = [col for col in columns if col in df.columns]
+	if not columns:
+		return df
+
+	print(f"Aplicando clustering Z-order sobre: {columns}")
+	return (
+		df
+		.with_columns(zorder_expr(columns))
+		.sort(ZORDER_COLUMN, maintain_order=True)
+		.drop(ZORDER_COLUMN)
+	)
+
+
+def sample_predicates(df: pl.DataFrame, columns: List[str] = None) -> List[Dict[str, Any]]:
+	"""
+	Generar predicados de ejemplo similares a los filtros del dashboard.
+
+	Usa el valor más frecuente de cada columna y la combinación
+	producto + país más frecuente.
+
+	Args:
+		df: DataFrame de referencia
+		columns: Columnas candidatas. Si None, usa DEFAULT_CLUSTER_COLUMNS.
+
+	Returns:
+		Lista de predicados {columna: valor}
+	"""
+	if columns is None:
+		columns = DEFAULT_CLUSTER_COLUMNS
+
+	columns = [col for col in columns if col in df.columns]
+	predicates = []
+
+	for col in columns:
+		top = df.group_by(col).len().drop_nulls(col).sort("len", descending=True).head(1)
+		if len(top) > 0:
+			predicates.append({col: top[col][0]})
+
+	if "product" in df.columns and "country" in df.columns:
+		top = (
+			df.group_by(["product", "country"]).len()
+			.drop_nulls(["product", "country"])
+			.sort("len", descending=True)
+			.head(1)
+		)
+		if len(top) > 0:
+			predicates.append({"product": top["product"][0], "country": top["country"][0]})
+
+	return predicates
+
+
+def row_group_skip_report(parquet_path: Path, predicates: List[Dict[str, Any]]) -> Dict[str, Any]:
+	"""
+	Calcular qué fracción de row groups se puede saltar para cada predicado.
+
+	Un row group se salta si para alguna columna del predicado el valor
+	queda fuera del rango [min, max] de sus estadísticas.
+
+	Args:
+		parquet_path: Path al archivo Parquet
+		predicates: Lista de predicados de igualdad {columna: valor}
+
+	Returns:
+		Dict con número de row groups y skip ratio por predicado
+	"""
+	metadata = pq.ParquetFile(parquet_path).metadata
+	column_index = {
+		metadata.schema.column(i).name: i
+		for i in range(metadata.num_columns)
+	}
+
+	results = []
+	for predicate in predicates:
+		skipped = 0
+		for rg in range(metadata.num_row_groups):
+			row_group = metadata.row_group(rg)
+			for col, value in predicate.items():
+				stats = row_group.column(column_index[col]).statistics
+				if stats is None or not stats.has_min_max:
+					continue
+				if value < stats.min or value > stats.max:
+					skipped += 1
+					break
+
+		results.append({
+			"predicate": predicate,
+			"row_groups_skipped": skipped,
+			"skip_ratio": skipped / metadata.num_row_groups if metadata.num_row_groups else 0.0,
+		})
+
+	return {
+		"file": str(parquet_path),
+		"num_rows": metadata.num_rows,
+		"num_row_groups": metadata.num_row_groups,
+		"predicates": results,
+	}
+
+
+def print_skip_report(report: Dict[str, Any]) -> None:
+	"""
+	Imprimir reporte de skip ratio en consola.
+
+	Args:
+		report: Resultado de row_group_skip_report()
+	"""
+	print(f"\n{'='*60}")
+	print("REPORTE DE ROW GROUPS SALTABLES")
+	print(f"{'='*60}")
+	print(f"Archivo:    {report['file']}")
+	print(f"Filas:      {report['num_rows']:,}")
+	print(f"Row groups: {report['num_row_groups']:,}")
+	for result in report["predicates"]:
+		predicate = ", ".join(f"{k}={v!r}" for k, v in result["predicate"].items())
+		print(f"  {predicate}: {result['row_groups_skipped']}/{report['num_row_groups']} "
+			f"saltables ({result['skip_ratio']*100:.1f}%)")
+	print(f"{'='*60}")
+
+
+def parse_args() -> argparse.Namespace:
+	parser = argparse.ArgumentParser(description="Reporte de row groups saltables para un Parquet.")
+	parser.add_argument("parquet", type=Path, help="Archivo Parquet a analizar")
+	parser.add_argument(
+		"--output",
+		type=Path,
+		default=None,
+		help="Ruta opcional para guardar el reporte en JSON",
+	)
+	return parser.parse_args()
+
+
+def main():
+	"""Función principal: reporte de skip ratio para un archivo existente."""
+	args = parse_args()
+
+	if not args.parquet.exists():
+		print(f"Error: Archivo {args.parquet} no existe")
+		return
+
+	columns = pl.read_parquet_schema(args.parquet).keys()
+	df = pl.read_parquet(args.parquet, columns=[c for c in DEFAULT_CLUSTER_COLUMNS if c in columns])
+	report = row_group_skip_report(args.parquet, sample_predicates(df))
+	print_skip_report(report)
+
+	if args.output:
+		args.output.parent.mkdir(parents=True, exist_ok=True)
+		with open(args.output, 'w', encoding='utf-8') as f:
+			json.dump(report, f, indent=2, ensure_ascii=False)
+		print(f"\n✓ Reporte guardado: {args.output}")
+
+
+if __name__ == "__main__":
+	main()
@@ -0,0 +1,180 @@
+"""
+Partición vertical del dataset en columnas calientes y frías.
+
+Las consultas del dashboard y del módulo analysis casi siempre leen las mismas
+columnas (season, week, year, country, product, exporter, boxes,
+net_weight_kg). Las columnas de texto restantes (importer, variety,
+port_destination, region, market, transport) se usan poco pero concentran la
+mayor parte de los bytes.
+
+save_split_dataset() escribe ambos grupos como archivos separados y alineados
+(mismas filas, mismo orden, mismo tamaño de row group). El par se publica
+como un único snapshot del dataset "<dataset>_split" (ver snapshots.py), así
+que los lectores nunca combinan un archivo caliente con un frío de otra
+escritura; las rutas históricas se actualizan también:
+
+	data/split/<dataset>_hot.parquet
+	data/split/<dataset>_cold.parquet
+
+analysis/loader.py lee solo el archivo caliente y une el frío de forma lazy
+cuando se pide alguna columna fría (load_data(split=True, columns=[...])).
+"""
+
+import os
+import uuid
+import polars as pl
+import pyarrow as pa
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from parquet_profiles import get_profile, open_parquet_writer, write_parquet_profile
+from snapshots import PROJECT_ROOT, publish_files
+
+
+HOT_COLUMNS = [
+	"season",
+	"week",
+	"year",
+	"country",
+	"product",
+	"exporter",
+	"boxes",
+	"net_weight_kg",
+	"net_weight_g",
+]
+
+# Tamaño de row group común a ambos archivos cuando el perfil no fija uno
+DEFAULT_SPLIT_ROW_GROUP_SIZE = 256_000
+
+
+def split_snapshot_name(dataset: str) -> str:
+	"""Nombre en el manifest del snapshot que agrupa el par caliente/frío de un dataset."""
+	return f"{dataset}_split"
+
+
+def print_split_files(entry: Dict[str, Any], columns: Dict[str, List[str]]) -> None:
+	"""Imprimir columnas y tamaño de cada archivo de un snapshot del par."""
+	for name, file in entry["files"].items():
+		size_mb = (PROJECT_ROOT / file).stat().st_size / (1024 * 1024)
+		print(f"  {name}: {len(columns[name])} columnas ({size_mb:,.2f} MB)")
+
+
+def split_columns(df: pl.DataFrame) -> Tuple[List[str], List[str]]:
+	"""
+	Repartir las columnas de df entre el grupo caliente y el frío.
+
+	Las columnas que no están en HOT_COLUMNS (incluidas columnas nuevas no
+	listadas) van al archivo frío, para no perder datos.
+
+	Args:
+		df: DataFrame a particionar
+
+	Returns:
+		Tupla (hot, cold) con nombres de columnas en el orden de df
+	"""
+	hot = [col for col in df.columns if col in HOT_COLUMNS]
+	cold = [col for col in df.columns if col not in HOT_COLUMNS]
+	return hot, cold
+
+
+def save_split_dataset(
+	df: pl.DataFrame,
+	dataset: str,
+	split_dir: Path,
+	profile: str = "default",
+	row_group_size: Optional[int] = None
+) -> None:
+	"""
+	Guardar df como par de archivos alineados (columnas calientes / frías).
+
+	Ambos archivos se publican juntos como un snapshot (publish_files) y usan
+	el mismo row_group_size para que el row group i de uno corresponda al
+	row group i del otro.
+
+	Args:
+		df: DataFrame ya ordenado (el orden de filas define la alineación)
+		dataset: Nombre del dataset (p. ej. "exports_10_years_clean")
+		split_dir: Directorio de salida
+		profile: Perfil de escritura (ver parquet_profiles.PROFILES)
+		row_group_size: Filas por row group (None = el del perfil o el default)
+	"""
+	split_dir.mkdir(parents=True, exist_ok=True)
+	row_group_size = row_group_size or get_profile(profile)["row_group_size"] or DEFAULT_SPLIT_ROW_GROUP_SIZE
+
+	hot, cold = split_columns(df)
+	columns = {f"{dataset}_hot.parquet": hot, f"{dataset}_cold.parquet": cold}
+
+	print(f"\nGenerando archivos calientes/fríos en: {split_dir}")
+	entry = publish_files(
+		{
+			name: lambda path, cols=cols: write_parquet_profile(df.select(cols), path, profile, row_group_size)
+			for name, cols in columns.items()
+		},
+		split_snapshot_name(dataset),
+		{name: split_dir / name for name in columns},
+	)
+	print_split_files(entry, columns)
+
+	print(f"✓ Columnas calientes: {', '.join(hot)}")
+
+
+@contextmanager
+def split_dataset_writer(
+	dataset: str,
+	split_dir: Path,
+	schema: pa.Schema,
+	profile: str = "default"
+):
+	"""
+	Escribir el par caliente/frío por lotes (versión streaming de save_split_dataset).
+
+	Entrega una función write(table, row_group_size) que escribe cada lote en
+	ambos archivos; como los dos reciben los mismos lotes, los row groups
+	quedan alineados. Al salir sin errores el par se publica como un único
+	snapshot (publish_files).
+
+	Args:
+		dataset: Nombre del dataset (p. ej. "exports_10_years_clean")
+		split_dir: Directorio de salida
+		schema: Schema de Arrow de los lotes
+		profile: Perfil de escritura (ver parquet_profiles.PROFILES)
+	"""
+	split_dir.mkdir(parents=True, exist_ok=True)
+	hot = [name for name in schema.names if name in HOT_COLUMNS]
+	cold = [name for name in schema.names if name not in HOT_COLUMNS]
+
+	parts = []
+	for suffix, columns in (("hot", hot), ("cold", cold)):
+		path = split_dir / f"{dataset}_{suffix}.parquet"
+		tmp_path = path.with_name(f".{path.name}.{uuid.uuid4().hex}.tmp")
+		writer = open_parquet_writer(tmp_path, pa.schema([schema.field(col) for col in columns]), profile)
+		parts.append((columns, path, tmp_path, writer))
+
+	def write(table: pa.Table, row_group_size: Optional[int] = None) -> None:
+		for columns, _, _, writer in parts:
+			writer.write_table(table.select(columns), row_group_size=row_group_size)
+
+	try:
+		yield write
+	except BaseException:
+		for _, _, tmp_path, writer in parts:
+			writer.close()
+			tmp_path.unlink(missing_ok=True)
+		raise
+
+	print(f"\nGenerando archivos calientes/fríos en: {split_dir}")
+	for _, _, _, writer in parts:
+		writer.close()
+	try:
+		entry = publish_files(
+			{path.name: lambda target, tmp_path=tmp_path: os.replace(tmp_path, target) for _, path, tmp_path, _ in parts},
+			split_snapshot_name(dataset),
+			{path.name: path for _, path, _, _ in parts},
+		)
+	finally:
+		for _, _, tmp_path, _ in parts:
+			tmp_path.unlink(missing_ok=True)
+	print_split_files(entry, {path.name: columns for columns, path, _, _ in parts})
+
+	print(f"✓ Columnas calientes: {', '.join(hot)}")
@@ -5,10 +5,42 @@ Este script carga todos los Parquets normalizados de data_clean/,
 los combina en un único dataset y guarda el resultado en data/exports_10_years.parquet.
 """
 
+import argparse
 import polars as pl
 from pathlib import Path
 from tqdm import tqdm
-from typing import List, Optional, Tuple
+from typing import Dict, List, Optional, Tuple
+
+from clustering import (
+	DEFAULT_ROW_GROUP_SIZE,
+	cluster_zorder,
+	print_skip_report,
+	row_group_skip_report,
+	sample_predicates,
+)
+from column_split import save_split_dataset
+from fixed_point import FIXED_KILOS_COLUMN, fixed_to_kilos
+from parquet_profiles import PROFILES, RowGroupWriter, write_parquet_profile
+from resources import collect_engine, plan_stage, print_plan, total_bytes, track_usage
+from lineage import merge_season_totals, record_stage, record_totals, season_totals
+from snapshots import publish_dataframe, publish_file
+
+
+# Filas por lote del motor streaming al escribir el maestro sin cargarlo en memoria
+STREAM_BATCH_SIZE = 256_000
+
+# Columnas dimensionales que se codifican con claves enteras en el esquema estrella
+STAR_DIMENSIONS = [
+	"country",
+	"product",
+	"variety",
+	"exporter",
+	"importer",
+	"port_destination",
+	"market",
+	"region",
+	"transport",
+]
 
 
 def extract_week_number(filename: str) -> Optional[int]:
@@ -143,7 +175,9 @@ def enforce_final_schema(df: pl.LazyFrame) -> pl.LazyFrame:
 		"port_destination",
 		"boxes",
 		"net_weight_kg",
-		"source_week"  # Agregar source_week para referencia
+		FIXED_KILOS_COLUMN,  # Solo si normalize.py se ejecutó con --fixed-point
+		"source_week",  # Agregar source_week para referencia
+		"source_row"  # Registro del CSV de origen (normalize.py --provenance)
 	]
 	
 	# Seleccionar solo las columnas del schema final en el orden correcto
@@ -179,7 +213,9 @@ def enforce_final_schema(df: pl.LazyFrame) -> pl.LazyFrame:
 		"port_destination": pl.Utf8,
 		"boxes": pl.Int64,
 		"net_weight_kg": pl.Float64,
-		"source_week": pl.Int64  # Tipo para source_week
+		FIXED_KILOS_COLUMN: pl.Int64,
+		"source_week": pl.Int64,  # Tipo para source_week
+		"source_row": pl.UInt32
 	}
 	
 	# Aplicar casts solo a columnas que existen
@@ -190,37 +226,125 @@ def enforce_final_schema(df: pl.LazyFrame) -> pl.LazyFrame:
 	return df
 
 
-def save_master_dataset(df: pl.LazyFrame, output_path: Path) -> None:
+def stream_master_dataset(
+	df: pl.LazyFrame,
+	output_path: Path,
+	row_group_size: Optional[int] = None,
+	profile: str = "default"
+) -> Dict[str, Dict[str, int]]:
+	"""
+	Escribir el maestro por lotes, sin el DataFrame completo en memoria.
+
+	combine_datasets ordena por (year, week, source_week), y ordenar todo el
+	maestro en streaming igual lo retiene completo; por eso se escribe un
+	año a la vez (nulos primero, como en sort), con memoria acotada al año
+	más grande. El filtro por año se aplica antes de enforce_final_schema
+	para que llegue a la lectura de cada Parquet (tras el cast de year no
+	se puede empujar). Sin year no hay orden y los lotes salen directo del
+	motor streaming. Los lotes pasan por
+	RowGroupWriter, así que el archivo tiene los mismos row groups que con
+	write_parquet_profile; los totales por season del ledger se acumulan
+	lote a lote.
+
+	Args:
+		df: LazyFrame combinado (combine_datasets, sin enforce_final_schema)
+		output_path: Parquet a escribir
+		row_group_size: Filas por row group (None = el del perfil)
+		profile: Perfil de escritura (ver parquet_profiles.PROFILES)
+
+	Returns:
+		Totales por season (ver lineage.season_totals)
+	"""
+	if "year" in df.collect_schema():
+		years = df.select(pl.col("year").unique()).collect(engine="streaming")["year"].to_list()
+		batches = (
+			enforce_final_schema(
+				df.filter(pl.col("year").is_null() if year is None else pl.col("year") == year)
+			).collect(engine="streaming")
+			for year in sorted(years, key=lambda year: (year is not None, year))
+		)
+	else:
+		batches = enforce_final_schema(df).collect_batches(chunk_size=STREAM_BATCH_SIZE, engine="streaming")
+	
+	seasons: Dict[str, Dict[str, int]] = {}
+	writer = RowGroupWriter(output_path, profile, row_group_size)
+	try:
+		for batch in batches:
+			merge_season_totals(seasons, season_totals(batch))
+			writer.write(batch.to_arrow())
+		writer.close(empty=pl.DataFrame(schema=enforce_final_schema(df).collect_schema()).to_arrow())
+	except BaseException:
+		writer.abort()
+		raise
+	return seasons
+
+
+def save_master_dataset(
+	df: pl.LazyFrame,
+	output_path: Path,
+	cluster: bool = False,
+	row_group_size: Optional[int] = None,
+	profile: str = "default",
+	engine: str = "auto"
+) -> Optional[pl.DataFrame]:
 	"""
 	Guardar dataset maestro consolidado como Parquet.
 
+	Con engine="streaming" el maestro se escribe por lotes
+	(stream_master_dataset) y no se carga en memoria, salvo con cluster:
+	el Z-order necesita todas las filas.
+
 	Args:
 		df: LazyFrame con todos los datos combinados
 		output_path: Path donde guardar el dataset final
+		cluster: Si True, ordena por Z-order (product, country, exporter, season)
+			en lugar de (year, week, source_week)
+		row_group_size: Filas por row group (None = el del perfil)
+		profile: Perfil de escritura (ver parquet_profiles.PROFILES)
+		engine: Motor de ejecución ("streaming" si la entrada no cabe en el
+			presupuesto de memoria, ver resources.py)
+
+	Returns:
+		DataFrame guardado (para reutilizarlo sin releer el archivo), o
+		None si se escribió en streaming
 	"""
 	output_path.parent.mkdir(parents=True, exist_ok=True)
 	
 	print(f"Guardando dataset maestro: {output_path}")
 	
-	# Enforzar schema final antes de guardar
-	df = enforce_final_schema(df)
-	
-	# Ejecutar lazy frame (collect())
-	print("Ejecutando operaciones lazy y cargando en memoria...")
-	df_eager = df.collect()
-	
-	# Guardar con pl.write_parquet() usando compresión snappy
-	print("Guardando archivo Parquet...")
-	df_eager.write_parquet(
-		output_path,
-		compression="snappy",
-		use_pyarrow=True
-	)
+	if engine == "streaming" and cluster:
+		print("  ⚠️  --cluster ordena por Z-order en memoria: el maestro se carga completo")
+	
+	df_eager = None
+	if engine == "streaming" and not cluster:
+		# Publicar como snapshot inmutable, escrito por lotes
+		print(f"Escribiendo por lotes en streaming (perfil: {profile})...")
+		seasons = {}
+		publish_file(
+			lambda path: seasons.update(stream_master_dataset(df, path, row_group_size, profile)),
+			output_path.stem,
+			output_path
+		)
+		totals = record_totals(seasons, "combine", output_path)["totals"]
+	else:
+		# Enforzar schema final y ejecutar lazy frame (collect())
+		print("Ejecutando operaciones lazy y cargando en memoria...")
+		df_eager = enforce_final_schema(df).collect(engine=engine)
+		
+		if cluster:
+			df_eager = cluster_zorder(df_eager)
+		
+		# Publicar como snapshot inmutable (la ruta histórica se reemplaza atómicamente)
+		print(f"Guardando archivo Parquet (perfil: {profile})...")
+		publish_dataframe(df_eager, output_path.stem, output_path, profile, row_group_size)
+		
+		# Registrar totales por season en el ledger de linaje (ver lineage.py)
+		totals = record_stage(df_eager, "combine", output_path)["totals"]
 	
 	# Mostrar estadísticas del dataset
-	total_rows = len(df_eager)
-	total_boxes = df_eager["boxes"].sum() if "boxes" in df_eager.columns else 0
-	total_kilos = df_eager["net_weight_kg"].sum() if "net_weight_kg" in df_eager.columns else 0.0
+	total_rows = totals["rows"]
+	total_boxes = totals["boxes"]
+	total_kilos = fixed_to_kilos(totals["kilos_g"])
 	file_size = output_path.stat().st_size / (1024 * 1024)  # MB
 	
 	print(f"\n{'='*60}")
@@ -233,10 +357,117 @@ def save_master_dataset(df: pl.LazyFrame, output_path: Path) -> None:
 	print(f"{'='*60}")
 	
 	print(f"\n✓ Dataset guardado exitosamente: {output_path}")
+	
+	if cluster:
+		print_skip_report(row_group_skip_report(output_path, sample_predicates(df_eager)))
+	
+	return df_eager
+
+
+def build_star_schema(df: pl.DataFrame) -> Tuple[pl.DataFrame, Dict[str, pl.DataFrame]]:
+	"""
+	Construir tabla de hechos con claves enteras y tablas de dimensiones.
+
+	Cada columna de STAR_DIMENSIONS se reemplaza por <columna>_id (UInt32).
+	Los ids se asignan según el orden alfabético de los valores, por lo que
+	son estables mientras no aparezcan valores nuevos. Los nulos se mantienen
+	como id nulo.
+
+	Args:
+		df: DataFrame del dataset maestro
+
+	Returns:
+		Tupla (fact, dims) donde dims mapea columna -> DataFrame (<columna>_id, <columna>)
+	"""
+	dims = {}
+	fact_columns = []
+	
+	for col in df.columns:
+		if col not in STAR_DIMENSIONS:
+			fact_columns.append(pl.col(col))
+			continue
+		
+		id_col = f"{col}_id"
+		dim = (
+			df.select(pl.col(col).drop_nulls().unique().sort())
+			.with_row_index(id_col)
+			.with_columns(pl.col(id_col).cast(pl.UInt32))
+		)
+		dims[col] = dim
+		
+		fact_columns.append(
+			pl.col(col)
+			.replace_strict(dim[col], dim[id_col], default=None, return_dtype=pl.UInt32)
+			.alias(id_col)
+		)
+	
+	fact = df.select(fact_columns)
+	return fact, dims
+
+
+def save_star_schema(df: pl.DataFrame, star_dir: Path, profile: str = "default") -> None:
+	"""
+	Guardar el dataset maestro en formato estrella (hechos + dimensiones).
+
+	Genera star_dir/fact_exports.parquet y star_dir/dim_<columna>.parquet.
+
+	Args:
+		df: DataFrame del dataset maestro (ya con schema final)
+		star_dir: Directorio de salida del esquema estrella
+		profile: Perfil de escritura (hechos y dimensiones)
+	"""
+	star_dir.mkdir(parents=True, exist_ok=True)
+	
+	print(f"\nGenerando esquema estrella en: {star_dir}")
+	fact, dims = build_star_schema(df)
+	
+	for col, dim in dims.items():
+		write_parquet_profile(dim, star_dir / f"dim_{col}.parquet", profile)
+		print(f"  dim_{col}: {len(dim):,} valores")
+	
+	fact_path = star_dir / "fact_exports.parquet"
+	write_parquet_profile(fact, fact_path, profile)
+	
+	fact_size = fact_path.stat().st_size / (1024 * 1024)  # MB
+	print(f"  fact_exports: {len(fact):,} filas ({fact_size:,.2f} MB)")
+	print(f"✓ Esquema estrella guardado: {star_dir}")
+
+
+def parse_args() -> argparse.Namespace:
+	parser = argparse.ArgumentParser(description="Combinar Parquets normalizados en el dataset maestro.")
+	parser.add_argument(
+		"--star",
+		action="store_true",
+		help="Generar además tabla de hechos con claves enteras y dimensiones en data/star/",
+	)
+	parser.add_argument(
+		"--split",
+		action="store_true",
+		help="Generar además archivos alineados de columnas calientes/frías en data/split/",
+	)
+	parser.add_argument(
+		"--cluster",
+		action="store_true",
+		help="Ordenar por Z-order (product, country, exporter, season) para saltar row groups",
+	)
+	parser.add_argument(
+		"--row-group-size",
+		type=int,
+		default=None,
+		help=f"Filas por row group (default con --cluster: {DEFAULT_ROW_GROUP_SIZE:,})",
+	)
+	parser.add_argument(
+		"--profile",
+		choices=list(PROFILES),
+		default="default",
+		help="Perfil de escritura Parquet (default: default)",
+	)
+	return parser.parse_args()
 
 
 def main():
 	"""Función principal del script de combinación."""
+	args = parse_args()
 	data_clean_dir = Path(__file__).parent.parent / "data_clean"
 	data_dir = Path(__file__).parent.parent / "data"
 	output_path = data_dir / "exports_10_years.parquet"
@@ -265,8 +496,30 @@ def main():
 	# Combinar datasets
 	combined_df = combine_datasets(lazy_frames_with_week)
 	
-	# Guardar dataset maestro
-	save_master_dataset(combined_df, output_path)
+	# Streaming si el dataset no cabe en el presupuesto de memoria (ver resources.py)
+	plan = plan_stage("combine", total_bytes(data_clean_dir.glob("*.parquet")))
+	print_plan(plan)
+	
+	with track_usage("combine", plan):
+		# Guardar dataset maestro
+		row_group_size = args.row_group_size
+		if args.cluster and row_group_size is None:
+			row_group_size = DEFAULT_ROW_GROUP_SIZE
+		df_master = save_master_dataset(
+			combined_df, output_path, args.cluster, row_group_size, args.profile, collect_engine(plan)
+		)
+		if df_master is None and (args.star or args.split):
+			# El esquema estrella y la partición vertical se arman en memoria
+			print("  ⚠️  --star/--split cargan el maestro escrito en memoria")
+			df_master = pl.read_parquet(output_path)
+		
+		# Esquema estrella opcional
+		if args.star:
+			save_star_schema(df_master, data_dir / "star", args.profile)
+		
+		# Partición vertical opcional (columnas calientes / frías)
+		if args.split:
+			save_split_dataset(df_master, output_path.stem, data_dir / "split", args.profile, row_group_size)
 	
 	print("\n✓ Combinación completada.")
 
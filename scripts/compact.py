@@ -0,0 +1,228 @@
+"""
+Script de compactación del dataset limpio preservando agregados.
+
+Este script colapsa las filas que comparten la misma clave dimensional
+(season, week, country, product, variety, exporter, importer, port_destination,
+transport) en una única fila con boxes y net_weight_kg sumados y una columna
+row_count con la multiplicidad original. Los totales de filas, cajas y kilos
+se verifican contra audit/final_validation.json antes de guardar.
+"""
+
+import argparse
+import json
+import polars as pl
+from pathlib import Path
+from typing import Any, Dict, List
+
+from fixed_point import FIXED_KILOS_COLUMN, fixed_kilos_sum, fixed_to_kilos, kilos_to_fixed
+from parquet_profiles import PROFILES
+from snapshots import publish_dataframe
+
+
+# Clave de compactación. year, region y market dependen funcionalmente de
+# (season, week, country), se incluyen para no perder ninguna columna dimensional.
+COMPACTION_KEY = [
+	"season",
+	"week",
+	"year",
+	"region",
+	"market",
+	"country",
+	"transport",
+	"product",
+	"variety",
+	"importer",
+	"exporter",
+	"port_destination",
+]
+
+MEASURE_COLUMNS = ["boxes", "net_weight_kg"]
+ROW_COUNT_COLUMN = "row_count"
+
+
+def compact_dataset(df: pl.LazyFrame, key_columns: List[str] = None) -> pl.LazyFrame:
+	"""
+	Colapsar filas con la misma clave sumando medidas y contando multiplicidad.
+
+	Args:
+		df: LazyFrame con el dataset a compactar
+		key_columns: Columnas de la clave. Si None, usa COMPACTION_KEY.
+
+	Returns:
+		LazyFrame compactado con las columnas de la clave, boxes,
+		net_weight_kg (y net_weight_g si existe) y row_count
+	"""
+	if key_columns is None:
+		key_columns = COMPACTION_KEY
+
+	schema_names = df.collect_schema().names()
+	key_columns = [col for col in key_columns if col in schema_names]
+
+	# Si el input ya estaba compactado, sumar la multiplicidad existente
+	if ROW_COUNT_COLUMN in schema_names:
+		row_count_expr = pl.col(ROW_COUNT_COLUMN).sum()
+	else:
+		row_count_expr = pl.len()
+
+	measures = [
+		pl.col("boxes").sum().alias("boxes"),
+		pl.col("net_weight_kg").sum().alias("net_weight_kg"),
+	]
+	if FIXED_KILOS_COLUMN in schema_names:
+		measures.append(pl.col(FIXED_KILOS_COLUMN).sum().alias(FIXED_KILOS_COLUMN))
+
+	# maintain_order conserva el orden (year, week, source_week) del dataset maestro
+	return (
+		df
+		.group_by(key_columns, maintain_order=True)
+		.agg(measures + [row_count_expr.cast(pl.Int64).alias(ROW_COUNT_COLUMN)])
+	)
+
+
+def get_expected_totals(validation_path: Path) -> Dict[str, Any]:
+	"""
+	Obtener totales esperados desde audit/final_validation.json.
+
+	Args:
+		validation_path: Path al reporte de validación
+
+	Returns:
+		Dict con expected_rows, expected_boxes y expected_kilos
+	"""
+	if not validation_path.exists():
+		raise FileNotFoundError(
+			f"Reporte {validation_path} no existe. Ejecuta primero scripts/validate.py"
+		)
+
+	with open(validation_path, 'r', encoding='utf-8') as f:
+		report = json.load(f)
+
+	return {
+		"expected_rows": report["total_rows"],
+		"expected_boxes": report["total_boxes"],
+		"expected_kilos": report["total_kilos"],
+	}
+
+
+def verify_totals(df: pl.DataFrame, expected_totals: Dict[str, Any]) -> Dict[str, Any]:
+	"""
+	Verificar que el dataset compactado preserve exactamente los totales.
+
+	Los kilos se comparan en gramos enteros (ver fixed_point.py).
+
+	Args:
+		df: DataFrame compactado
+		expected_totals: Totales esperados de final_validation.json
+
+	Returns:
+		Dict con totales calculados y flags de coincidencia
+	"""
+	totals = df.select([
+		pl.col(ROW_COUNT_COLUMN).sum().alias("rows"),
+		pl.col("boxes").sum().alias("boxes"),
+		fixed_kilos_sum(df.columns).alias("kilos_g"),
+	]).row(0, named=True)
+
+	rows_match = totals["rows"] == expected_totals["expected_rows"]
+	boxes_match = totals["boxes"] == expected_totals["expected_boxes"]
+	kilos_match = totals["kilos_g"] == kilos_to_fixed(expected_totals["expected_kilos"])
+
+	return {
+		"total_rows": int(totals["rows"]),
+		"total_boxes": int(totals["boxes"]),
+		"total_kilos": fixed_to_kilos(totals["kilos_g"]),
+		"rows_match": rows_match,
+		"boxes_match": boxes_match,
+		"kilos_match": kilos_match,
+		"totals_ok": rows_match and boxes_match and kilos_match,
+	}
+
+
+def parse_args() -> argparse.Namespace:
+	project_root = Path(__file__).parent.parent
+	parser = argparse.ArgumentParser(description="Compactar dataset limpio preservando totales.")
+	parser.add_argument(
+		"--input",
+		type=Path,
+		default=project_root / "data" / "exports_10_years_clean.parquet",
+		help="Parquet de entrada (default: data/exports_10_years_clean.parquet)",
+	)
+	parser.add_argument(
+		"--output",
+		type=Path,
+		default=project_root / "data" / "exports_10_years_compact.parquet",
+		help="Parquet compactado (default: data/exports_10_years_compact.parquet)",
+	)
+	parser.add_argument(
+		"--validation",
+		type=Path,
+		default=project_root / "audit" / "final_validation.json",
+		help="Reporte con totales esperados (default: audit/final_validation.json)",
+	)
+	parser.add_argument(
+		"--profile",
+		choices=list(PROFILES),
+		default="default",
+		help="Perfil de escritura Parquet (default: default)",
+	)
+	return parser.parse_args()
+
+
+def main():
+	"""Función principal del script de compactación."""
+	args = parse_args()
+
+	print("="*60)
+	print("COMPACTACIÓN DEL DATASET")
+	print("="*60)
+	print("\nEste script colapsa filas con la misma clave dimensional,")
+	print("sumando boxes y kilos y registrando la multiplicidad en row_count.")
+	print(f"Dataset origen: {args.input}")
+	print(f"Dataset destino: {args.output}")
+	print("\nPara compactar: python scripts/compact.py\n")
+
+	if not args.input.exists():
+		print(f"Error: Archivo {args.input} no existe")
+		print("Ejecuta primero scripts/clean_nulls.py")
+		return
+
+	expected_totals = get_expected_totals(args.validation)
+
+	lf = pl.scan_parquet(args.input)
+	rows_before = lf.select(pl.len()).collect().item()
+
+	print("Compactando filas por clave dimensional...")
+	df_compact = compact_dataset(lf).collect()
+
+	print("Verificando totales contra final_validation.json...")
+	verification = verify_totals(df_compact, expected_totals)
+
+	if not verification["totals_ok"]:
+		print("\n✗ Los totales no coinciden. No se guardará el dataset compactado.")
+		print(f"  Filas: esperado {expected_totals['expected_rows']:,}, actual {verification['total_rows']:,}")
+		print(f"  Boxes: esperado {expected_totals['expected_boxes']:,}, actual {verification['total_boxes']:,}")
+		print(f"  Kilos: esperado {expected_totals['expected_kilos']:,.2f}, actual {verification['total_kilos']:,.2f}")
+		raise SystemExit(1)
+
+	args.output.parent.mkdir(parents=True, exist_ok=True)
+	print(f"Guardando dataset compactado: {args.output} (perfil: {args.profile})")
+	publish_dataframe(df_compact, args.output.stem, args.output, args.profile)
+
+	reduction = (1 - len(df_compact) / rows_before) * 100 if rows_before > 0 else 0
+
+	print("\n" + "="*60)
+	print("ESTADÍSTICAS DE COMPACTACIÓN")
+	print("="*60)
+	print(f"Filas originales:   {rows_before:,}")
+	print(f"Filas compactadas:  {len(df_compact):,} (-{reduction:.1f}%)")
+	print(f"Total de boxes:     {verification['total_boxes']:,}")
+	print(f"Total de kilos:     {verification['total_kilos']:,.2f}")
+	print(f"Tamaño del archivo: {args.output.stat().st_size / (1024*1024):.2f} MB")
+	print("="*60)
+
+	print(f"\n✓ Totales verificados contra {args.validation}")
+	print("\n✓ Compactación completada.")
+
+
+if __name__ == "__main__":
+	main()
@@ -1,16 +1,52 @@
 #!/usr/bin/env python3
 """
 Genera un dataset reducido (MVP) filtrando temporadas específicas del archivo dashboard ready.
+
+Con --subsets se generan varios subconjuntos (MVP, extractos por producto,
+última temporada, ...) en una sola lectura en streaming del archivo: cada
+lote se filtra con la especificación de cada subconjunto, se agrega a su
+Parquet y a sus totales por season, de los que salen las métricas.
+
+El archivo de --subsets es una lista JSON de especificaciones:
+
+	[
+		{"name": "mvp", "output": "data/dataset_dashboard_mvp.parquet",
+		 "metrics": "data/dataset_dashboard_mvp_metrics.json",
+		 "seasons": ["2024-2025", "2023-2024", "2022-2023"], "stage": "mvp"},
+		{"name": "cherries", "output": "data/subsets/cherries.parquet",
+		 "products": ["Cherries"], "last_seasons": 1}
+	]
+
+Claves: name y output (obligatorias); metrics (default: <output>_metrics.json
+junto al Parquet, como el MVP); filtros seasons,
+last_seasons (las N seasons más recientes), products, countries,
+exporters; cluster, row_group_size y profile (default: los de la línea de
+comandos); stage (etapa en el ledger de linaje, default "subset"; solo el
+MVP se registra como "mvp" para la conciliación).
 """
 
 from __future__ import annotations
 
 import argparse
 import json
+import os
+import uuid
 from pathlib import Path
-from typing import List, Optional
+from typing import Any, Dict, List, Optional
 
 import polars as pl
+import pyarrow.parquet as pq
+
+from clustering import (
+	DEFAULT_ROW_GROUP_SIZE,
+	cluster_zorder,
+	print_skip_report,
+	row_group_skip_report,
+	sample_predicates,
+)
+from fixed_point import fixed_to_kilos
+from lineage import merge_season_totals, record_stage, record_totals, season_totals, sum_totals
+from parquet_profiles import PROFILES, RowGroupWriter, write_parquet_profile
 
 
 DEFAULT_INPUT_PATH = Path("data/dataset_dashboard_ready.parquet")
@@ -22,6 +58,17 @@ DEFAULT_SEASONS = [
 	"2022-2023",
 ]
 
+# Filas por lote al leer el archivo de entrada
+DEFAULT_BATCH_SIZE = 256_000
+
+# Filtros de una especificación -> columna del dataset
+FILTER_COLUMNS = {
+	"seasons": "season",
+	"products": "product",
+	"countries": "country",
+	"exporters": "exporter",
+}
+
 
 def parse_args() -> argparse.Namespace:
 	parser = argparse.ArgumentParser(description="Generar dataset MVP filtrando temporadas específicas.")
@@ -49,14 +96,105 @@ def parse_args() -> argparse.Namespace:
 		default=",".join(DEFAULT_SEASONS),
 		help="Lista de temporadas separadas por coma. Ej: 2024-2025,2023-2024",
 	)
+	parser.add_argument(
+		"--cluster",
+		action="store_true",
+		help="Ordenar por Z-order (product, country, exporter, season) para saltar row groups",
+	)
+	parser.add_argument(
+		"--row-group-size",
+		type=int,
+		default=None,
+		help=f"Filas por row group (default con --cluster: {DEFAULT_ROW_GROUP_SIZE:,})",
+	)
+	parser.add_argument(
+		"--profile",
+		choices=list(PROFILES),
+		default="dashboard",
+		help="Perfil de escritura Parquet (default: dashboard)",
+	)
+	parser.add_argument(
+		"--subsets",
+		type=Path,
+		default=None,
+		help="JSON con varias especificaciones de subconjuntos; se generan en una sola lectura "
+			"(ignora --output, --metrics y --seasons)",
+	)
 	return parser.parse_args()
 
 
+def load_subset_specs(path: Path) -> List[Dict[str, Any]]:
+	"""
+	Leer y validar las especificaciones de subconjuntos de un JSON.
+
+	Args:
+		path: Archivo JSON con una lista de especificaciones
+
+	Returns:
+		Lista de especificaciones
+	"""
+	with path.open("r", encoding="utf-8") as fp:
+		specs = json.load(fp)
+	if not isinstance(specs, list) or not specs:
+		raise ValueError(f"{path} debe contener una lista no vacía de subconjuntos.")
+
+	names = set()
+	outputs = set()
+	for spec in specs:
+		for key in ("name", "output"):
+			if key not in spec:
+				raise ValueError(f"Subconjunto sin '{key}': {spec}")
+		if spec["name"] in names or spec["output"] in outputs:
+			raise ValueError(f"Subconjunto repetido: {spec['name']} ({spec['output']})")
+		names.add(spec["name"])
+		outputs.add(spec["output"])
+	return specs
+
+
+def newest_seasons(input_path: Path) -> List[str]:
+	"""
+	Seasons del archivo, de la más reciente a la más antigua.
+
+	Lee solo la columna season (diccionario, unas pocas páginas por row
+	group), no el archivo completo.
+	"""
+	seasons = pq.read_table(input_path, columns=["season"]).column("season").unique().to_pylist()
+	return sorted((season for season in seasons if season is not None), reverse=True)
+
+
+def default_metrics_path(output_path: Path) -> Path:
+	"""JSON de métricas junto al Parquet (data/x.parquet -> data/x_metrics.json, como DEFAULT_METRICS_PATH)."""
+	return output_path.with_name(f"{output_path.stem}_metrics.json")
+
+
+def subset_predicate(spec: Dict[str, Any], available: Optional[List[str]] = None) -> pl.Expr:
+	"""
+	Filtro de un subconjunto (conjunción de sus filtros; sin filtros, todas las filas).
+
+	Args:
+		spec: Especificación del subconjunto
+		available: Seasons del archivo, más reciente primero (newest_seasons);
+			requerido si la especificación usa last_seasons
+	"""
+	predicate = pl.lit(True)
+	for key, column in FILTER_COLUMNS.items():
+		if spec.get(key) is not None:
+			if not spec[key]:
+				raise ValueError(f"Subconjunto {spec['name']}: '{key}' está vacío.")
+			predicate = predicate & pl.col(column).is_in(spec[key])
+	if spec.get("last_seasons"):
+		predicate = predicate & pl.col("season").is_in(available[:spec["last_seasons"]])
+	return predicate
+
+
 def create_mvp_dataset(
 	input_path: Path,
 	output_path: Path,
 	seasons: List[str],
 	metrics_path: Optional[Path] = None,
+	cluster: bool = False,
+	row_group_size: Optional[int] = None,
+	profile: str = "dashboard",
 ) -> dict:
 	if not input_path.exists():
 		raise FileNotFoundError(f"No se encontró el archivo de entrada: {input_path}")
@@ -64,27 +202,176 @@ def create_mvp_dataset(
 	if not seasons:
 		raise ValueError("Debe especificar al menos una temporada para filtrar.")
 
-	print(f"[INFO] Leyendo dataset desde {input_path}")
 	print(f"[INFO] Temporadas objetivo: {seasons}")
+	spec = {
+		"name": "mvp",
+		"output": output_path,
+		"metrics": metrics_path,
+		"seasons": seasons,
+		"cluster": cluster,
+		"row_group_size": row_group_size,
+		"profile": profile,
+		"stage": "mvp",
+	}
+	return create_subsets(input_path, [spec])[0]
+
+
+def create_subsets(
+	input_path: Path,
+	specs: List[Dict[str, Any]],
+	cluster: bool = False,
+	row_group_size: Optional[int] = None,
+	profile: str = "dashboard",
+	batch_size: int = DEFAULT_BATCH_SIZE,
+) -> List[dict]:
+	"""
+	Generar varios subconjuntos en una sola lectura en streaming del archivo.
+
+	Cada lote se filtra con cada especificación: las filas van a su Parquet
+	(en row groups completos, como write_parquet_profile) y a sus totales por
+	season. Los subconjuntos con cluster se acumulan en memoria para
+	ordenarlos por Z-order. Los archivos se escriben en temporales y solo se
+	publican si todos los subconjuntos tienen filas. Las seasons de
+	last_seasons se resuelven una sola vez para todas las especificaciones.
+
+	Args:
+		input_path: Dataset listo para el dashboard
+		specs: Especificaciones (ver docstring del módulo)
+		cluster, row_group_size, profile: Valores por defecto de las especificaciones
+		batch_size: Filas por lote de lectura
+
+	Returns:
+		Métricas de cada subconjunto, en el orden de specs
+	"""
+	if not input_path.exists():
+		raise FileNotFoundError(f"No se encontró el archivo de entrada: {input_path}")
+
+	print(f"[INFO] Leyendo dataset desde {input_path} ({len(specs)} subconjuntos)")
+	available = newest_seasons(input_path) if any(spec.get("last_seasons") for spec in specs) else None
+	states = []
+	for spec in specs:
+		output_path = Path(spec["output"])
+		output_path.parent.mkdir(parents=True, exist_ok=True)
+		tmp_path = output_path.with_name(f".{output_path.name}.{uuid.uuid4().hex}.tmp")
+		spec_profile = spec.get("profile", profile)
+		state = {
+			"spec": spec,
+			"predicate": subset_predicate(spec, available),
+			"output_path": output_path,
+			"tmp_path": tmp_path,
+			"profile": spec_profile,
+			"cluster": spec.get("cluster", cluster),
+			"row_group_size": spec.get("row_group_size", row_group_size),
+			"seasons": {},
+			"frames": [],
+		}
+		state["writer"] = None if state["cluster"] else RowGroupWriter(tmp_path, spec_profile, state["row_group_size"])
+		states.append(state)
+
+	try:
+		for batch in pq.ParquetFile(input_path).iter_batches(batch_size=batch_size):
+			df = pl.from_arrow(batch)
+			for state in states:
+				part = df.filter(state["predicate"])
+				if part.height == 0:
+					continue
+				merge_season_totals(state["seasons"], season_totals(part))
+				if state["writer"] is not None:
+					state["writer"].write(part.to_arrow())
+				else:
+					state["frames"].append(part)
+
+		for state in states:
+			if not state["seasons"]:
+				raise RuntimeError(
+					f"El filtro de {state['spec']['name']} no devolvió registros. "
+					"Verifica que las temporadas existan en el dataset."
+				)
+
+		results = []
+		for state in states:
+			df_cluster = None
+			if state["writer"] is not None:
+				state["writer"].close()
+			else:
+				df_cluster = cluster_zorder(pl.concat(state["frames"]))
+				state["frames"] = []
+				write_parquet_profile(
+					df_cluster,
+					state["tmp_path"],
+					state["profile"],
+					state["row_group_size"] or DEFAULT_ROW_GROUP_SIZE,
+				)
+			os.replace(state["tmp_path"], state["output_path"])
 
-	lf = pl.scan_parquet(str(input_path))
-	filtered = lf.filter(pl.col("season").is_in(seasons))
-	df = filtered.collect()
+			spec = state["spec"]
+			record_totals(state["seasons"], spec.get("stage", "subset"), state["output_path"])
+			if "metrics" in spec:
+				metrics_path = Path(spec["metrics"]) if spec["metrics"] else None
+			else:
+				metrics_path = default_metrics_path(state["output_path"])
+			if len(states) > 1:
+				print(f"[INFO] Subconjunto {spec['name']}:")
+			results.append(finish_subset(state["seasons"], str(input_path), state["output_path"], metrics_path, df_cluster))
+		return results
+	finally:
+		for state in states:
+			if state["writer"] is not None:
+				state["writer"].abort()
+			state["tmp_path"].unlink(missing_ok=True)
 
+
+def save_mvp_dataset(
+	df: pl.DataFrame,
+	source: str,
+	output_path: Path,
+	metrics_path: Optional[Path] = None,
+	cluster: bool = False,
+	row_group_size: Optional[int] = None,
+	profile: str = "dashboard",
+) -> dict:
+	"""Escribir las filas ya filtradas del MVP (también desde memoria, ver datacl.py)."""
 	if df.height == 0:
 		raise RuntimeError("El filtro no devolvió registros. Verifica que las temporadas existan en el dataset.")
 
+	if cluster:
+		df = cluster_zorder(df)
+		if row_group_size is None:
+			row_group_size = DEFAULT_ROW_GROUP_SIZE
+
 	output_path.parent.mkdir(parents=True, exist_ok=True)
-	df.write_parquet(str(output_path), compression="snappy")
+	write_parquet_profile(df, output_path, profile, row_group_size)
+	seasons = record_stage(df, "mvp", output_path)["seasons"]
+	return finish_subset(seasons, source, output_path, metrics_path, df if cluster else None)
+
 
+def finish_subset(
+	seasons: Dict[str, Dict[str, int]],
+	source: str,
+	output_path: Path,
+	metrics_path: Optional[Path] = None,
+	df_cluster: Optional[pl.DataFrame] = None,
+) -> dict:
+	"""
+	Métricas de un subconjunto ya escrito, a partir de sus totales por season.
+
+	Args:
+		seasons: Totales por season del subconjunto (season_totals)
+		source: Archivo de entrada
+		output_path: Parquet escrito
+		metrics_path: JSON de métricas (None = no se guarda)
+		df_cluster: Filas ordenadas por Z-order (solo con cluster, para el
+			reporte de row groups)
+	"""
+	totals = sum_totals(seasons)
 	stats = {
-		"input_path": str(input_path),
+		"input_path": source,
 		"output_path": str(output_path),
-		"row_count": df.height,
-		"season_count": df.select(pl.col("season").n_unique()).item(),
-		"seasons_found": sorted(df.select("season").unique().to_series().to_list()),
-		"total_boxes": int(df.select(pl.col("boxes").sum()).item()),
-		"total_net_weight_kg": float(df.select(pl.col("net_weight_kg").sum()).item()),
+		"row_count": totals["rows"],
+		"season_count": len(seasons),
+		"seasons_found": sorted(seasons),
+		"total_boxes": totals["boxes"],
+		"total_net_weight_kg": fixed_to_kilos(totals["kilos_g"]),
 	}
 
 	print("[INFO] Dataset MVP generado correctamente:")
@@ -95,6 +382,11 @@ def create_mvp_dataset(
 		f"- Total net_weight_kg: {stats['total_net_weight_kg']:,}"
 	)
 
+	if df_cluster is not None:
+		skip_report = row_group_skip_report(output_path, sample_predicates(df_cluster))
+		print_skip_report(skip_report)
+		stats["row_group_skip_report"] = skip_report
+
 	if metrics_path:
 		metrics_path.parent.mkdir(parents=True, exist_ok=True)
 		with metrics_path.open("w", encoding="utf-8") as fp:
@@ -106,8 +398,26 @@ def create_mvp_dataset(
 
 def main() -> None:
 	args = parse_args()
+	if args.subsets:
+		create_subsets(
+			args.input,
+			load_subset_specs(args.subsets),
+			cluster=args.cluster,
+			row_group_size=args.row_group_size,
+			profile=args.profile,
+		)
+		return
+
 	seasons = [season.strip() for season in args.seasons.split(",") if season.strip()]
-	create_mvp_dataset(args.input, args.output, seasons, args.metrics)
+	create_mvp_dataset(
+		args.input,
+		args.output,
+		seasons,
+		args.metrics,
+		cluster=args.cluster,
+		row_group_size=args.row_group_size,
+		profile=args.profile,
+	)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,196 @@
+"""
+Columnas derivadas del dataset listo para el dashboard.
+
+absolute_season_week, season_start_year, season_end_year, unit_weight_kg e
+is_data_outlier (y la limpieza de strings de variety, importer, exporter,
+market y region) dependen solo de la fila, así que se pueden calcular por
+semana al normalizar en lugar de en una pasada sobre el dataset completo.
+
+normalize.py --dashboard escribe, junto a cada Parquet de data_clean/, su
+parte del dataset del dashboard en data_dashboard/: el mismo resultado que
+producen combine → clean_nulls → Pipeline_transformación para las filas de
+esa semana (schema final, source_week, relleno de nulos y columnas
+derivadas). El dataset del dashboard es entonces la concatenación de las
+partes (scan_dashboard_parts), ordenada por season. Solo cuentan las partes
+con un Parquet del mismo nombre en data_clean/: la parte de una semana
+borrada o renombrada queda huérfana (orphan_dashboard_parts) y se ignora.
+
+Uso:
+	python scripts/normalize.py --dashboard
+	python scripts/Pipeline_transformación.py --from-parts
+"""
+
+import polars as pl
+from pathlib import Path
+from typing import List, Optional
+
+from clean_nulls import fill_expressions, fill_values
+from combine import enforce_final_schema, extract_week_number
+
+
+SPLIT_WEEK = 35 # Semana de inicio de temporada (basado en análisis de datos reales)
+
+DERIVED_COLUMNS = [
+	"season_start_year",
+	"season_end_year",
+	"absolute_season_week",
+	"unit_weight_kg",
+	"is_data_outlier",
+]
+
+# Orden dentro de cada season: semana absoluta y luego el orden de combine.py
+PARTS_SORT_COLUMNS = ["absolute_season_week", "year", "week", "source_week"]
+
+
+def add_dashboard_columns(lf: pl.LazyFrame) -> pl.LazyFrame:
+	"""
+	Reglas de negocio fila a fila sobre un LazyFrame (sin ordenar).
+
+	Todas las columnas derivadas dependen solo de la fila, así que la
+	transformación se puede aplicar por partición (season o semana).
+
+	Args:
+		lf: Dataset limpio (nulos ya rellenados)
+
+	Returns:
+		LazyFrame con las columnas de DERIVED_COLUMNS agregadas
+	"""
+	# Normalizar columnas a minúsculas y strip (si es necesario)
+	# Nota: El dataset ya viene con columnas en minúsculas, pero mantenemos esto por seguridad
+	columns = lf.collect_schema().names()
+	lf = lf.rename({col: col.lower().strip() for col in columns})
+	columns = [col.lower().strip() for col in columns]
+
+	# Limpieza de Strings (Evita duplicados en Rankings)
+	cols_texto = ['variety', 'importer', 'exporter', 'market', 'region']
+	lf = lf.with_columns([
+		pl.col(col).str.strip_chars().str.to_titlecase().alias(col)
+		for col in cols_texto if col in columns
+	])
+
+	# Extraer inicio y fin de temporada del string "2024-2025"
+	if 'season' in columns:
+		season_parts = pl.col("season").str.split("-")
+		lf = lf.with_columns([
+			season_parts.list.get(0).cast(pl.Int32).alias("season_start_year"),
+			season_parts.list.get(1).cast(pl.Int32).alias("season_end_year")
+		])
+
+	# CREACIÓN DE "ABSOLUTE SEASON WEEK"
+	# Lógica: Si la temporada empieza aprox en semana 35:
+	# - Semanas 35 a 53 del año 1 -> Índices 1 a 19
+	# - Semanas 1 a 34 del año 2 -> Índices 20 a 53
+	# Esto permite que al graficar, enero aparezca DESPUÉS de diciembre.
+	lf = lf.with_columns(
+		pl.when(pl.col("week") >= SPLIT_WEEK)
+		.then(pl.col("week") - SPLIT_WEEK + 1) # Ej: Sem 35 -> Indice 1, Sem 53 -> Indice 19
+		.otherwise(pl.col("week") + (53 - SPLIT_WEEK) + 1) # Ej: Sem 1 -> Indice 20, Sem 34 -> Indice 53
+		.alias("absolute_season_week")
+	)
+
+	if 'boxes' in columns and 'net_weight_kg' in columns:
+		# El cociente se calcula una sola vez; el flag usa el valor sin fill_nan
+		# (NaN > 25 es True en polars, igual que 0 < 1 tras el fill)
+		lf = lf.with_columns(
+			(pl.col("net_weight_kg") / pl.col("boxes")).alias("unit_weight_kg")
+		).with_columns([
+			# Unit Weight (para detección de anomalías en gráficos)
+			pl.col("unit_weight_kg").fill_nan(0),
+
+			# Flag de Outlier (Regla simple: < 1kg o > 25kg por caja)
+			pl.when((pl.col("unit_weight_kg") < 1) | (pl.col("unit_weight_kg") > 25))
+			  .then(True)
+			  .otherwise(False)
+			  .alias("is_data_outlier")
+		])
+
+	return lf
+
+
+def weekly_dashboard_part(df: pl.DataFrame, parquet_name: str) -> pl.DataFrame:
+	"""
+	Parte del dataset del dashboard correspondiente a un Parquet semanal.
+
+	Aplica a las filas de una semana los mismos pasos fila a fila que el
+	pipeline completo: source_week y schema final (combine.py), relleno de
+	nulos (clean_nulls.py) y columnas derivadas (add_dashboard_columns).
+
+	Args:
+		df: DataFrame normalizado de la semana (salida de normalize_schema)
+		parquet_name: Nombre del Parquet en data_clean/ (de él sale source_week)
+
+	Returns:
+		DataFrame con el schema del dataset del dashboard
+	"""
+	week_number = extract_week_number(parquet_name)
+	lf = df.lazy().with_columns(
+		pl.lit(week_number if week_number is not None else -1).alias("source_week")
+	)
+	lf = enforce_final_schema(lf)
+	lf = lf.with_columns(fill_expressions(fill_values(lf.collect_schema())))
+	return add_dashboard_columns(lf).collect()
+
+
+def missing_dashboard_parts(data_clean_dir: Path, parts_dir: Path) -> List[str]:
+	"""
+	Parquets semanales sin parte del dashboard o con una parte más antigua.
+
+	Args:
+		data_clean_dir: Directorio con Parquets normalizados
+		parts_dir: Directorio con las partes del dashboard
+
+	Returns:
+		Nombres de los Parquets de data_clean/ cuya parte falta o está desactualizada
+	"""
+	missing = []
+	for parquet_file in sorted(data_clean_dir.glob("*.parquet")):
+		part = parts_dir / parquet_file.name
+		if not part.exists() or part.stat().st_mtime < parquet_file.stat().st_mtime:
+			missing.append(parquet_file.name)
+	return missing
+
+
+def orphan_dashboard_parts(data_clean_dir: Path, parts_dir: Path) -> List[str]:
+	"""
+	Partes del dashboard sin Parquet semanal (semana borrada o renombrada).
+
+	Args:
+		data_clean_dir: Directorio con Parquets normalizados
+		parts_dir: Directorio con las partes del dashboard
+
+	Returns:
+		Nombres de las partes de parts_dir sin Parquet en data_clean/
+	"""
+	weekly = {path.name for path in data_clean_dir.glob("*.parquet")}
+	return [part.name for part in sorted(parts_dir.glob("*.parquet")) if part.name not in weekly]
+
+
+def scan_dashboard_parts(parts_dir: Path, data_clean_dir: Optional[Path] = None) -> pl.LazyFrame:
+	"""
+	Vista lazy del dataset del dashboard como concatenación de las partes.
+
+	Las filas quedan en el orden de las partes; ordenar cada season por
+	PARTS_SORT_COLUMNS (con maintain_order=True) da el orden del dataset
+	generado por Pipeline_transformación.py.
+
+	Args:
+		parts_dir: Directorio con las partes (data_dashboard/)
+		data_clean_dir: Si se indica, solo se leen las partes con Parquet
+			semanal en este directorio (las huérfanas se ignoran con un aviso)
+
+	Returns:
+		LazyFrame con las partes
+	"""
+	parts = sorted(parts_dir.glob("*.parquet"))
+	if data_clean_dir is not None:
+		orphans = set(orphan_dashboard_parts(data_clean_dir, parts_dir))
+		if orphans:
+			print(f"  ⚠️  {len(orphans)} partes del dashboard sin Parquet en {data_clean_dir} "
+				f"(p. ej. {min(orphans)}); se ignoran")
+		parts = [part for part in parts if part.name not in orphans]
+	if not parts:
+		raise FileNotFoundError(
+			f"No hay partes del dashboard en {parts_dir}\n"
+			"Ejecuta primero: python scripts/normalize.py --dashboard"
+		)
+	return pl.scan_parquet(parts)
@@ -0,0 +1,267 @@
+"""
+CLI unificada del pipeline: datacl <comando> [opciones].
+
+Cada subcomando ejecuta el script correspondiente en el mismo proceso (las
+opciones se pasan tal cual, p. ej. datacl combine --star). run-all ejecuta
+combine → validate → clean_nulls → transform → mvp en un solo proceso: el
+dataset maestro pasa en memoria de una etapa a otra en lugar de escribirse
+y volver a leerse en cada script. Solo se persisten los artefactos que usan
+otros consumidores (snapshots del maestro y del limpio, dataset del
+dashboard, MVP, reportes y ledger de linaje); con --virtual tampoco se
+escribe la copia limpia (ver clean_nulls.py --virtual).
+
+Las rutas relativas se resuelven desde la raíz del proyecto.
+
+Uso:
+	python scripts/datacl.py run-all
+	python scripts/datacl.py run-all --normalize --virtual
+	python scripts/datacl.py combine --split
+	python scripts/datacl.py lineage reconcile
+"""
+
+import argparse
+import importlib
+import os
+import sys
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import polars as pl
+
+from parquet_profiles import PROFILES
+
+
+PROJECT_ROOT = Path(__file__).parent.parent
+DATA_DIR = PROJECT_ROOT / "data"
+AUDIT_DIR = PROJECT_ROOT / "audit"
+
+# Subcomando -> (módulo de scripts/, descripción)
+COMMANDS = {
+	"inventory": ("inventory", "Inventario de columnas de los CSV"),
+	"schema": ("generate_schema", "Generar schema_master.json"),
+	"normalize": ("normalize", "Normalizar CSVs semanales a Parquet"),
+	"audit": ("audit_normalization", "Auditar la normalización contra los CSV"),
+	"combine": ("combine", "Combinar Parquets en el dataset maestro"),
+	"validate": ("validate", "Validar el dataset maestro"),
+	"clean-nulls": ("clean_nulls", "Rellenar nulos del dataset maestro"),
+	"compact": ("compact", "Compactar filas con la misma clave"),
+	"transform": ("Pipeline_transformación", "Generar el dataset del dashboard"),
+	"mvp": ("create_mvp_dataset", "Generar el dataset MVP"),
+	"lineage": ("lineage", "Ledger de totales por etapa"),
+	"pipeline": ("pipeline", "Orquestador con caché por contenido"),
+	"progressive": ("progressive", "Publicar primero el MVP y rellenar la historia en segundo plano"),
+	"datasets": ("dataset_registry", "Registro de datasets derivados (virtuales o materializados)"),
+}
+
+
+def run_command(command: str, argv: List[str]) -> None:
+	"""
+	Ejecutar el main() de un script en el proceso actual.
+
+	Args:
+		command: Subcomando (ver COMMANDS)
+		argv: Opciones para el script
+	"""
+	module = importlib.import_module(COMMANDS[command][0])
+	saved_argv = sys.argv
+	sys.argv = [f"datacl {command}", *argv]
+	try:
+		module.main()
+	finally:
+		sys.argv = saved_argv
+
+
+@contextmanager
+def stage_timer(name: str, timings: Dict[str, float]):
+	"""Medir la duración de una etapa de run-all."""
+	print("\n" + "="*60)
+	print(f"[datacl] {name}")
+	print("="*60)
+	start = time.perf_counter()
+	try:
+		yield
+	finally:
+		timings[name] = time.perf_counter() - start
+
+
+def run_all(
+	normalize: bool = False,
+	virtual: bool = False,
+	full_validation: bool = False,
+	profile: str = "default",
+	dashboard_profile: str = "dashboard",
+	seasons: Optional[List[str]] = None
+) -> Dict[str, float]:
+	"""
+	Ejecutar el pipeline desde combine hasta el MVP en un solo proceso.
+
+	Args:
+		normalize: Si True, corre antes normalize y audit (que escriben los
+			Parquets semanales y audit/full_audit.csv)
+		virtual: Si True, no escribe la copia limpia (solo la especificación)
+		full_validation: Si True, ignora la caché de validación
+		profile: Perfil de escritura del maestro y del limpio
+		dashboard_profile: Perfil del dataset del dashboard y del MVP
+		seasons: Temporadas del MVP (None = create_mvp_dataset.DEFAULT_SEASONS)
+
+	Returns:
+		Dict etapa -> segundos
+	"""
+	from clean_nulls import (
+		clean_frame,
+		print_null_summary,
+		virtual_spec_path,
+		virtualize_clean,
+	)
+	from combine import combine_datasets, load_parquet_files, save_master_dataset
+	from create_mvp_dataset import (
+		DEFAULT_INPUT_PATH,
+		DEFAULT_METRICS_PATH,
+		DEFAULT_OUTPUT_PATH,
+		DEFAULT_SEASONS,
+		save_mvp_dataset,
+	)
+	from dashboard_columns import add_dashboard_columns
+	from lineage import record_totals
+	from snapshots import publish_file
+	from validate import (
+		generate_validation_report,
+		get_expected_totals_from_audit,
+		run_frame_validation,
+		validate_row_count,
+		validate_schema,
+		validate_totals,
+		validate_types,
+	)
+
+	master_path = DATA_DIR / "exports_10_years.parquet"
+	clean_path = DATA_DIR / "exports_10_years_clean.parquet"
+	spec_path = virtual_spec_path(clean_path)
+	timings: Dict[str, float] = {}
+
+	if normalize:
+		with stage_timer("normalize", timings):
+			run_command("normalize", ["--profile", profile])
+		with stage_timer("audit", timings):
+			run_command("audit", [])
+
+	with stage_timer("combine", timings):
+		lazy_frames_with_week = load_parquet_files(PROJECT_ROOT / "data_clean")
+		if not lazy_frames_with_week:
+			raise FileNotFoundError("No hay Parquets en data_clean/. Ejecuta: datacl normalize")
+		df_master = save_master_dataset(combine_datasets(lazy_frames_with_week), master_path, profile=profile)
+
+	with stage_timer("validate", timings):
+		expected_totals = get_expected_totals_from_audit()
+		schema_validation = validate_schema(df_master.schema)
+		types_validation = validate_types(schema_validation)
+		results = run_frame_validation(df_master, AUDIT_DIR / "validation_cache.json", full_validation)
+		generate_validation_report(
+			schema_validation,
+			types_validation,
+			results["null_counts"],
+			results["outliers"],
+			results["duplicates"],
+			validate_totals(results, expected_totals),
+			validate_row_count(results, expected_totals),
+			AUDIT_DIR / "final_validation.json",
+			results["top_duplicates"]
+		)
+
+	with stage_timer("clean_nulls", timings):
+		if virtual:
+			spec = virtualize_clean(master_path, clean_path)
+			print_null_summary(spec["fills"], spec["null_counts"])
+			df_clean = df_master.with_columns([pl.col(col).fill_null(value) for col, value in spec["fills"].items()])
+		else:
+			result = {}
+
+			def write(path: Path) -> None:
+				result.update(clean_frame(df_master, path, profile))
+
+			publish_file(write, clean_path.stem, clean_path)
+			record_totals(result["seasons"], "clean_nulls", clean_path, replaces=[spec_path])
+			spec_path.unlink(missing_ok=True)
+			print_null_summary(result["fills"], result["null_counts"])
+			df_clean = result["df"]
+	del df_master
+
+	# transform y mvp reciben el DataFrame limpio en memoria
+	transform = importlib.import_module("Pipeline_transformación")
+	seasons = seasons or DEFAULT_SEASONS
+	with stage_timer("transform", timings):
+		# Las seasons del MVP se conservan ya ordenadas (mismo orden que el archivo)
+		kept = transform.exportar_dataset(
+			add_dashboard_columns(df_clean.lazy()),
+			DATA_DIR / "dataset_dashboard_ready.parquet",
+			dashboard_profile,
+			keep_seasons=set(seasons),
+		)
+	del df_clean
+
+	with stage_timer("mvp", timings):
+		if not kept:
+			raise RuntimeError("El filtro no devolvió registros. Verifica que las temporadas existan en el dataset.")
+		df_mvp = pl.concat(kept)
+		save_mvp_dataset(
+			df_mvp,
+			str(DEFAULT_INPUT_PATH),
+			DEFAULT_OUTPUT_PATH,
+			DEFAULT_METRICS_PATH,
+			profile=dashboard_profile,
+		)
+
+	return timings
+
+
+def print_timings(timings: Dict[str, float]) -> None:
+	"""Imprimir la duración de cada etapa de run-all."""
+	print("\n" + "="*60)
+	print("TIEMPOS POR ETAPA")
+	print("="*60)
+	for name, seconds in timings.items():
+		print(f"  {name:<12} {seconds:>8.2f}s")
+	print(f"  {'total':<12} {sum(timings.values()):>8.2f}s")
+
+
+def parse_args(argv: List[str]):
+	parser = argparse.ArgumentParser(prog="datacl", description="CLI unificada del pipeline DataCL.")
+	subparsers = parser.add_subparsers(dest="command", required=True)
+
+	run_all_parser = subparsers.add_parser("run-all", help="combine → validate → clean_nulls → transform → mvp en un solo proceso")
+	run_all_parser.add_argument("--normalize", action="store_true", help="Correr antes normalize y audit")
+	run_all_parser.add_argument("--virtual", action="store_true", help="No escribir la copia limpia (clean_nulls.py --virtual)")
+	run_all_parser.add_argument("--full", action="store_true", help="Ignorar la caché de validación")
+	run_all_parser.add_argument("--profile", choices=list(PROFILES), default="default", help="Perfil del maestro y del limpio (default: default)")
+	run_all_parser.add_argument("--dashboard-profile", choices=list(PROFILES), default="dashboard", help="Perfil del dashboard y del MVP (default: dashboard)")
+	run_all_parser.add_argument("--seasons", type=str, default=None, help="Temporadas del MVP separadas por coma")
+
+	# Los subcomandos de script pasan sus opciones sin interpretarlas (incluido --help)
+	for command, (_, description) in COMMANDS.items():
+		subparsers.add_parser(command, help=description, add_help=False)
+
+	return parser.parse_known_args(argv)
+
+
+def main():
+	"""Función principal de la CLI."""
+	args, rest = parse_args(sys.argv[1:])
+	os.chdir(PROJECT_ROOT)
+
+	if args.command != "run-all":
+		run_command(args.command, rest)
+		return
+
+	if rest:
+		print(f"Error: opciones no reconocidas: {' '.join(rest)}")
+		sys.exit(2)
+	seasons = [season.strip() for season in args.seasons.split(",") if season.strip()] if args.seasons else None
+	timings = run_all(args.normalize, args.virtual, args.full, args.profile, args.dashboard_profile, seasons)
+	print_timings(timings)
+	print("\n✓ Pipeline completado.")
+
+
+if __name__ == "__main__":
+	main()
@@ -0,0 +1,429 @@
+"""
+Registro de datasets derivados.
+
+Cada dataset se declara en REGISTRY como transformación de su padre (view,
+fila a fila y lazy) con un modo por defecto:
+
+- materialized: el archivo data/<file> se escribe con el materializador del
+  dataset (los mismos scripts del pipeline) y refresh() lo vuelve a generar
+  solo si su padre cambió después de escribirlo.
+- virtual: no hay archivo; scan_dataset() aplica la transformación al
+  escanear el padre (predicados y proyecciones llegan hasta el Parquet del
+  primer ancestro materializado).
+
+El modo vigente lo indica el marcador data/<stem>.virtual.json: si existe,
+el dataset es virtual (para clean es la especificación de relleno de
+clean_nulls.py --virtual); si no, es materializado cuando hay archivo, y si
+no hay ninguno de los dos rige el modo declarado. virtualize / materialize
+cambian el modo de un dataset.
+
+analysis/loader.py y el puente Python del dashboard (dashboard/src/lib/
+data-cache.ts) resuelven los nombres de dataset a través de este registro.
+
+Uso:
+	python scripts/dataset_registry.py status
+	python scripts/dataset_registry.py refresh
+	python scripts/dataset_registry.py refresh dashboard_mvp --force
+	python scripts/dataset_registry.py virtualize dashboard_mvp
+	python scripts/dataset_registry.py materialize clean
+"""
+
+import argparse
+import importlib
+import json
+import os
+import uuid
+from datetime import datetime, timezone
+from functools import partial
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import polars as pl
+
+from clean_nulls import fill_expressions, fill_values, virtual_spec_path
+from compact import compact_dataset
+from create_mvp_dataset import DEFAULT_SEASONS
+from dashboard_columns import add_dashboard_columns
+from lineage import record_totals, season_totals
+from sample_dataset import SAMPLE_FRACTIONS, sample_path, stratified_sample
+from snapshots import read_manifest
+
+
+PROJECT_ROOT = Path(__file__).parent.parent
+DATA_DIR = PROJECT_ROOT / "data"
+
+
+def view_clean(lf: pl.LazyFrame) -> pl.LazyFrame:
+	"""Relleno de nulos de clean_nulls.py ("SN" / 0)."""
+	return lf.with_columns(fill_expressions(fill_values(lf.collect_schema())))
+
+
+def view_mvp(lf: pl.LazyFrame) -> pl.LazyFrame:
+	"""Temporadas del MVP."""
+	return lf.filter(pl.col("season").is_in(DEFAULT_SEASONS))
+
+
+def materialize_clean() -> None:
+	"""Copia limpia por lotes desde el maestro (clean_nulls.py)."""
+	from clean_nulls import materialize_clean as write_clean
+	write_clean(resolve_file("master")[1], dataset_path("clean"))
+
+
+def materialize_compact() -> None:
+	"""Dataset compactado, verificado contra audit/final_validation.json (compact.py)."""
+	from compact import get_expected_totals, verify_totals
+	from snapshots import publish_dataframe
+
+	df = compact_dataset(scan_dataset("clean")).collect()
+	verification = verify_totals(df, get_expected_totals(PROJECT_ROOT / "audit" / "final_validation.json"))
+	if not verification["totals_ok"]:
+		raise RuntimeError("Los totales del dataset compactado no coinciden con audit/final_validation.json")
+	publish_dataframe(df, dataset_path("compact").stem, dataset_path("compact"))
+
+
+def materialize_dashboard_ready() -> None:
+	"""Dataset del dashboard, una season a la vez (Pipeline_transformación.py)."""
+	transform = importlib.import_module("Pipeline_transformación")
+	transform.exportar_dataset(add_dashboard_columns(scan_dataset("clean")), dataset_path("dashboard_ready"))
+
+
+def materialize_dashboard_mvp() -> None:
+	"""MVP y sus métricas (create_mvp_dataset.py)."""
+	from create_mvp_dataset import DEFAULT_METRICS_PATH, create_mvp_dataset, save_mvp_dataset
+
+	metrics_path = PROJECT_ROOT / DEFAULT_METRICS_PATH
+	if dataset_mode("dashboard_ready") == "materialized":
+		# Una sola lectura en streaming del archivo del dashboard
+		create_mvp_dataset(resolve_file("dashboard_ready")[1], dataset_path("dashboard_mvp"), DEFAULT_SEASONS, metrics_path)
+	else:
+		df = view_mvp(scan_dataset("dashboard_ready")).collect(engine="streaming")
+		save_mvp_dataset(df, REGISTRY["dashboard_ready"]["file"], dataset_path("dashboard_mvp"), metrics_path)
+
+
+def materialize_sample(name: str) -> None:
+	"""Muestra estratificada y ponderada, con error verificado (sample_dataset.py)."""
+	from sample_dataset import create_sample
+	create_sample(scan_dataset("dashboard_ready"), name)
+
+
+# Datasets en orden topológico (cada padre antes que sus hijos).
+# view: transformación lazy del padre; order: orden físico del archivo
+# materializado (se aplica también a la vista); stage: etapa del ledger de
+# linaje (lineage.py) que registra el dataset; on_demand: refresh solo lo
+# genera si ya existe o se pide por nombre
+REGISTRY: Dict[str, Dict[str, Any]] = {
+	"master": {
+		"file": "exports_10_years.parquet",
+		"parent": None,
+		"mode": "materialized",
+		"description": "Dataset maestro (combine.py)",
+	},
+	"clean": {
+		"file": "exports_10_years_clean.parquet",
+		"parent": "master",
+		"mode": "materialized",
+		"view": view_clean,
+		"materialize": materialize_clean,
+		"stage": "clean_nulls",
+		"description": "Nulos rellenados (clean_nulls.py)",
+	},
+	"compact": {
+		"file": "exports_10_years_compact.parquet",
+		"parent": "clean",
+		"mode": "materialized",
+		"view": compact_dataset,
+		"materialize": materialize_compact,
+		"on_demand": True,
+		"description": "Una fila por clave dimensional (compact.py)",
+	},
+	"dashboard_ready": {
+		"file": "dataset_dashboard_ready.parquet",
+		"parent": "clean",
+		"mode": "materialized",
+		"view": add_dashboard_columns,
+		"order": ["season", "absolute_season_week"],
+		"materialize": materialize_dashboard_ready,
+		"stage": "transform",
+		"description": "Columnas derivadas del dashboard (Pipeline_transformación.py)",
+	},
+	"dashboard_mvp": {
+		"file": "dataset_dashboard_mvp.parquet",
+		"parent": "dashboard_ready",
+		"mode": "virtual",
+		"view": view_mvp,
+		"materialize": materialize_dashboard_mvp,
+		"stage": "mvp",
+		"description": "Temporadas recientes del dashboard (create_mvp_dataset.py)",
+	},
+	**{
+		f"sample_{name}": {
+			"file": sample_path(name).name,
+			"parent": "dashboard_ready",
+			"mode": "materialized",
+			"view": partial(stratified_sample, fraction=fraction),
+			"materialize": partial(materialize_sample, name),
+			"on_demand": True,
+			"description": f"Muestra estratificada del {fraction:.0%} (sample_dataset.py)",
+		}
+		for name, fraction in SAMPLE_FRACTIONS.items()
+	},
+}
+
+
+def get_entry(name: str) -> Dict[str, Any]:
+	"""Entrada del registro, con un error claro si el nombre no existe."""
+	if name not in REGISTRY:
+		raise ValueError(f"Dataset desconocido: '{name}'. Disponibles: {list(REGISTRY)}")
+	return REGISTRY[name]
+
+
+def dataset_path(name: str) -> Path:
+	"""Ruta histórica del archivo materializado (data/<file>)."""
+	return DATA_DIR / get_entry(name)["file"]
+
+
+def marker_path(name: str) -> Path:
+	"""Marcador de dataset virtual (data/<stem>.virtual.json)."""
+	return virtual_spec_path(dataset_path(name))
+
+
+def resolve_file(name: str, snapshot: Optional[str] = None) -> Tuple[Optional[str], Path]:
+	"""
+	Archivo materializado de un dataset (snapshot vigente o ruta histórica).
+
+	Args:
+		name: Nombre del dataset
+		snapshot: Id de snapshot (None = el vigente)
+
+	Returns:
+		Tupla (snapshot_id o None, path)
+	"""
+	path = dataset_path(name)
+	info = read_manifest()["datasets"].get(path.stem)
+	# Sin snapshots, o retirado (snapshots.unpublish): la ruta histórica
+	if info is None or (snapshot is None and info["current"] is None):
+		if snapshot is not None:
+			raise ValueError(f"El dataset '{name}' no tiene snapshots publicados")
+		return None, path
+
+	snapshot_id = snapshot or info["current"]
+	for entry in info["snapshots"]:
+		if entry["id"] == snapshot_id:
+			return snapshot_id, PROJECT_ROOT / entry["file"]
+	raise ValueError(f"Snapshot '{snapshot_id}' no encontrado para '{name}'")
+
+
+def dataset_mode(name: str) -> str:
+	"""Modo vigente: "virtual" si hay marcador, "materialized" si hay archivo, si no el declarado."""
+	entry = get_entry(name)
+	if entry["parent"] is not None and marker_path(name).exists():
+		return "virtual"
+	if resolve_file(name)[1].exists():
+		return "materialized"
+	return entry["mode"]
+
+
+def open_dataset(name: str, snapshot: Optional[str] = None) -> Tuple[Optional[str], pl.LazyFrame]:
+	"""
+	Resolver un dataset a un LazyFrame.
+
+	Un dataset virtual se resuelve aplicando su vista al de su padre (de
+	forma recursiva); con snapshot se lee siempre el archivo de ese snapshot.
+
+	Args:
+		name: Nombre del dataset
+		snapshot: Id de snapshot (None = el vigente)
+
+	Returns:
+		Tupla (snapshot_id del archivo leído o None, LazyFrame)
+	"""
+	entry = get_entry(name)
+	if snapshot is None and dataset_mode(name) == "virtual":
+		snapshot_id, lf = open_dataset(entry["parent"])
+		lf = entry["view"](lf)
+		if entry.get("order"):
+			lf = lf.sort(entry["order"], maintain_order=True)
+		return snapshot_id, lf
+
+	snapshot_id, path = resolve_file(name, snapshot)
+	if not path.exists():
+		raise FileNotFoundError(
+			f"Dataset no encontrado: {path}\n"
+			f"Ejecuta: python scripts/dataset_registry.py refresh {name}"
+		)
+	return snapshot_id, pl.scan_parquet(path)
+
+
+def scan_dataset(name: str, snapshot: Optional[str] = None) -> pl.LazyFrame:
+	"""LazyFrame de un dataset del registro (ver open_dataset)."""
+	return open_dataset(name, snapshot)[1]
+
+
+def modified_at(name: str) -> Optional[float]:
+	"""
+	Última modificación efectiva de un dataset.
+
+	La del archivo si está materializado; si es virtual, la de su padre (la
+	vista tiene el mismo contenido que el archivo que reemplaza, así que
+	virtualizar un dataset no desactualiza a sus hijos).
+
+	Returns:
+		Timestamp (mtime) o None si el dataset no existe
+	"""
+	if dataset_mode(name) == "virtual":
+		return modified_at(get_entry(name)["parent"])
+
+	path = resolve_file(name)[1]
+	return path.stat().st_mtime if path.exists() else None
+
+
+def is_stale(name: str) -> bool:
+	"""Un dataset materializado falta o es más antiguo que su padre."""
+	entry = get_entry(name)
+	if entry["parent"] is None or dataset_mode(name) == "virtual":
+		return False
+	own = modified_at(name)
+	parent = modified_at(entry["parent"])
+	return own is None or (parent is not None and own < parent)
+
+
+def write_marker(name: str) -> Path:
+	"""
+	Escribir el marcador virtual de un dataset y registrar sus totales.
+
+	Para clean es la especificación de relleno (clean_nulls.virtualize_clean).
+	"""
+	entry = get_entry(name)
+	if name == "clean":
+		from clean_nulls import virtualize_clean
+		virtualize_clean(resolve_file("master")[1], dataset_path("clean"))
+		return marker_path(name)
+
+	path = marker_path(name)
+	marker = {
+		"source": dataset_path(entry["parent"]).stem,
+		"view": name,
+		"created_at": datetime.now(timezone.utc).isoformat(),
+	}
+	tmp_path = path.with_name(f".{path.name}.{uuid.uuid4().hex}.tmp")
+	with open(tmp_path, 'w', encoding='utf-8') as f:
+		json.dump(marker, f, indent=2, ensure_ascii=False)
+	os.replace(tmp_path, path)
+
+	if entry.get("stage"):
+		lf = entry["view"](scan_dataset(entry["parent"]))
+		record_totals(season_totals(lf), entry["stage"], path, replaces=[dataset_path(name)])
+	return path
+
+
+def virtualize(name: str) -> None:
+	"""
+	Pasar un dataset a virtual: marcador y borrado de la ruta histórica.
+
+	Los snapshots publicados se conservan (time travel) y los elimina la
+	política de retención de snapshots.py.
+	"""
+	entry = get_entry(name)
+	if entry["parent"] is None:
+		raise ValueError(f"'{name}' no tiene padre: no puede ser virtual")
+	path = write_marker(name)
+	dataset_path(name).unlink(missing_ok=True)
+	print(f"✓ {name} virtual ({path.relative_to(PROJECT_ROOT)})")
+
+
+def materialize(name: str) -> None:
+	"""Escribir el archivo de un dataset y retirar su marcador virtual."""
+	entry = get_entry(name)
+	if entry["parent"] is None:
+		raise FileNotFoundError(f"'{name}' es un dataset de origen: genéralo con {entry['description']}")
+	# La vista se resuelve antes de retirar el marcador (el materializador la lee)
+	entry["materialize"]()
+	marker_path(name).unlink(missing_ok=True)
+	print(f"✓ {name} materializado ({dataset_path(name).relative_to(PROJECT_ROOT)})")
+
+
+def refresh(names: Optional[List[str]] = None, force: bool = False) -> List[str]:
+	"""
+	Poner al día los datasets materializados cuyo padre cambió.
+
+	Recorre el registro en orden topológico, así que un padre refrescado
+	marca como desactualizados a sus hijos en la misma pasada. Un dataset
+	sin archivo ni marcador toma el modo declarado; los on_demand sin archivo
+	se generan solo si se piden por nombre.
+
+	Args:
+		names: Datasets a refrescar (None = todos)
+		force: Si True, regenera los materializados aunque estén al día
+
+	Returns:
+		Nombres de los datasets regenerados o virtualizados
+	"""
+	for name in names or []:
+		get_entry(name)
+
+	changed = []
+	for name, entry in REGISTRY.items():
+		if entry["parent"] is None or (names and name not in names):
+			continue
+		undeclared = not marker_path(name).exists() and not resolve_file(name)[1].exists()
+		if undeclared and entry.get("on_demand") and not names:
+			continue
+		if undeclared and entry["mode"] == "virtual":
+			virtualize(name)
+			changed.append(name)
+		elif dataset_mode(name) == "materialized" and (force or is_stale(name)):
+			print(f"\n[registry] Materializando {name}...")
+			materialize(name)
+			changed.append(name)
+	return changed
+
+
+def print_status() -> None:
+	"""Imprimir modo, estado y tamaño de cada dataset del registro."""
+	print("="*60)
+	print("REGISTRO DE DATASETS")
+	print("="*60)
+	for name, entry in REGISTRY.items():
+		mode = dataset_mode(name)
+		if mode == "virtual":
+			detail = f"vista de {entry['parent']}"
+		else:
+			path = resolve_file(name)[1]
+			if not path.exists():
+				detail = "sin archivo"
+			else:
+				detail = f"{path.stat().st_size / (1024 * 1024):,.1f} MB"
+				if is_stale(name):
+					detail += ", desactualizado"
+		print(f"  {name:<16} {mode:<13} {detail:<32} {entry['description']}")
+
+
+def parse_args() -> argparse.Namespace:
+	parser = argparse.ArgumentParser(description="Registro de datasets derivados (virtuales o materializados).")
+	subparsers = parser.add_subparsers(dest="command", required=True)
+	subparsers.add_parser("status", help="Modo y estado de cada dataset")
+	refresh_parser = subparsers.add_parser("refresh", help="Regenerar los datasets materializados desactualizados")
+	refresh_parser.add_argument("names", nargs="*", help="Datasets a refrescar (default: todos)")
+	refresh_parser.add_argument("--force", action="store_true", help="Regenerar aunque estén al día")
+	for command, help_text in (("virtualize", "Pasar un dataset a vista virtual"), ("materialize", "Escribir el archivo de un dataset")):
+		command_parser = subparsers.add_parser(command, help=help_text)
+		command_parser.add_argument("name", choices=[name for name, entry in REGISTRY.items() if entry["parent"]])
+	return parser.parse_args()
+
+
+def main():
+	"""Función principal del registro."""
+	args = parse_args()
+	if args.command == "status":
+		print_status()
+	elif args.command == "refresh":
+		changed = refresh(args.names, args.force)
+		print(f"\n✓ {len(changed)} datasets actualizados" + (f": {', '.join(changed)}" if changed else ""))
+	elif args.command == "virtualize":
+		virtualize(args.name)
+	else:
+		materialize(args.name)
+
+
+if __name__ == "__main__":
+	main()
@@ -0,0 +1,292 @@
+"""
+Diff rápido entre dos versiones de un dataset Parquet.
+
+Este script compara dos archivos (p. ej. el exports_10_years_clean.parquet de
+ayer y el de hoy) sin cargarlos completos en memoria:
+
+1. Reparte cada versión, en una sola lectura por lotes, en N archivos
+   temporales por hash % N (duplicates.spill_partitions, sobre las columnas
+   comunes). Filas iguales caen en la partición del mismo número en ambas.
+2. Compara las particiones de a pares: la multiplicidad de cada fila
+   (agrupando por las columnas reales, exacto aunque haya colisiones de
+   hash) en una y otra versión. Solo un par de particiones está en memoria
+   a la vez.
+3. Reporta filas agregadas y eliminadas (una fila modificada aparece como
+   una eliminada y una agregada) y los deltas de boxes y kilos por
+   (season, product, exporter).
+
+Uso:
+	python scripts/diff_datasets.py old.parquet new.parquet
+	python scripts/diff_datasets.py --dataset exports_10_years_clean   # snapshot anterior vs vigente
+"""
+
+import argparse
+import json
+import shutil
+import tempfile
+import polars as pl
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from duplicates import spill_partitions
+from snapshots import PROJECT_ROOT, read_manifest
+
+
+DEFAULT_PARTITIONS = 16
+DELTA_KEY = ["season", "product", "exporter"]
+# Columnas de metadatos que no forman parte del contenido de la fila
+IGNORED_COLUMNS = ["source_week", "source_row"]
+
+
+def compare_columns(old_path: Path, new_path: Path) -> List[str]:
+	"""
+	Determinar las columnas a comparar (comunes a ambas versiones).
+
+	Args:
+		old_path: Parquet de la versión anterior
+		new_path: Parquet de la versión nueva
+
+	Returns:
+		Columnas comunes en el orden de la versión nueva, sin metadatos
+	"""
+	old_columns = set(pl.scan_parquet(old_path).collect_schema().names())
+	new_columns = pl.scan_parquet(new_path).collect_schema().names()
+	return [col for col in new_columns if col in old_columns and col not in IGNORED_COLUMNS]
+
+
+def partition_counts(path: Optional[Path], columns: List[str], schema: pl.Schema) -> pl.LazyFrame:
+	"""
+	Multiplicidad de cada fila distinta de una partición.
+
+	Args:
+		path: Archivo de partición (None = la versión no tiene filas en ella)
+		columns: Columnas que definen la fila
+		schema: Schema de las columnas (para la partición vacía)
+
+	Returns:
+		LazyFrame con las columnas de la fila y count
+	"""
+	lf = pl.scan_parquet(path) if path is not None else pl.LazyFrame(schema=schema)
+	return lf.group_by(columns).agg(pl.len().cast(pl.Int64).alias("count"))
+
+
+def diff_partition(
+	old_part: Optional[Path],
+	new_part: Optional[Path],
+	columns: List[str],
+	schema: pl.Schema
+) -> pl.DataFrame:
+	"""
+	Calcular las filas que cambian de multiplicidad en un par de particiones.
+
+	Args:
+		old_part: Partición de la versión anterior (None si está vacía)
+		new_part: Partición del mismo número de la versión nueva (None si está vacía)
+		columns: Columnas que definen la fila
+		schema: Schema de las columnas
+
+	Returns:
+		DataFrame con las columnas de la fila y "delta" (>0 agregadas, <0 eliminadas)
+	"""
+	old = partition_counts(old_part, columns, schema)
+	new = partition_counts(new_part, columns, schema)
+
+	joined = new.join(old, on=columns, how="full", coalesce=True, nulls_equal=True, suffix="_old")
+	return (
+		joined
+		.with_columns((pl.col("count").fill_null(0) - pl.col("count_old").fill_null(0)).alias("delta"))
+		.filter(pl.col("delta") != 0)
+		.select(columns + ["delta"])
+		.collect()
+	)
+
+
+def diff_datasets(
+	old_path: Path,
+	new_path: Path,
+	num_partitions: int = DEFAULT_PARTITIONS,
+	spill_dir: Optional[Path] = None
+) -> Tuple[pl.DataFrame, pl.DataFrame]:
+	"""
+	Comparar dos versiones de un dataset por particiones de hash.
+
+	Args:
+		old_path: Parquet de la versión anterior
+		new_path: Parquet de la versión nueva
+		num_partitions: Particiones de hash (más particiones = menos memoria)
+		spill_dir: Directorio para particiones (None = temporal, se elimina al final)
+
+	Returns:
+		Tupla (changed_rows, deltas):
+		- changed_rows: filas con "delta" de multiplicidad distinto de cero
+		- deltas: delta de filas, boxes y kilos por (season, product, exporter)
+	"""
+	columns = compare_columns(old_path, new_path)
+	schema = pl.scan_parquet(new_path).select(columns).collect_schema()
+
+	tmp_dir = Path(tempfile.mkdtemp(prefix="diff_", dir=spill_dir))
+	try:
+		spilled = []
+		for name, path in (("old", old_path), ("new", new_path)):
+			(tmp_dir / name).mkdir()
+			parts = spill_partitions(path, tmp_dir / name, num_partitions, columns=columns)
+			spilled.append({part.name: part for part in parts})
+		old_parts, new_parts = spilled
+
+		changes = []
+		for name in sorted(set(old_parts) | set(new_parts)):
+			changes.append(diff_partition(old_parts.get(name), new_parts.get(name), columns, schema))
+			for parts in spilled:
+				if name in parts:
+					parts[name].unlink()
+	finally:
+		shutil.rmtree(tmp_dir, ignore_errors=True)
+	changed_rows = pl.concat(changes) if changes else pl.DataFrame(schema={**schema, "delta": pl.Int64})
+
+	key = [col for col in DELTA_KEY if col in columns]
+	deltas = (
+		changed_rows
+		.group_by(key)
+		.agg([
+			pl.col("delta").sum().alias("delta_rows"),
+			(pl.col("boxes") * pl.col("delta")).sum().alias("delta_boxes"),
+			(pl.col("net_weight_kg") * pl.col("delta")).sum().alias("delta_kilos"),
+		])
+		.filter((pl.col("delta_rows") != 0) | (pl.col("delta_boxes") != 0) | (pl.col("delta_kilos") != 0))
+		.sort(pl.col("delta_boxes").abs(), descending=True)
+	)
+
+	return changed_rows, deltas
+
+
+def resolve_versions(dataset: str, old_id: Optional[str], new_id: Optional[str]) -> Tuple[Path, Path]:
+	"""
+	Resolver dos snapshots de un dataset a rutas de archivo.
+
+	Args:
+		dataset: Nombre del dataset en el manifest
+		old_id: Snapshot anterior (None = el previo al vigente)
+		new_id: Snapshot nuevo (None = el vigente)
+
+	Returns:
+		Tupla (old_path, new_path)
+	"""
+	info = read_manifest()["datasets"].get(dataset)
+	if info is None:
+		raise ValueError(f"El dataset '{dataset}' no tiene snapshots publicados")
+
+	ids = sorted(entry["id"] for entry in info["snapshots"])
+	files = {entry["id"]: PROJECT_ROOT / entry["file"] for entry in info["snapshots"]}
+
+	new_id = new_id or info["current"]
+	if new_id is None:
+		raise ValueError(f"El dataset '{dataset}' no tiene snapshot vigente (fue retirado)")
+	if old_id is None:
+		previous = [snap_id for snap_id in ids if snap_id < new_id]
+		if not previous:
+			raise ValueError(f"No hay un snapshot anterior a {new_id}")
+		old_id = previous[-1]
+
+	for snap_id in (old_id, new_id):
+		if snap_id not in files:
+			raise ValueError(f"Snapshot '{snap_id}' no encontrado para '{dataset}'")
+
+	return files[old_id], files[new_id]
+
+
+def print_diff_summary(changed_rows: pl.DataFrame, deltas: pl.DataFrame, top: int) -> Dict[str, Any]:
+	"""
+	Imprimir resumen del diff y retornarlo como dict.
+
+	Args:
+		changed_rows: Filas con delta de multiplicidad
+		deltas: Deltas por (season, product, exporter)
+		top: Número de grupos a mostrar
+
+	Returns:
+		Dict con el resumen
+	"""
+	added = int(changed_rows.filter(pl.col("delta") > 0)["delta"].sum())
+	removed = int(-changed_rows.filter(pl.col("delta") < 0)["delta"].sum())
+
+	summary = {
+		"rows_added": added,
+		"rows_removed": removed,
+		"groups_changed": len(deltas),
+		"delta_boxes": int(deltas["delta_boxes"].sum()) if len(deltas) else 0,
+		"delta_kilos": float(deltas["delta_kilos"].sum()) if len(deltas) else 0.0,
+	}
+
+	print("\n" + "="*60)
+	print("DIFF DE DATASETS")
+	print("="*60)
+	print(f"Filas agregadas:    {summary['rows_added']:,}")
+	print(f"Filas eliminadas:   {summary['rows_removed']:,}")
+	print(f"Grupos con cambios: {summary['groups_changed']:,} (season, product, exporter)")
+	print(f"Delta boxes:        {summary['delta_boxes']:,}")
+	print(f"Delta kilos:        {summary['delta_kilos']:,.2f}")
+	if len(deltas):
+		print(f"\nTop {top} grupos por |delta boxes|:")
+		print(deltas.head(top))
+	print("="*60)
+
+	return summary
+
+
+def parse_args() -> argparse.Namespace:
+	parser = argparse.ArgumentParser(description="Diff entre dos versiones de un dataset Parquet.")
+	parser.add_argument("old", type=Path, nargs="?", help="Parquet de la versión anterior")
+	parser.add_argument("new", type=Path, nargs="?", help="Parquet de la versión nueva")
+	parser.add_argument("--dataset", type=str, default=None, help="Comparar snapshots de este dataset")
+	parser.add_argument("--old-snapshot", type=str, default=None, help="Snapshot anterior (default: previo al vigente)")
+	parser.add_argument("--new-snapshot", type=str, default=None, help="Snapshot nuevo (default: vigente)")
+	parser.add_argument(
+		"--partitions",
+		type=int,
+		default=DEFAULT_PARTITIONS,
+		help=f"Particiones de hash (default: {DEFAULT_PARTITIONS})",
+	)
+	parser.add_argument("--top", type=int, default=20, help="Grupos a mostrar (default: 20)")
+	parser.add_argument("--spill-dir", type=Path, default=None, help="Directorio para particiones (default: temporal)")
+	parser.add_argument("--output", type=Path, default=None, help="Parquet opcional con las filas cambiadas")
+	parser.add_argument("--report", type=Path, default=None, help="JSON opcional con resumen y deltas")
+	return parser.parse_args()
+
+
+def main():
+	"""Función principal del diff de datasets."""
+	args = parse_args()
+
+	if args.dataset:
+		old_path, new_path = resolve_versions(args.dataset, args.old_snapshot, args.new_snapshot)
+	elif args.old and args.new:
+		old_path, new_path = args.old, args.new
+	else:
+		print("Error: indica dos archivos Parquet o --dataset")
+		return
+
+	for path in (old_path, new_path):
+		if not path.exists():
+			print(f"Error: Archivo {path} no existe")
+			return
+
+	print(f"Versión anterior: {old_path}")
+	print(f"Versión nueva:    {new_path}")
+
+	changed_rows, deltas = diff_datasets(old_path, new_path, args.partitions, args.spill_dir)
+	summary = print_diff_summary(changed_rows, deltas, args.top)
+
+	if args.output:
+		args.output.parent.mkdir(parents=True, exist_ok=True)
+		changed_rows.write_parquet(args.output)
+		print(f"\n✓ Filas cambiadas guardadas: {args.output}")
+
+	if args.report:
+		args.report.parent.mkdir(parents=True, exist_ok=True)
+		with open(args.report, 'w', encoding='utf-8') as f:
+			json.dump({**summary, "deltas": deltas.to_dicts()}, f, indent=2, ensure_ascii=False)
+		print(f"✓ Reporte guardado: {args.report}")
+
+
+if __name__ == "__main__":
+	main()
@@ -0,0 +1,320 @@
+"""
+Detección de filas duplicadas con memoria acotada.
+
+En lugar de df.is_duplicated() sobre el dataset completo en memoria:
+
+1. Lee el Parquet por lotes (pyarrow iter_batches) y calcula un hash de 64
+   bits por fila de forma vectorizada (sobre las columnas de contenido).
+2. Reparte cada lote en N particiones por hash % N y las escribe (spill) a
+   archivos Parquet temporales. Filas idénticas caen siempre en la misma
+   partición.
+3. Procesa una partición a la vez agrupando por las columnas reales (no por
+   el hash), por lo que el conteo es exacto aunque haya colisiones de hash.
+
+La memoria máxima es la de un lote más una partición (~ total / N).
+
+Uso:
+	python scripts/duplicates.py
+	python scripts/duplicates.py --input data/exports_10_years.parquet --partitions 64 --top 20
+"""
+
+import argparse
+import json
+import shutil
+import tempfile
+import polars as pl
+import pyarrow.parquet as pq
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from provenance import ROW_COLUMN
+
+
+DEFAULT_PARTITIONS = 32
+DEFAULT_BATCH_SIZE = 250_000
+DEFAULT_TOP = 20
+
+# Columna de metadatos con la semana (archivo) de origen de cada fila
+SOURCE_COLUMN = "source_week"
+PARTITION_COLUMN = "__partition"
+
+
+def source_file_name(source_week: int) -> str:
+	"""Nombre del Parquet de data_clean/ del que proviene una fila (ver combine.py)."""
+	return f"datos_semana_{source_week}.parquet"
+
+
+def matching_row_groups(parquet_file: pq.ParquetFile, filters: Dict[str, Any]) -> List[int]:
+	"""
+	Row groups que pueden contener filas con column == valor para todos los filtros.
+
+	Usa las estadísticas min/max (y null_count para valor None) del Parquet;
+	si una columna no tiene estadísticas, el row group se conserva.
+
+	Args:
+		parquet_file: Archivo Parquet abierto
+		filters: Dict columna -> valor (None = nulo)
+
+	Returns:
+		Índices de row groups a leer
+	"""
+	names = parquet_file.schema_arrow.names
+	selected = []
+	for i in range(parquet_file.metadata.num_row_groups):
+		row_group = parquet_file.metadata.row_group(i)
+		keep = True
+		for col, value in filters.items():
+			stats = row_group.column(names.index(col)).statistics
+			if stats is None:
+				continue
+			if value is None:
+				keep = stats.null_count is None or stats.null_count > 0
+			elif stats.has_min_max:
+				keep = stats.min <= value <= stats.max
+			if not keep:
+				break
+		if keep:
+			selected.append(i)
+	return selected
+
+
+def filter_expr(filters: Dict[str, Any]) -> pl.Expr:
+	"""Predicado de igualdad para los filtros (None = nulo)."""
+	return pl.all_horizontal([
+		pl.col(col).is_null() if value is None else pl.col(col) == value
+		for col, value in filters.items()
+	])
+
+
+def spill_partitions(
+	parquet_path: Path,
+	spill_dir: Path,
+	num_partitions: int,
+	batch_size: int = DEFAULT_BATCH_SIZE,
+	filters: Optional[Dict[str, Any]] = None,
+	columns: Optional[List[str]] = None
+) -> List[Path]:
+	"""
+	Repartir las filas del Parquet en archivos por hash % num_partitions.
+
+	El hash se calcula sobre las columnas de contenido (sin SOURCE_COLUMN),
+	así que copias de una fila en distintos archivos de origen quedan en la
+	misma partición. ROW_COLUMN (normalize.py --provenance) no se lee.
+	Dos archivos repartidos con las mismas columnas y num_partitions dejan
+	las filas iguales en particiones del mismo número (ver diff_datasets.py).
+
+	Args:
+		parquet_path: Parquet de entrada
+		spill_dir: Directorio para los archivos de partición
+		num_partitions: Número de particiones
+		batch_size: Filas por lote de lectura
+		filters: Solo filas con column == valor (p. ej. {"season": "2023-2024"});
+			los row groups que no pueden contenerlas no se leen
+		columns: Columnas a leer y escribir, en este orden (None = todas
+			menos ROW_COLUMN)
+
+	Returns:
+		Lista de paths de partición (solo las no vacías)
+	"""
+	parquet_file = pq.ParquetFile(parquet_path)
+	if columns is None:
+		columns = [name for name in parquet_file.schema_arrow.names if name != ROW_COLUMN]
+	content_columns = [name for name in columns if name != SOURCE_COLUMN]
+	row_groups = matching_row_groups(parquet_file, filters) if filters else None
+
+	writers: Dict[int, pq.ParquetWriter] = {}
+	paths: Dict[int, Path] = {}
+	try:
+		for batch in parquet_file.iter_batches(batch_size=batch_size, row_groups=row_groups, columns=columns):
+			df = pl.from_arrow(batch)
+			if filters:
+				df = df.filter(filter_expr(filters))
+			df = df.with_columns(
+				(pl.struct(content_columns).hash(seed=0) % num_partitions).alias(PARTITION_COLUMN)
+			)
+			for (partition,), part_df in df.partition_by(PARTITION_COLUMN, as_dict=True).items():
+				table = part_df.drop(PARTITION_COLUMN).to_arrow()
+				if partition not in writers:
+					paths[partition] = spill_dir / f"part_{partition:04d}.parquet"
+					writers[partition] = pq.ParquetWriter(paths[partition], table.schema)
+				writers[partition].write_table(table)
+	finally:
+		for writer in writers.values():
+			writer.close()
+
+	return [paths[partition] for partition in sorted(paths)]
+
+
+def top_key_order(key: Dict[str, Any]) -> tuple:
+	"""
+	Clave de orden de top_keys: count descendente y, en empate, las columnas
+	de contenido ascendentes con nulos (y NaN antes que ellos) al final, el
+	mismo orden que count_duplicates.
+	"""
+	values = [value for col, value in key.items() if col not in ("count", "source_weeks", "source_files")]
+	return (-key["count"], *[(value is None, value != value, value) for value in values])
+
+
+def merge_top_keys(candidates: List[Dict[str, Any]], top: int) -> List[Dict[str, Any]]:
+	"""
+	Las top claves duplicadas de varias particiones.
+
+	Con el mismo desempate que count_duplicates, el resultado no depende de
+	cómo se repartieron las filas (número de particiones o seasons).
+
+	Args:
+		candidates: top_keys de cada partición
+		top: Número de claves a conservar
+
+	Returns:
+		Lista de claves ordenada por top_key_order
+	"""
+	return sorted(candidates, key=top_key_order)[:top]
+
+
+def count_duplicates(df: pl.DataFrame, top: int) -> Dict[str, Any]:
+	"""
+	Contar duplicados exactos en un DataFrame (una partición).
+
+	Args:
+		df: Filas de la partición
+		top: Número de claves duplicadas a conservar
+
+	Returns:
+		Dict con duplicates (filas idénticas incluyendo SOURCE_COLUMN, todas
+		las ocurrencias, igual que df.is_duplicated()) y top_keys (claves de
+		contenido más repetidas con sus archivos de origen). ROW_COLUMN
+		identifica el registro de origen y no forma parte de la fila
+	"""
+	columns = [col for col in df.columns if col != ROW_COLUMN]
+	content_columns = [col for col in columns if col != SOURCE_COLUMN]
+
+	# Duplicados exactos sobre todas las columnas (misma definición que is_duplicated)
+	counts = df.group_by(columns).agg(pl.len().alias("count"))
+	duplicates = int(counts.filter(pl.col("count") > 1)["count"].sum())
+
+	# Claves de contenido repetidas y en qué archivos aparecen
+	if SOURCE_COLUMN in columns:
+		sources = pl.col(SOURCE_COLUMN).unique().sort().alias("source_weeks")
+	else:
+		sources = pl.lit([], dtype=pl.List(pl.Int64)).alias("source_weeks")
+	top_keys = (
+		df.group_by(content_columns)
+		.agg([pl.len().alias("count"), sources])
+		.filter(pl.col("count") > 1)
+		# Desempate por las columnas de contenido para un orden determinista
+		.sort(["count"] + content_columns, descending=[True] + [False] * len(content_columns), nulls_last=True)
+		.head(top)
+	)
+
+	return {"duplicates": duplicates, "top_keys": top_keys.to_dicts()}
+
+
+def find_duplicates(
+	parquet_path: Path,
+	num_partitions: int = DEFAULT_PARTITIONS,
+	top: int = DEFAULT_TOP,
+	spill_dir: Optional[Path] = None,
+	batch_size: int = DEFAULT_BATCH_SIZE,
+	filters: Optional[Dict[str, Any]] = None
+) -> Dict[str, Any]:
+	"""
+	Detectar filas duplicadas de un Parquet con memoria acotada.
+
+	Args:
+		parquet_path: Parquet de entrada
+		num_partitions: Particiones de hash (más particiones = menos memoria)
+		top: Número de claves duplicadas a reportar
+		spill_dir: Directorio para particiones (None = temporal, se elimina al final)
+		batch_size: Filas por lote de lectura
+		filters: Limitar a filas con column == valor (ver spill_partitions)
+
+	Returns:
+		Dict con duplicates (conteo exacto) y top_duplicates (lista de
+		claves con count, source_weeks y source_files)
+	"""
+	tmp_dir = Path(tempfile.mkdtemp(prefix="duplicates_", dir=spill_dir))
+	try:
+		partitions = spill_partitions(parquet_path, tmp_dir, num_partitions, batch_size, filters)
+
+		duplicates = 0
+		candidates = []
+		for path in partitions:
+			result = count_duplicates(pl.read_parquet(path), top)
+			duplicates += result["duplicates"]
+			candidates.extend(result["top_keys"])
+			path.unlink()
+	finally:
+		shutil.rmtree(tmp_dir, ignore_errors=True)
+
+	top_duplicates = merge_top_keys(candidates, top)
+	for key in top_duplicates:
+		key["source_files"] = [source_file_name(week) for week in key["source_weeks"]]
+
+	return {"duplicates": duplicates, "top_duplicates": top_duplicates}
+
+
+def print_top_duplicates(top_duplicates: List[Dict[str, Any]]) -> None:
+	"""
+	Imprimir las claves más duplicadas.
+
+	Args:
+		top_duplicates: Resultado de find_duplicates()["top_duplicates"]
+	"""
+	if not top_duplicates:
+		print("  ✓ Sin claves duplicadas")
+		return
+
+	for key in top_duplicates:
+		label = " | ".join(
+			str(key.get(col)) for col in ("season", "week", "product", "exporter", "country")
+			if col in key
+		)
+		print(f"  {key['count']:>6,}x  {label}  ({', '.join(key['source_files'])})")
+
+
+def parse_args() -> argparse.Namespace:
+	project_root = Path(__file__).parent.parent
+	parser = argparse.ArgumentParser(description="Detectar filas duplicadas con memoria acotada.")
+	parser.add_argument(
+		"--input",
+		type=Path,
+		default=project_root / "data" / "exports_10_years.parquet",
+		help="Parquet de entrada (default: data/exports_10_years.parquet)",
+	)
+	parser.add_argument(
+		"--partitions",
+		type=int,
+		default=DEFAULT_PARTITIONS,
+		help=f"Particiones de hash (default: {DEFAULT_PARTITIONS})",
+	)
+	parser.add_argument("--top", type=int, default=DEFAULT_TOP, help=f"Claves a reportar (default: {DEFAULT_TOP})")
+	parser.add_argument("--spill-dir", type=Path, default=None, help="Directorio para particiones (default: temporal)")
+	parser.add_argument("--output", type=Path, default=None, help="JSON opcional con el resultado")
+	return parser.parse_args()
+
+
+def main():
+	"""Función principal de la detección de duplicados."""
+	args = parse_args()
+
+	if not args.input.exists():
+		print(f"Error: Archivo {args.input} no existe")
+		return
+
+	print(f"Detectando duplicados en: {args.input} ({args.partitions} particiones)")
+	result = find_duplicates(args.input, args.partitions, args.top, args.spill_dir)
+
+	print(f"\nFilas duplicadas: {result['duplicates']:,}")
+	print(f"Top {args.top} claves duplicadas:")
+	print_top_duplicates(result["top_duplicates"])
+
+	if args.output:
+		args.output.parent.mkdir(parents=True, exist_ok=True)
+		with open(args.output, 'w', encoding='utf-8') as f:
+			json.dump(result, f, indent=2, ensure_ascii=False)
+		print(f"\n✓ Resultado guardado: {args.output}")
+
+
+if __name__ == "__main__":
+	main()
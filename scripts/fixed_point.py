@@ -0,0 +1,61 @@
+"""
+Kilos en punto fijo (Int64) para totales exactos.
+
+Con normalize.py --fixed-point cada Parquet incluye, además de
+net_weight_kg (Float64), la columna net_weight_g = round(net_weight_kg * 1000)
+como Int64. Las etapas siguientes la conservan y los totales de kilos se
+calculan sumando enteros: el resultado es exacto y no depende del orden de
+suma (particiones, streaming o número de hilos).
+
+Las funciones de este módulo usan net_weight_g cuando está presente y caen
+a net_weight_kg en caso contrario.
+"""
+
+import polars as pl
+from typing import Iterable, Optional
+
+
+KILOS_COLUMN = "net_weight_kg"
+FIXED_KILOS_COLUMN = "net_weight_g"
+KILOS_SCALE = 1000
+
+
+def to_fixed_kilos(expr: pl.Expr) -> pl.Expr:
+	"""
+	Convertir una expresión en kilos (float) a gramos Int64.
+
+	Args:
+		expr: Expresión con kilos
+
+	Returns:
+		Expresión Int64 (kilos * KILOS_SCALE, redondeado)
+	"""
+	return (expr * KILOS_SCALE).round(0).cast(pl.Int64)
+
+
+def kilos_to_fixed(kilos: Optional[float]) -> int:
+	"""Convertir un total en kilos (float) a gramos enteros."""
+	return int(round((kilos or 0.0) * KILOS_SCALE))
+
+
+def fixed_to_kilos(grams: Optional[int]) -> float:
+	"""Convertir gramos enteros a kilos (float) para reportes."""
+	return (grams or 0) / KILOS_SCALE
+
+
+def fixed_kilos_sum(columns: Iterable[str]) -> pl.Expr:
+	"""
+	Suma exacta de kilos en gramos (Int64).
+
+	Usa net_weight_g si está en columns; si no, convierte net_weight_kg fila
+	a fila antes de sumar (también exacto, aunque sin el ahorro de lectura).
+
+	Args:
+		columns: Columnas disponibles
+
+	Returns:
+		Expresión de agregación Int64 en gramos
+	"""
+	if FIXED_KILOS_COLUMN in columns:
+		return pl.col(FIXED_KILOS_COLUMN).sum()
+	return to_fixed_kilos(pl.col(KILOS_COLUMN)).sum()
@@ -0,0 +1,409 @@
+"""
+Ledger de linaje de totales entre etapas del pipeline.
+
+Cada etapa (normalize, combine, clean_nulls, Pipeline_transformación,
+create_mvp_dataset) agrega al escribir su salida una línea a
+audit/lineage.jsonl con filas, boxes y kilos (en gramos enteros, ver
+fixed_point.py) por season, calculados sobre el DataFrame que acaba de
+escribir. La conciliación de todo el pipeline compara esas líneas, sin
+releer ningún archivo.
+
+Las etapas con varios archivos de salida (normalize: un Parquet por semana)
+registran una línea por archivo; se usa la última línea de cada archivo que
+aún exista.
+
+El log crece con cada ejecución, así que junto a él se mantiene
+audit/lineage_current.json con solo la última entrada de cada etapa y
+artefacto. Cada registro lo reescribe de forma atómica (bajo un lock, en el
+mismo paso que agrega la línea al log) y show / reconcile leen solo ese
+archivo. Si falta o no corresponde al tamaño del log (p. ej. un ledger
+anterior), se rearma recorriendo el log.
+
+Uso:
+	python scripts/lineage.py show
+	python scripts/lineage.py reconcile
+"""
+
+import argparse
+import json
+import os
+import uuid
+import polars as pl
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Union
+
+from fixed_point import fixed_kilos_sum
+from snapshots import file_lock
+
+
+PROJECT_ROOT = Path(__file__).parent.parent
+LEDGER_PATH = PROJECT_ROOT / "audit" / "lineage.jsonl"
+
+SEASON_COLUMN = "season"
+NULL_SEASON = "__null__"
+
+# Etapas en orden del pipeline. subset=True: la etapa conserva solo algunas
+# seasons (se compara contra las mismas seasons de la etapa anterior)
+STAGES = [
+	{"name": "normalize", "subset": False},
+	{"name": "combine", "subset": False},
+	{"name": "clean_nulls", "subset": False},
+	{"name": "transform", "subset": False},
+	{"name": "mvp", "subset": True},
+]
+
+TOTAL_KEYS = ["rows", "boxes", "kilos_g"]
+
+
+def season_totals(df: Union[pl.DataFrame, pl.LazyFrame]) -> Dict[str, Dict[str, int]]:
+	"""
+	Filas, boxes y kilos (gramos) por season de un DataFrame o LazyFrame.
+
+	Args:
+		df: Datos con season, boxes y net_weight_kg (o net_weight_g); un
+			LazyFrame se agrega en streaming leyendo solo esas columnas
+
+	Returns:
+		Dict season -> {"rows", "boxes", "kilos_g"} (NULL_SEASON = season nula)
+	"""
+	totals = (
+		df.lazy()
+		.group_by(SEASON_COLUMN)
+		.agg([
+			pl.len().alias("rows"),
+			pl.col("boxes").sum().alias("boxes"),
+			fixed_kilos_sum(df.collect_schema().names()).alias("kilos_g"),
+		])
+		.sort(SEASON_COLUMN, nulls_last=True)
+		.collect(engine="streaming")
+	)
+	return {
+		NULL_SEASON if row[SEASON_COLUMN] is None else row[SEASON_COLUMN]: {
+			key: int(row[key] or 0) for key in TOTAL_KEYS
+		}
+		for row in totals.iter_rows(named=True)
+	}
+
+
+def sum_totals(seasons: Dict[str, Dict[str, int]]) -> Dict[str, int]:
+	"""Sumar los totales de varias seasons."""
+	return {key: sum(totals[key] for totals in seasons.values()) for key in TOTAL_KEYS}
+
+
+def merge_season_totals(target: Dict[str, Dict[str, int]], seasons: Dict[str, Dict[str, int]]) -> None:
+	"""
+	Acumular totales por season en target (p. ej. lote a lote).
+
+	Args:
+		target: Totales acumulados (se modifica)
+		seasons: Totales a sumar (season_totals)
+	"""
+	for season, totals in seasons.items():
+		merged = target.setdefault(season, {key: 0 for key in TOTAL_KEYS})
+		for key in TOTAL_KEYS:
+			merged[key] += totals[key]
+
+
+def artifact_name(path: Path) -> str:
+	"""Ruta del artefacto relativa al proyecto (o absoluta si está fuera)."""
+	path = Path(path).resolve()
+	try:
+		return path.relative_to(PROJECT_ROOT.resolve()).as_posix()
+	except ValueError:
+		return path.as_posix()
+
+
+def record_stage(
+	df: pl.DataFrame,
+	stage: str,
+	artifact: Path,
+	ledger_path: Path = LEDGER_PATH
+) -> Dict[str, Any]:
+	"""
+	Registrar en el ledger los totales del DataFrame que una etapa escribió.
+
+	Args:
+		df: DataFrame escrito por la etapa
+		stage: Nombre de la etapa (ver STAGES)
+		artifact: Archivo escrito
+		ledger_path: Path del ledger
+
+	Returns:
+		Entrada registrada (stage, artifact, recorded_at, totals, seasons)
+	"""
+	return record_totals(season_totals(df), stage, artifact, ledger_path)
+
+
+def record_totals(
+	seasons: Dict[str, Dict[str, int]],
+	stage: str,
+	artifact: Path,
+	ledger_path: Path = LEDGER_PATH,
+	replaces: Optional[List[Path]] = None
+) -> Dict[str, Any]:
+	"""
+	Registrar totales por season ya calculados (etapas que escriben por lotes).
+
+	Args:
+		seasons: Totales por season (season_totals / merge_season_totals)
+		stage: Nombre de la etapa (ver STAGES)
+		artifact: Archivo escrito
+		ledger_path: Path del ledger
+		replaces: Artefactos de la misma etapa que dejan de estar vigentes
+			(p. ej. la copia materializada cuando se usa clean_nulls.py --virtual)
+
+	Returns:
+		Entrada registrada (stage, artifact, recorded_at, totals, seasons)
+	"""
+	entry = {
+		"stage": stage,
+		"artifact": artifact_name(artifact),
+		"recorded_at": datetime.now(timezone.utc).isoformat(),
+		"totals": sum_totals(seasons),
+		"seasons": seasons,
+	}
+	if replaces:
+		entry["replaces"] = [artifact_name(path) for path in replaces]
+
+	ledger_path.parent.mkdir(parents=True, exist_ok=True)
+	with file_lock(ledger_path.with_name(f".{ledger_path.name}.lock")):
+		latest = read_current(ledger_path)
+
+		# Una sola escritura por línea en modo append
+		with open(ledger_path, 'a', encoding='utf-8') as f:
+			f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+			f.flush()
+			os.fsync(f.fileno())
+
+		write_current(fold_entries([entry], latest), ledger_path)
+
+	return entry
+
+
+def current_path(ledger_path: Path = LEDGER_PATH) -> Path:
+	"""Archivo compactado con las entradas vigentes del ledger (junto al log)."""
+	return ledger_path.with_name(f"{ledger_path.stem}_current.json")
+
+
+def fold_entries(
+	entries: List[Dict[str, Any]],
+	latest: Optional[Dict[str, Dict[str, Dict[str, Any]]]] = None
+) -> Dict[str, Dict[str, Dict[str, Any]]]:
+	"""
+	Aplicar entradas del ledger a las entradas vigentes.
+
+	Cada entrada reemplaza a la anterior de su artefacto y quita las de los
+	artefactos que declara en "replaces".
+
+	Args:
+		entries: Entradas en orden de registro
+		latest: Entradas vigentes a actualizar (se modifica; None = vacío)
+
+	Returns:
+		Dict etapa -> artefacto -> última entrada
+	"""
+	latest = latest if latest is not None else {}
+	for entry in entries:
+		artifacts = latest.setdefault(entry["stage"], {})
+		for replaced in entry.get("replaces", []):
+			artifacts.pop(replaced, None)
+		artifacts[entry["artifact"]] = entry
+	return latest
+
+
+def write_current(latest: Dict[str, Dict[str, Dict[str, Any]]], ledger_path: Path = LEDGER_PATH) -> None:
+	"""
+	Reescribir el archivo compactado de forma atómica (temporal + os.replace).
+
+	Guarda el tamaño del log al que corresponde, para detectar un compactado
+	desactualizado.
+
+	Args:
+		latest: Entradas vigentes (fold_entries)
+		ledger_path: Path del ledger
+	"""
+	path = current_path(ledger_path)
+	tmp_path = path.with_name(f".{path.name}.{uuid.uuid4().hex}.tmp")
+	try:
+		with open(tmp_path, 'w', encoding='utf-8') as f:
+			json.dump({"ledger_size": ledger_path.stat().st_size, "stages": latest}, f, ensure_ascii=False)
+			f.flush()
+			os.fsync(f.fileno())
+		os.replace(tmp_path, path)
+	finally:
+		tmp_path.unlink(missing_ok=True)
+
+
+def read_current(ledger_path: Path = LEDGER_PATH) -> Dict[str, Dict[str, Dict[str, Any]]]:
+	"""
+	Entradas vigentes del ledger, sin recorrer el log si el compactado está al día.
+
+	Args:
+		ledger_path: Path del ledger
+
+	Returns:
+		Dict etapa -> artefacto -> última entrada (vacío si no hay ledger)
+	"""
+	if not ledger_path.exists():
+		return {}
+	path = current_path(ledger_path)
+	if path.exists():
+		with open(path, 'r', encoding='utf-8') as f:
+			current = json.load(f)
+		if current.get("ledger_size") == ledger_path.stat().st_size:
+			return current["stages"]
+	return fold_entries(read_ledger(ledger_path))
+
+
+def read_ledger(ledger_path: Path = LEDGER_PATH) -> List[Dict[str, Any]]:
+	"""
+	Leer todas las entradas del ledger.
+
+	Args:
+		ledger_path: Path del ledger
+
+	Returns:
+		Lista de entradas en orden de registro (vacía si no existe)
+	"""
+	if not ledger_path.exists():
+		return []
+	with open(ledger_path, 'r', encoding='utf-8') as f:
+		return [json.loads(line) for line in f if line.strip()]
+
+
+def stage_totals(latest: Dict[str, Dict[str, Dict[str, Any]]]) -> Dict[str, Dict[str, Any]]:
+	"""
+	Totales vigentes de cada etapa.
+
+	Por etapa se toma la última entrada de cada artefacto que aún existe (y
+	que no fue reemplazado por una entrada posterior) y se suman sus seasons.
+
+	Args:
+		latest: Entradas vigentes (read_current o fold_entries)
+
+	Returns:
+		Dict etapa -> {"artifacts", "recorded_at", "totals", "seasons"}
+	"""
+	stages = {}
+	for stage, artifacts in latest.items():
+		current = [
+			entry for artifact, entry in sorted(artifacts.items())
+			if (PROJECT_ROOT / artifact).exists()
+		]
+		if not current:
+			continue
+
+		seasons: Dict[str, Dict[str, int]] = {}
+		for entry in current:
+			merge_season_totals(seasons, entry["seasons"])
+
+		stages[stage] = {
+			"artifacts": len(current),
+			"recorded_at": max(entry["recorded_at"] for entry in current),
+			"totals": sum_totals(seasons),
+			"seasons": seasons,
+		}
+	return stages
+
+
+def reconcile(ledger_path: Path = LEDGER_PATH) -> List[Dict[str, Any]]:
+	"""
+	Comparar los totales por season de cada etapa con la etapa anterior.
+
+	Args:
+		ledger_path: Path del ledger
+
+	Returns:
+		Lista de comparaciones {"source", "target", "ok", "differences"};
+		differences lista las seasons con deltas (target - source)
+	"""
+	stages = stage_totals(read_current(ledger_path))
+	present = [stage for stage in STAGES if stage["name"] in stages]
+
+	comparisons = []
+	for previous, stage in zip(present, present[1:]):
+		source = stages[previous["name"]]["seasons"]
+		target = stages[stage["name"]]["seasons"]
+		names = sorted(target) if stage["subset"] else sorted(set(source) | set(target))
+
+		differences = []
+		for season in names:
+			before = source.get(season, {key: 0 for key in TOTAL_KEYS})
+			after = target.get(season, {key: 0 for key in TOTAL_KEYS})
+			delta = {key: after[key] - before[key] for key in TOTAL_KEYS}
+			if any(delta.values()):
+				differences.append({"season": season, **delta})
+
+		comparisons.append({
+			"source": previous["name"],
+			"target": stage["name"],
+			"ok": not differences,
+			"differences": differences,
+		})
+	return comparisons
+
+
+def print_stages(ledger_path: Path = LEDGER_PATH) -> None:
+	"""Imprimir los totales vigentes de cada etapa registrada."""
+	stages = stage_totals(read_current(ledger_path))
+	if not stages:
+		print("No hay etapas registradas en el ledger.")
+		return
+
+	for stage in STAGES:
+		info = stages.get(stage["name"])
+		if info is None:
+			continue
+		totals = info["totals"]
+		print(f"{stage['name']:<12} {totals['rows']:>12,} filas  {totals['boxes']:>15,} boxes  "
+			f"{totals['kilos_g'] / 1000:>18,.3f} kg  ({info['artifacts']} archivos, {info['recorded_at']})")
+
+
+def print_reconciliation(comparisons: List[Dict[str, Any]]) -> None:
+	"""
+	Imprimir el resultado de reconcile().
+
+	Args:
+		comparisons: Resultado de reconcile()
+	"""
+	print("="*60)
+	print("CONCILIACIÓN DE TOTALES ENTRE ETAPAS")
+	print("="*60)
+	if not comparisons:
+		print("  ⚠️  Se necesitan al menos dos etapas registradas")
+		return
+
+	for comparison in comparisons:
+		label = f"{comparison['source']} → {comparison['target']}"
+		if comparison["ok"]:
+			print(f"  ✓ {label}")
+			continue
+		print(f"  ⚠️  {label}: {len(comparison['differences'])} seasons con diferencias")
+		for diff in comparison["differences"]:
+			print(f"      {diff['season']}: filas {diff['rows']:+,}, boxes {diff['boxes']:+,}, "
+				f"kilos {diff['kilos_g'] / 1000:+,.3f}")
+
+
+def parse_args() -> argparse.Namespace:
+	parser = argparse.ArgumentParser(description="Ledger de totales por etapa del pipeline.")
+	parser.add_argument("command", choices=["show", "reconcile"], help="show: totales por etapa; reconcile: comparar etapas")
+	parser.add_argument("--ledger", type=Path, default=LEDGER_PATH, help="Path del ledger (default: audit/lineage.jsonl)")
+	return parser.parse_args()
+
+
+def main():
+	"""Función principal: mostrar o conciliar el ledger."""
+	args = parse_args()
+
+	if args.command == "show":
+		print_stages(args.ledger)
+	elif args.command == "reconcile":
+		comparisons = reconcile(args.ledger)
+		print_reconciliation(comparisons)
+		if comparisons and all(comparison["ok"] for comparison in comparisons):
+			print("\n✓ Totales consistentes en todo el pipeline.")
+
+
+if __name__ == "__main__":
+	main()
@@ -3,15 +3,32 @@ Script de normalización de archivos CSV al esquema maestro.
 
 Este script carga cada CSV semanal, lo normaliza al esquema maestro
 y guarda el resultado como Parquet en data_clean/.
+
+Con --dashboard escribe además en data_dashboard/ la parte de la semana del
+dataset listo para el dashboard (columnas derivadas incluidas, ver
+dashboard_columns.py).
+
+Con --provenance cada fila lleva source_row (ordinal del registro en el CSV)
+y se escribe el índice de offsets del CSV en data_provenance/ (ver
+provenance.py).
 """
 
+import argparse
 import polars as pl
+from concurrent.futures import as_completed
 import json
 import re
 from pathlib import Path
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List, Tuple
 from tqdm import tqdm
 
+from dashboard_columns import weekly_dashboard_part
+from fixed_point import FIXED_KILOS_COLUMN, to_fixed_kilos
+from lineage import record_stage
+from parquet_profiles import PROFILES, write_parquet_profile
+from provenance import add_row_ordinals
+from resources import plan_stage, print_plan, process_pool, track_usage
+
 
 def load_schema_master(scripts_dir: Path) -> Dict[str, Any]:
 	"""
@@ -63,24 +80,36 @@ def detect_csv_encoding_and_separator(csv_path: Path) -> tuple[str, str]:
 	return 'utf-8', ','
 
 
-def load_csv(csv_path: Path) -> Optional[pl.DataFrame]:
+def load_csv(csv_path: Path, streaming: bool = False) -> Optional[pl.LazyFrame]:
 	"""
-	Cargar archivo CSV con Polars.
+	Cargar archivo CSV con Polars (como LazyFrame).
 	
 	IMPORTANTE: Lee las columnas numéricas como string primero para preservar
 	los separadores de miles (puntos) que Polars interpretaría como decimales.
 
 	Args:
 		csv_path: Path al archivo CSV
+		streaming: Si True (archivo grande, ver resources.py), el CSV se lee
+			con scan_csv para normalizarlo en modo streaming sin cargarlo
+			completo (solo para CSV UTF-8; otros encodings se leen en memoria)
 
 	Returns:
-		DataFrame de Polars, o None si hay error
+		LazyFrame de Polars, o None si hay error
 	"""
 	try:
 		encoding, separator = detect_csv_encoding_and_separator(csv_path)
 		
 		# Leer CSV sin inferir schema automáticamente (todo como string)
 		# Esto preserva los separadores de miles que Polars interpretaría como decimales
+		if streaming and encoding == 'utf-8':
+			return pl.scan_csv(
+				csv_path,
+				separator=separator,
+				ignore_errors=True,
+				try_parse_dates=False,
+				infer_schema_length=0
+			)
+		
 		df = pl.read_csv(
 			csv_path,
 			encoding=encoding,
@@ -90,23 +119,32 @@ def load_csv(csv_path: Path) -> Optional[pl.DataFrame]:
 			infer_schema_length=0  # No inferir schema, leer todo como string
 		)
 		
-		return df
+		return df.lazy()
 	except Exception as e:
 		print(f"  ⚠️  Error cargando {csv_path.name}: {e}")
 		return None
 
 
-def normalize_schema(df: pl.DataFrame, schema_master: Dict[str, Any], csv_path: Path) -> pl.DataFrame:
+def normalize_schema(
+	df: pl.LazyFrame,
+	schema_master: Dict[str, Any],
+	csv_path: Path,
+	fixed_point: bool = False
+) -> pl.LazyFrame:
 	"""
-	Normalizar DataFrame al esquema maestro (pipeline completo).
+	Normalizar el CSV al esquema maestro (pipeline completo, lazy).
+
+	Todas las transformaciones son fila a fila, así que el resultado tiene
+	una fila por registro del CSV, en el mismo orden.
 
 	Args:
-		df: DataFrame original
+		df: LazyFrame original (ver load_csv)
 		schema_master: Schema maestro completo
 		csv_path: Path al CSV original
+		fixed_point: Si True, agrega net_weight_g (kilos * 1000, Int64)
 
 	Returns:
-		DataFrame normalizado
+		LazyFrame normalizado
 	"""
 	schema = schema_master.get("schema", {})
 	
@@ -126,86 +164,79 @@ def normalize_schema(df: pl.DataFrame, schema_master: Dict[str, Any], csv_path:
 		"Kilograms": "net_weight_kg"
 	}
 	
-	for old_name, new_name in rename_dict.items():
-		if old_name in df.columns:
-			df = df.rename({old_name: new_name})
+	df = df.rename({old_name: new_name for old_name, new_name in rename_dict.items() if old_name in df.collect_schema()})
+	columns = df.collect_schema().names()
 	
-	# 2. Extraer week y year de "ETD Week"
-	if "ETD Week" in df.columns:
+	# 2. Extraer week y year de "ETD Week" (los nulos se reportan en warn_unparsed_weeks)
+	if "ETD Week" in columns:
 		# Convertir a string y dividir por "-"
 		df = df.with_columns([
 			pl.col("ETD Week").cast(pl.Utf8).str.split("-").list.get(0).cast(pl.Int64, strict=False).alias("week"),
 			pl.col("ETD Week").cast(pl.Utf8).str.split("-").list.get(1).cast(pl.Int64, strict=False).alias("year")
 		])
-		
-		# Verificar si hay valores nulos y advertir
-		null_weeks = df["week"].null_count()
-		null_years = df["year"].null_count()
-		if null_weeks > 0 or null_years > 0:
-			print(f"  ⚠️  {csv_path.name}: {null_weeks} semanas y {null_years} años no pudieron extraerse de ETD Week")
 	
 	# 3. Normalizar season (mantener como string, solo strip)
-	if "season" in df.columns:
+	if "season" in columns:
 		df = df.with_columns(
 			pl.col("season").str.strip_chars().alias("season")
 		)
 	
 	# 4. Normalizar country (upper case)
-	if "country" in df.columns:
+	if "country" in columns:
 		df = df.with_columns(
 			pl.col("country").str.strip_chars().str.to_uppercase().alias("country")
 		)
 	
 	# 5. Normalizar product (Specie → strip + title case)
-	if "product" in df.columns:
+	if "product" in columns:
 		df = df.with_columns(
 			pl.col("product").str.strip_chars().str.to_titlecase().alias("product")
 		)
 	
 	# 6. Normalizar exporter (strip + title case)
-	if "exporter" in df.columns:
+	if "exporter" in columns:
 		df = df.with_columns(
 			pl.col("exporter").str.strip_chars().str.to_titlecase().alias("exporter")
 		)
 	
 	# 7. Normalizar region (strip + title case)
-	if "region" in df.columns:
+	if "region" in columns:
 		df = df.with_columns(
 			pl.col("region").str.strip_chars().str.to_titlecase().alias("region")
 		)
 	
 	# 8. Normalizar market (strip + title case)
-	if "market" in df.columns:
+	if "market" in columns:
 		df = df.with_columns(
 			pl.col("market").str.strip_chars().str.to_titlecase().alias("market")
 		)
 	
 	# 9. Normalizar transport (strip + title case)
-	if "transport" in df.columns:
+	if "transport" in columns:
 		df = df.with_columns(
 			pl.col("transport").str.strip_chars().str.to_titlecase().alias("transport")
 		)
 	
 	# 10. Normalizar variety (strip + title case)
-	if "variety" in df.columns:
+	if "variety" in columns:
 		df = df.with_columns(
 			pl.col("variety").str.strip_chars().str.to_titlecase().alias("variety")
 		)
 	
 	# 11. Normalizar importer (strip + title case)
-	if "importer" in df.columns:
+	if "importer" in columns:
 		df = df.with_columns(
 			pl.col("importer").str.strip_chars().str.to_titlecase().alias("importer")
 		)
 	
 	# 12. Normalizar port_destination (strip + title case)
-	if "port_destination" in df.columns:
+	if "port_destination" in columns:
 		df = df.with_columns(
 			pl.col("port_destination").str.strip_chars().str.to_titlecase().alias("port_destination")
 		)
 	
 	# 13. Normalizar boxes (remover separadores "." y convertir a int)
-	if "boxes" in df.columns:
+	if "boxes" in columns:
 		df = df.with_columns(
 			pl.col("boxes")
 			.cast(pl.Utf8)
@@ -217,7 +248,7 @@ def normalize_schema(df: pl.DataFrame, schema_master: Dict[str, Any], csv_path:
 	
 	# 14. Normalizar net_weight_kg (remover TODOS los "." y convertir a float)
 	# Los puntos NO son decimales, son separadores de miles
-	if "net_weight_kg" in df.columns:
+	if "net_weight_kg" in columns:
 		df = df.with_columns(
 			pl.col("net_weight_kg")
 			.cast(pl.Utf8)
@@ -226,6 +257,10 @@ def normalize_schema(df: pl.DataFrame, schema_master: Dict[str, Any], csv_path:
 			.cast(pl.Float64, strict=False)
 			.alias("net_weight_kg")
 		)
+		
+		# Kilos en punto fijo para totales exactos (ver fixed_point.py)
+		if fixed_point:
+			df = df.with_columns(to_fixed_kilos(pl.col("net_weight_kg")).alias(FIXED_KILOS_COLUMN))
 	
 	# 15. Seleccionar solo las columnas del schema final en el orden correcto
 	final_columns = [
@@ -242,17 +277,34 @@ def normalize_schema(df: pl.DataFrame, schema_master: Dict[str, Any], csv_path:
 		"exporter",
 		"port_destination",
 		"boxes",
-		"net_weight_kg"
+		"net_weight_kg",
+		FIXED_KILOS_COLUMN
 	]
 	
 	# Solo incluir columnas que existen
-	existing_columns = [col for col in final_columns if col in df.columns]
+	existing_columns = [col for col in final_columns if col in df.collect_schema()]
 	df = df.select(existing_columns)
 	
 	return df
 
 
-def save_parquet(df: pl.DataFrame, csv_path: Path, output_dir: Path) -> Path:
+def warn_unparsed_weeks(df: pl.DataFrame, csv_path: Path) -> None:
+	"""
+	Advertir si week o year no pudieron extraerse de "ETD Week".
+
+	Args:
+		df: DataFrame normalizado
+		csv_path: Path al CSV original
+	"""
+	if "week" not in df.columns:
+		return
+	null_weeks = df["week"].null_count()
+	null_years = df["year"].null_count()
+	if null_weeks > 0 or null_years > 0:
+		print(f"  ⚠️  {csv_path.name}: {null_weeks} semanas y {null_years} años no pudieron extraerse de ETD Week")
+
+
+def save_parquet(df: pl.DataFrame, csv_path: Path, output_dir: Path, profile: str = "default") -> Path:
 	"""
 	Guardar DataFrame normalizado como Parquet.
 
@@ -260,6 +312,7 @@ def save_parquet(df: pl.DataFrame, csv_path: Path, output_dir: Path) -> Path:
 		df: DataFrame normalizado
 		csv_path: Path al CSV original (para generar nombre del Parquet)
 		output_dir: Directorio de salida
+		profile: Perfil de escritura (ver parquet_profiles.PROFILES)
 
 	Returns:
 		Path al archivo Parquet creado
@@ -270,12 +323,9 @@ def save_parquet(df: pl.DataFrame, csv_path: Path, output_dir: Path) -> Path:
 	parquet_name = csv_path.stem + ".parquet"
 	output_path = output_dir / parquet_name
 	
-	# Guardar con compresión
-	df.write_parquet(
-		output_path,
-		compression="snappy",
-		use_pyarrow=True
-	)
+	# Guardar con el perfil de escritura elegido
+	write_parquet_profile(df, output_path, profile)
+	record_stage(df, "normalize", output_path)
 	
 	return output_path
 
@@ -283,7 +333,12 @@ def save_parquet(df: pl.DataFrame, csv_path: Path, output_dir: Path) -> Path:
 def process_weekly_file(
 	csv_path: Path,
 	output_dir: Path,
-	schema_master: Dict[str, Any]
+	schema_master: Dict[str, Any],
+	profile: str = "default",
+	fixed_point: bool = False,
+	parts_dir: Optional[Path] = None,
+	provenance: bool = False,
+	streaming: bool = False
 ) -> Optional[Path]:
 	"""
 	Procesar un archivo CSV semanal completo: cargar, normalizar y guardar.
@@ -292,21 +347,40 @@ def process_weekly_file(
 		csv_path: Path al archivo CSV a procesar
 		output_dir: Directorio donde guardar el Parquet normalizado
 		schema_master: Schema maestro
+		profile: Perfil de escritura Parquet
+		fixed_point: Si True, agrega net_weight_g (Int64) para totales exactos
+		parts_dir: Si se indica, guarda ahí la parte del dataset del dashboard
+		provenance: Si True, agrega source_row y escribe el índice de offsets del CSV
+		streaming: Si True, lee con scan_csv y normaliza con el motor streaming
+			(ver resources.plan_stage)
 
 	Returns:
 		Path al archivo Parquet creado, o None si hubo error
 	"""
 	try:
 		# Cargar CSV
-		df = load_csv(csv_path)
-		if df is None:
+		lf = load_csv(csv_path, streaming)
+		if lf is None:
 			return None
 		
 		# Normalizar esquema
-		df_normalized = normalize_schema(df, schema_master, csv_path)
+		df_normalized = normalize_schema(lf, schema_master, csv_path, fixed_point).collect(
+			engine="streaming" if streaming else "auto"
+		)
+		warn_unparsed_weeks(df_normalized, csv_path)
+		
+		# Ordinal de cada registro (una fila normalizada por registro, en el orden del CSV)
+		if provenance:
+			df_normalized = add_row_ordinals(df_normalized, csv_path)
 		
 		# Guardar Parquet
-		output_path = save_parquet(df_normalized, csv_path, output_dir)
+		output_path = save_parquet(df_normalized, csv_path, output_dir, profile)
+		
+		# Parte del dataset del dashboard (se escribe después, para que sea más reciente)
+		if parts_dir is not None:
+			parts_dir.mkdir(parents=True, exist_ok=True)
+			part = weekly_dashboard_part(df_normalized, output_path.name)
+			write_parquet_profile(part, parts_dir / output_path.name, profile)
 		
 		return output_path
 	except Exception as e:
@@ -314,10 +388,95 @@ def process_weekly_file(
 		return None
 
 
+def normalize_files(
+	csv_files: List[Path],
+	output_dir: Path,
+	schema_master: Dict[str, Any],
+	profile: str = "default",
+	fixed_point: bool = False,
+	parts_dir: Optional[Path] = None,
+	workers: Optional[int] = None,
+	provenance: bool = False
+) -> Tuple[int, int]:
+	"""
+	Normalizar varios CSV, en paralelo según el plan de recursos.
+
+	Args:
+		csv_files: CSVs a procesar
+		output_dir, schema_master, profile, fixed_point, parts_dir: Ver process_weekly_file
+		workers: Procesos pedidos (None = según CPUs y memoria)
+		provenance: Ver process_weekly_file
+
+	Returns:
+		Tupla (exitosos, fallidos)
+	"""
+	successful = 0
+	failed = 0
+	
+	# Procesos e hilos de Polars según CPUs y memoria (ver resources.py); si un
+	# CSV no cabe en la memoria de su proceso, se normaliza en modo streaming
+	plan = plan_stage("normalize", max(path.stat().st_size for path in csv_files), len(csv_files), workers)
+	print_plan(plan)
+	options = (output_dir, schema_master, profile, fixed_point, parts_dir, provenance, plan["streaming"])
+	
+	with track_usage("normalize", plan):
+		if plan["workers"] == 1:
+			results = (process_weekly_file(csv_file, *options) for csv_file in csv_files)
+			for result in tqdm(results, total=len(csv_files), desc="Normalizando"):
+				if result:
+					successful += 1
+				else:
+					failed += 1
+		else:
+			with process_pool(plan) as pool:
+				futures = [pool.submit(process_weekly_file, csv_file, *options) for csv_file in csv_files]
+				for future in tqdm(as_completed(futures), total=len(futures), desc="Normalizando"):
+					if future.result():
+						successful += 1
+					else:
+						failed += 1
+	
+	return successful, failed
+
+
+def parse_args() -> argparse.Namespace:
+	parser = argparse.ArgumentParser(description="Normalizar CSVs semanales al esquema maestro.")
+	parser.add_argument(
+		"--profile",
+		choices=list(PROFILES),
+		default="default",
+		help="Perfil de escritura Parquet (default: default)",
+	)
+	parser.add_argument(
+		"--fixed-point",
+		action="store_true",
+		help="Agregar net_weight_g (kilos * 1000, Int64) para totales exactos",
+	)
+	parser.add_argument(
+		"--dashboard",
+		action="store_true",
+		help="Escribir además la parte semanal del dataset del dashboard en data_dashboard/",
+	)
+	parser.add_argument(
+		"--provenance",
+		action="store_true",
+		help="Agregar source_row y el índice de offsets de cada CSV en data_provenance/ (ver provenance.py)",
+	)
+	parser.add_argument(
+		"--workers",
+		type=int,
+		default=None,
+		help="Procesos para normalizar archivos en paralelo (default: según CPUs y memoria)",
+	)
+	return parser.parse_args()
+
+
 def main():
 	"""Función principal del script de normalización."""
+	args = parse_args()
 	data_raw_dir = Path(__file__).parent.parent / "data_raw"
 	data_clean_dir = Path(__file__).parent.parent / "data_clean"
+	parts_dir = Path(__file__).parent.parent / "data_dashboard" if args.dashboard else None
 	scripts_dir = Path(__file__).parent
 	
 	if not data_raw_dir.exists():
@@ -357,16 +516,10 @@ def main():
 	print("(Los archivos Parquet existentes serán sobrescritos)\n")
 	
 	# Procesar cada archivo
-	successful = 0
-	failed = 0
-	warnings = 0
-	
-	for csv_file in tqdm(csv_files, desc="Normalizando"):
-		result = process_weekly_file(csv_file, data_clean_dir, schema_master)
-		if result:
-			successful += 1
-		else:
-			failed += 1
+	successful, failed = normalize_files(
+		csv_files, data_clean_dir, schema_master, args.profile, args.fixed_point, parts_dir, args.workers,
+		args.provenance
+	)
 	
 	print(f"\n" + "="*60)
 	print("✓ NORMALIZACIÓN COMPLETADA")
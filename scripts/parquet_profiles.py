@@ -0,0 +1,250 @@
+"""
+Perfiles de escritura Parquet compartidos por los scripts del pipeline.
+
+Cada perfil agrupa compresión, tamaño de row group y opciones de pyarrow
+(page index, diccionario, bloom filters) bajo un nombre, para que cada etapa
+elija el perfil con --profile en lugar de repetir parámetros:
+
+- default:   snappy, opciones por defecto (comportamiento histórico)
+- archive:   zstd nivel alto, row groups grandes; mínimo tamaño en disco
+- scan:      zstd rápido, row groups grandes y page index; lecturas completas
+- lookup:    page index y bloom filters en exporter/importer; búsquedas puntuales
+- dashboard: snappy, data pages v1 sin page index; compatible con parquetjs-lite
+"""
+
+import polars as pl
+import pyarrow as pa
+import pyarrow.parquet as pq
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+
+# Filas por row group de pyarrow cuando el perfil no fija uno (mismo valor que
+# usa pyarrow.parquet.write_table por defecto)
+PYARROW_ROW_GROUP_SIZE = 1024 * 1024
+
+PROFILES: Dict[str, Dict[str, Any]] = {
+	"default": {
+		"compression": "snappy",
+		"compression_level": None,
+		"row_group_size": None,
+		"pyarrow_options": {},
+	},
+	"archive": {
+		"compression": "zstd",
+		"compression_level": 19,
+		"row_group_size": 1_000_000,
+		"pyarrow_options": {},
+	},
+	"scan": {
+		"compression": "zstd",
+		"compression_level": 1,
+		"row_group_size": 1_000_000,
+		"pyarrow_options": {
+			"write_page_index": True,
+		},
+	},
+	"lookup": {
+		"compression": "zstd",
+		"compression_level": 3,
+		"row_group_size": 128_000,
+		"pyarrow_options": {
+			"write_page_index": True,
+			"bloom_filter_options": {
+				"exporter": True,
+				"importer": True,
+			},
+		},
+	},
+	"dashboard": {
+		"compression": "snappy",
+		"compression_level": None,
+		"row_group_size": None,
+		"pyarrow_options": {
+			"data_page_version": "1.0",
+			"write_page_index": False,
+		},
+	},
+}
+
+
+def get_profile(name: str) -> Dict[str, Any]:
+	"""
+	Obtener la configuración de un perfil por nombre.
+
+	Args:
+		name: Nombre del perfil (ver PROFILES)
+
+	Returns:
+		Dict con compression, compression_level, row_group_size y pyarrow_options
+	"""
+	if name not in PROFILES:
+		raise ValueError(f"Perfil desconocido: {name}. Disponibles: {', '.join(PROFILES)}")
+	return PROFILES[name]
+
+
+def profile_pyarrow_options(profile: str, columns: Iterable[str]) -> Dict[str, Any]:
+	"""
+	Opciones de pyarrow del perfil, con bloom filters solo para columnas presentes.
+
+	Args:
+		profile: Nombre del perfil (ver PROFILES)
+		columns: Columnas del archivo a escribir
+
+	Returns:
+		Dict de opciones para pyarrow (copia)
+	"""
+	columns = set(columns)
+	pyarrow_options = dict(get_profile(profile)["pyarrow_options"])
+	if "bloom_filter_options" in pyarrow_options:
+		pyarrow_options["bloom_filter_options"] = {
+			col: opts for col, opts in pyarrow_options["bloom_filter_options"].items()
+			if col in columns
+		}
+		if not pyarrow_options["bloom_filter_options"]:
+			del pyarrow_options["bloom_filter_options"]
+	return pyarrow_options
+
+
+def open_parquet_writer(output_path: Path, schema: pa.Schema, profile: str = "default") -> pq.ParquetWriter:
+	"""
+	Abrir un ParquetWriter de pyarrow con las opciones de un perfil.
+
+	Para escribir por lotes (streaming) con el mismo resultado de perfil que
+	write_parquet_profile. El tamaño de row group lo define cada write_table.
+
+	Args:
+		output_path: Path del archivo Parquet
+		schema: Schema de Arrow de los lotes
+		profile: Nombre del perfil (ver PROFILES)
+
+	Returns:
+		ParquetWriter abierto (cerrar con .close())
+	"""
+	config = get_profile(profile)
+	pyarrow_options = profile_pyarrow_options(profile, schema.names)
+	write_kwargs = {
+		"compression": config["compression"],
+		"compression_level": config["compression_level"],
+	}
+
+	try:
+		return pq.ParquetWriter(output_path, schema, **write_kwargs, **pyarrow_options)
+	except TypeError:
+		# Versiones antiguas de pyarrow no soportan bloom_filter_options
+		if "bloom_filter_options" not in pyarrow_options:
+			raise
+		print("  ⚠️  pyarrow no soporta bloom filters, se escribe sin ellos")
+		del pyarrow_options["bloom_filter_options"]
+		return pq.ParquetWriter(output_path, schema, **write_kwargs, **pyarrow_options)
+
+
+def row_group_tables(tables: Iterable[pa.Table], row_group_size: int) -> Iterator[pa.Table]:
+	"""
+	Reagrupar lotes de tamaño variable en tablas de row_group_size filas.
+
+	Para escribir por lotes los mismos row groups que write_parquet_profile
+	cuando hay más de un destino (ver clean_nulls.stream_clean_nulls); con
+	uno solo basta RowGroupWriter. La última tabla puede ser menor.
+	"""
+	pending: List[pa.Table] = []
+	pending_rows = 0
+	for table in tables:
+		pending.append(table)
+		pending_rows += table.num_rows
+		while pending_rows >= row_group_size:
+			table = pa.concat_tables(pending)
+			yield table.slice(0, row_group_size)
+			pending = [table.slice(row_group_size)]
+			pending_rows -= row_group_size
+	if pending_rows:
+		yield pa.concat_tables(pending)
+
+
+class RowGroupWriter:
+	"""
+	Escribir lotes de tamaño variable en row groups completos.
+
+	Acumula lotes hasta completar row_group_size filas, de modo que el archivo
+	tiene los mismos row groups que write_parquet_profile sobre el DataFrame
+	completo. El ParquetWriter se abre con el schema del primer lote.
+	"""
+
+	def __init__(self, output_path: Path, profile: str = "default", row_group_size: Optional[int] = None):
+		self.output_path = output_path
+		self.profile = profile
+		self.row_group_size = row_group_size or get_profile(profile)["row_group_size"] or PYARROW_ROW_GROUP_SIZE
+		self.writer: Optional[pq.ParquetWriter] = None
+		self.pending: List[pa.Table] = []
+		self.pending_rows = 0
+
+	def write(self, table: pa.Table) -> None:
+		"""Agregar un lote; escribe cada row group completo."""
+		self.pending.append(table)
+		self.pending_rows += table.num_rows
+		while self.pending_rows >= self.row_group_size:
+			table = pa.concat_tables(self.pending)
+			self._write(table.slice(0, self.row_group_size))
+			self.pending = [table.slice(self.row_group_size)]
+			self.pending_rows -= self.row_group_size
+
+	def close(self, empty: Optional[pa.Table] = None) -> None:
+		"""
+		Escribir el último row group y cerrar el archivo.
+
+		Args:
+			empty: Tabla vacía con el schema a usar si no se escribió ningún lote
+		"""
+		if self.pending_rows or self.writer is None:
+			table = pa.concat_tables(self.pending) if self.pending else empty
+			if table is None:
+				raise ValueError(f"Sin lotes ni schema para escribir {self.output_path}")
+			self._write(table)
+		self.abort()
+
+	def abort(self) -> None:
+		"""Cerrar el archivo sin escribir lo pendiente (p. ej. ante un error)."""
+		if self.writer is not None:
+			self.writer.close()
+			self.writer = None
+
+	def _write(self, table: pa.Table) -> None:
+		if self.writer is None:
+			self.writer = open_parquet_writer(self.output_path, table.schema, self.profile)
+		self.writer.write_table(table, row_group_size=self.row_group_size)
+
+
+def write_parquet_profile(
+	df: pl.DataFrame,
+	output_path: Path,
+	profile: str = "default",
+	row_group_size: Optional[int] = None
+) -> None:
+	"""
+	Guardar un DataFrame como Parquet usando un perfil de escritura.
+
+	Args:
+		df: DataFrame a guardar
+		output_path: Path del archivo Parquet
+		profile: Nombre del perfil (ver PROFILES)
+		row_group_size: Si se indica, reemplaza el row_group_size del perfil
+	"""
+	config = get_profile(profile)
+	pyarrow_options = profile_pyarrow_options(profile, df.columns)
+
+	write_kwargs = {
+		"compression": config["compression"],
+		"compression_level": config["compression_level"],
+		"row_group_size": row_group_size or config["row_group_size"],
+		"use_pyarrow": True,
+	}
+
+	try:
+		df.write_parquet(output_path, pyarrow_options=pyarrow_options, **write_kwargs)
+	except TypeError:
+		# Versiones antiguas de pyarrow no soportan bloom_filter_options
+		if "bloom_filter_options" not in pyarrow_options:
+			raise
+		print("  ⚠️  pyarrow no soporta bloom filters, se escribe sin ellos")
+		del pyarrow_options["bloom_filter_options"]
+		df.write_parquet(output_path, pyarrow_options=pyarrow_options, **write_kwargs)
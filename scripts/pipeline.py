@@ -0,0 +1,535 @@
+"""
+Orquestador del pipeline como DAG con caché por contenido.
+
+Cada etapa declara su script, sus entradas y sus salidas (patrones glob
+relativos al proyecto). Una etapa depende de otra cuando alguna de sus
+entradas es una salida de la otra, así que audit/combine y validate/clean_nulls
+corren en paralelo.
+
+Antes de correr una etapa se calcula su clave: SHA-256 del contenido de sus
+entradas, del script y de los módulos de scripts/ que importa, y de sus
+argumentos. Si la clave coincide con la de la última ejecución exitosa y las
+salidas no cambiaron, la etapa se salta. Los hashes de archivo se guardan en
+audit/pipeline_state.json junto con (tamaño, mtime), y solo se recalculan
+cuando cambia el stat, por lo que una actualización sin cambios no lee
+ningún dato. Si una etapa se re-ejecuta y produce salidas idénticas, las
+etapas siguientes también se saltan.
+
+La salida de cada script se guarda en audit/pipeline_logs/<etapa>.log y la
+duración de cada etapa en el estado.
+
+Uso:
+	python scripts/pipeline.py run
+	python scripts/pipeline.py run --force combine
+	python scripts/pipeline.py run --only validate --dry-run
+	python scripts/pipeline.py status
+"""
+
+import argparse
+import ast
+import hashlib
+import json
+import os
+import subprocess
+import sys
+import time
+import uuid
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from resources import available_cpus
+
+
+PROJECT_ROOT = Path(__file__).parent.parent
+SCRIPTS_DIR = Path(__file__).parent
+STATE_PATH = PROJECT_ROOT / "audit" / "pipeline_state.json"
+LOGS_DIR = PROJECT_ROOT / "audit" / "pipeline_logs"
+
+DEFAULT_WORKERS = 2
+HASH_CHUNK_SIZE = 1024 * 1024
+
+# Etapas del pipeline. Entradas y salidas son patrones glob relativos al proyecto
+STAGES = [
+	{
+		"name": "inventory",
+		"script": "inventory.py",
+		"args": [],
+		"inputs": ["data_raw/*.csv"],
+		"outputs": ["scripts/column_inventory.json", "scripts/column_frequency.json"],
+	},
+	{
+		"name": "generate_schema",
+		"script": "generate_schema.py",
+		"args": [],
+		"inputs": ["scripts/column_inventory.json", "scripts/column_frequency.json"],
+		"outputs": ["scripts/schema_master.json"],
+	},
+	{
+		"name": "normalize",
+		"script": "normalize.py",
+		"args": [],
+		"inputs": ["data_raw/*.csv", "scripts/schema_master.json"],
+		"outputs": ["data_clean/*.parquet"],
+	},
+	{
+		"name": "audit",
+		"script": "audit_normalization.py",
+		"args": [],
+		"inputs": ["data_raw/*.csv", "data_clean/*.parquet"],
+		"outputs": ["audit/full_audit.csv"],
+	},
+	{
+		"name": "combine",
+		"script": "combine.py",
+		"args": [],
+		"inputs": ["data_clean/*.parquet"],
+		"outputs": ["data/exports_10_years.parquet"],
+	},
+	{
+		"name": "validate",
+		"script": "validate.py",
+		"args": [],
+		"inputs": ["data/exports_10_years.parquet", "audit/full_audit.csv"],
+		"outputs": ["audit/final_validation.json"],
+	},
+	{
+		"name": "clean_nulls",
+		"script": "clean_nulls.py",
+		"args": [],
+		"inputs": ["data/exports_10_years.parquet"],
+		"outputs": ["data/exports_10_years_clean.parquet"],
+	},
+	{
+		"name": "transform",
+		"script": "Pipeline_transformación.py",
+		"args": [],
+		"inputs": ["data/exports_10_years_clean.parquet"],
+		"outputs": ["data/dataset_dashboard_ready.parquet"],
+	},
+	{
+		"name": "mvp",
+		"script": "create_mvp_dataset.py",
+		"args": [],
+		"inputs": ["data/dataset_dashboard_ready.parquet"],
+		"outputs": ["data/dataset_dashboard_mvp.parquet", "data/dataset_dashboard_mvp_metrics.json"],
+	},
+]
+
+
+def stage_dependencies(stages: List[Dict[str, Any]]) -> Dict[str, Set[str]]:
+	"""
+	Dependencias de cada etapa: las etapas que producen alguna de sus entradas.
+
+	Args:
+		stages: Etapas (ver STAGES)
+
+	Returns:
+		Dict etapa -> nombres de las etapas de las que depende
+	"""
+	producers = {}
+	for stage in stages:
+		for pattern in stage["outputs"]:
+			producers[pattern] = stage["name"]
+	return {
+		stage["name"]: {producers[p] for p in stage["inputs"] if p in producers and producers[p] != stage["name"]}
+		for stage in stages
+	}
+
+
+def downstream_stages(stages: List[Dict[str, Any]], names: Set[str]) -> Set[str]:
+	"""Etapas alcanzables desde names en el DAG (incluidas names)."""
+	deps = stage_dependencies(stages)
+	result = set(names)
+	changed = True
+	while changed:
+		changed = False
+		for name, requires in deps.items():
+			if name not in result and requires & result:
+				result.add(name)
+				changed = True
+	return result
+
+
+def upstream_stages(stages: List[Dict[str, Any]], names: Set[str]) -> Set[str]:
+	"""Etapas de las que dependen names, directa o indirectamente (incluidas names)."""
+	deps = stage_dependencies(stages)
+	result = set(names)
+	pending = list(names)
+	while pending:
+		for dep in deps[pending.pop()]:
+			if dep not in result:
+				result.add(dep)
+				pending.append(dep)
+	return result
+
+
+def local_modules(script: Path) -> List[Path]:
+	"""
+	Script más los módulos de scripts/ que importa, de forma transitiva.
+
+	Args:
+		script: Path del script
+
+	Returns:
+		Paths ordenados del script y sus módulos locales
+	"""
+	seen = set()
+	pending = [script]
+	while pending:
+		path = pending.pop()
+		if path in seen:
+			continue
+		seen.add(path)
+		tree = ast.parse(path.read_text(encoding="utf-8"))
+		for node in ast.walk(tree):
+			if isinstance(node, ast.Import):
+				names = [alias.name for alias in node.names]
+			elif isinstance(node, ast.ImportFrom) and node.level == 0 and node.module:
+				names = [node.module]
+			else:
+				continue
+			for name in names:
+				module_path = SCRIPTS_DIR / f"{name.split('.')[0]}.py"
+				if module_path.exists():
+					pending.append(module_path)
+	return sorted(seen)
+
+
+class FileHashes:
+	"""
+	Hashes SHA-256 de archivos con caché por (tamaño, mtime).
+
+	Un archivo solo se vuelve a leer si su stat cambió desde la última vez.
+	"""
+
+	def __init__(self, cache: Optional[Dict[str, Dict[str, Any]]] = None):
+		self.cache = cache or {}
+
+	def file_hash(self, path: Path) -> str:
+		"""Hash del contenido de path (relativo o absoluto)."""
+		stat = path.stat()
+		key = artifact_key(path)
+		cached = self.cache.get(key)
+		if cached and cached["size"] == stat.st_size and cached["mtime_ns"] == stat.st_mtime_ns:
+			return cached["sha256"]
+
+		digest = hashlib.sha256()
+		with open(path, 'rb') as f:
+			for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b""):
+				digest.update(chunk)
+		self.cache[key] = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "sha256": digest.hexdigest()}
+		return digest.hexdigest()
+
+	def pattern_hashes(self, patterns: List[str]) -> Dict[str, str]:
+		"""Hash de cada archivo que coincide con los patrones (relativos al proyecto)."""
+		return {
+			artifact_key(path): self.file_hash(path)
+			for pattern in patterns
+			for path in sorted(PROJECT_ROOT.glob(pattern))
+			if path.is_file()
+		}
+
+
+def artifact_key(path: Path) -> str:
+	"""Ruta relativa al proyecto, usada como clave en el estado."""
+	path = Path(path).resolve()
+	try:
+		return path.relative_to(PROJECT_ROOT.resolve()).as_posix()
+	except ValueError:
+		return path.as_posix()
+
+
+def stage_key(stage: Dict[str, Any], hashes: FileHashes) -> Tuple[str, Dict[str, str]]:
+	"""
+	Clave por contenido de una etapa (entradas, código y argumentos).
+
+	Args:
+		stage: Etapa (ver STAGES)
+		hashes: Caché de hashes de archivo
+
+	Returns:
+		Tupla (clave, hashes de entrada); si falta alguna entrada, la clave
+		igual se calcula con los archivos presentes
+	"""
+	code = {
+		artifact_key(path): hashes.file_hash(path)
+		for path in local_modules(SCRIPTS_DIR / stage["script"])
+	}
+	inputs = hashes.pattern_hashes(stage["inputs"])
+	payload = {"code": code, "args": stage["args"], "inputs": inputs}
+	key = hashlib.sha256(json.dumps(payload, sort_keys=True).encode("utf-8")).hexdigest()
+	return key, inputs
+
+
+def is_up_to_date(stage: Dict[str, Any], key: str, state: Dict[str, Any], hashes: FileHashes) -> bool:
+	"""
+	True si la última ejecución exitosa tiene la misma clave y sus salidas no cambiaron.
+
+	Args:
+		stage: Etapa (ver STAGES)
+		key: Clave actual (stage_key)
+		state: Estado del pipeline
+		hashes: Caché de hashes de archivo
+	"""
+	previous = state["stages"].get(stage["name"])
+	if previous is None or previous["key"] != key:
+		return False
+	outputs = hashes.pattern_hashes(stage["outputs"])
+	return bool(outputs) and outputs == previous["outputs"]
+
+
+def load_state(state_path: Path = STATE_PATH) -> Dict[str, Any]:
+	"""Cargar audit/pipeline_state.json (vacío si no existe)."""
+	if not state_path.exists():
+		return {"files": {}, "stages": {}}
+	with open(state_path, 'r', encoding='utf-8') as f:
+		return json.load(f)
+
+
+def save_state(state: Dict[str, Any], state_path: Path = STATE_PATH) -> None:
+	"""Guardar el estado de forma atómica (temporal + os.replace)."""
+	state_path.parent.mkdir(parents=True, exist_ok=True)
+	tmp_path = state_path.with_name(f".{state_path.name}.{uuid.uuid4().hex}.tmp")
+	with open(tmp_path, 'w', encoding='utf-8') as f:
+		json.dump(state, f, indent=2, ensure_ascii=False)
+	os.replace(tmp_path, state_path)
+
+
+def run_script(stage: Dict[str, Any], polars_threads: Optional[int] = None) -> Tuple[int, float]:
+	"""
+	Ejecutar el script de una etapa como subproceso desde la raíz del proyecto.
+
+	Args:
+		stage: Etapa (ver STAGES)
+		polars_threads: POLARS_MAX_THREADS del subproceso (None = el de Polars);
+			con varias etapas en paralelo cada una recibe su parte de las CPUs
+
+	Returns:
+		Tupla (código de salida, segundos)
+	"""
+	LOGS_DIR.mkdir(parents=True, exist_ok=True)
+	log_path = LOGS_DIR / f"{stage['name']}.log"
+	start = time.perf_counter()
+	with open(log_path, 'w', encoding='utf-8') as log:
+		returncode = subprocess.call(
+			[sys.executable, str(SCRIPTS_DIR / stage["script"]), *stage["args"]],
+			cwd=PROJECT_ROOT,
+			stdout=log,
+			stderr=subprocess.STDOUT,
+			env={
+				**os.environ,
+				"PYTHONIOENCODING": "utf-8",
+				**({"POLARS_MAX_THREADS": str(polars_threads), "DATACL_CPUS": str(polars_threads)} if polars_threads else {}),
+			},
+		)
+	return returncode, time.perf_counter() - start
+
+
+def outputs_written(stage: Dict[str, Any], since_ns: int) -> bool:
+	"""
+	True si cada patrón de salida tiene al menos un archivo escrito desde since_ns.
+
+	Los scripts terminan con código 0 también ante errores de datos, así que
+	una etapa solo cuenta como exitosa si actualizó sus salidas.
+	"""
+	for pattern in stage["outputs"]:
+		paths = [path for path in PROJECT_ROOT.glob(pattern) if path.is_file()]
+		if not any(path.stat().st_mtime_ns >= since_ns for path in paths):
+			return False
+	return True
+
+
+def run_pipeline(
+	only: Optional[List[str]] = None,
+	force: Optional[List[str]] = None,
+	workers: int = DEFAULT_WORKERS,
+	dry_run: bool = False,
+	state_path: Path = STATE_PATH
+) -> Dict[str, Dict[str, Any]]:
+	"""
+	Ejecutar las etapas desactualizadas del DAG, en paralelo cuando son independientes.
+
+	Args:
+		only: Etapas a considerar (más sus dependencias); None = todas
+		force: Etapas a re-ejecutar aunque estén al día ([] = todas)
+		workers: Etapas simultáneas como máximo
+		dry_run: Solo mostrar qué etapas correrían
+		state_path: Path del estado del pipeline
+
+	Returns:
+		Dict etapa -> {"status", "seconds"}; status es "skipped", "ran",
+		"would_run", "failed" o "blocked" (falló una dependencia)
+	"""
+	state = load_state(state_path)
+	hashes = FileHashes(state["files"])
+	deps = stage_dependencies(STAGES)
+	selected = upstream_stages(STAGES, set(only)) if only else {stage["name"] for stage in STAGES}
+	forced = {stage["name"] for stage in STAGES} if force == [] else set(force or [])
+	by_name = {stage["name"]: stage for stage in STAGES}
+	# Cada etapa simultánea recibe su parte de las CPUs (ver resources.py)
+	polars_threads = max(1, available_cpus() // workers) if workers > 1 else None
+
+	pending = [stage["name"] for stage in STAGES if stage["name"] in selected]
+	results: Dict[str, Dict[str, Any]] = {}
+	running = {}
+
+	def finished(name: str) -> bool:
+		return name in results and results[name]["status"] in ("skipped", "ran", "would_run")
+
+	with ThreadPoolExecutor(max_workers=workers) as executor:
+		while pending or running:
+			# Lanzar (o saltar) todas las etapas cuyas dependencias terminaron
+			progress = True
+			while progress:
+				progress = False
+				for name in list(pending):
+					requires = deps[name] & selected
+					if any(dep in results and not finished(dep) for dep in requires):
+						results[name] = {"status": "blocked", "seconds": 0.0}
+					elif not all(finished(dep) for dep in requires):
+						continue
+					elif dry_run and any(results[dep]["status"] == "would_run" for dep in requires):
+						results[name] = {"status": "would_run", "seconds": 0.0}
+					else:
+						key, _ = stage_key(by_name[name], hashes)
+						if name not in forced and is_up_to_date(by_name[name], key, state, hashes):
+							results[name] = {"status": "skipped", "seconds": 0.0}
+						elif dry_run:
+							results[name] = {"status": "would_run", "seconds": 0.0}
+						elif len(running) < workers:
+							print(f"▶ {name}")
+							future = executor.submit(run_script, by_name[name], polars_threads)
+							running[future] = (name, key, time.time_ns())
+						else:
+							continue
+					pending.remove(name)
+					progress = True
+
+			if not running:
+				continue
+
+			done, _ = wait(running, return_when=FIRST_COMPLETED)
+			for future in done:
+				name, key, started_ns = running.pop(future)
+				returncode, seconds = future.result()
+				stage = by_name[name]
+				if returncode != 0 or not outputs_written(stage, started_ns):
+					results[name] = {"status": "failed", "seconds": seconds}
+					print(f"✗ {name} ({seconds:.1f}s) - ver {LOGS_DIR / (name + '.log')}")
+					continue
+
+				# La clave es la de las entradas al lanzar la etapa; si cambiaron
+				# mientras corría, la próxima ejecución no coincidirá y volverá a correr
+				state["stages"][name] = {
+					"key": key,
+					"outputs": hashes.pattern_hashes(stage["outputs"]),
+					"seconds": round(seconds, 3),
+					"finished_at": datetime.now(timezone.utc).isoformat(),
+				}
+				save_state(state, state_path)
+				results[name] = {"status": "ran", "seconds": seconds}
+				print(f"✓ {name} ({seconds:.1f}s)")
+
+	if not dry_run:
+		save_state(state, state_path)
+	return results
+
+
+def print_results(results: Dict[str, Dict[str, Any]], elapsed: float) -> None:
+	"""
+	Imprimir el estado y la duración de cada etapa.
+
+	Args:
+		results: Resultado de run_pipeline()
+		elapsed: Segundos totales de la ejecución
+	"""
+	labels = {
+		"skipped": "al día",
+		"ran": "ejecutada",
+		"would_run": "se ejecutaría",
+		"failed": "falló",
+		"blocked": "bloqueada",
+	}
+	print("\n" + "="*60)
+	print("RESUMEN DEL PIPELINE")
+	print("="*60)
+	for stage in STAGES:
+		result = results.get(stage["name"])
+		if result is None:
+			continue
+		print(f"  {stage['name']:<16} {labels[result['status']]:<14} {result['seconds']:>8.1f}s")
+	print(f"\nTiempo total: {elapsed:.2f}s")
+
+
+def print_status(state_path: Path = STATE_PATH) -> None:
+	"""Imprimir, sin ejecutar nada, qué etapas están al día y su última duración."""
+	state = load_state(state_path)
+	hashes = FileHashes(state["files"])
+	deps = stage_dependencies(STAGES)
+	stale: Set[str] = set()
+	for stage in STAGES:
+		key, _ = stage_key(stage, hashes)
+		if deps[stage["name"]] & stale or not is_up_to_date(stage, key, state, hashes):
+			stale.add(stage["name"])
+	stale = downstream_stages(STAGES, stale)
+
+	for stage in STAGES:
+		previous = state["stages"].get(stage["name"])
+		last = f"{previous['seconds']:.1f}s, {previous['finished_at']}" if previous else "nunca ejecutada"
+		status = "pendiente" if stage["name"] in stale else "al día"
+		after = ", ".join(sorted(deps[stage["name"]])) or "-"
+		print(f"  {stage['name']:<16} {status:<10} depende de: {after:<28} ({last})")
+	save_state(state, state_path)
+
+
+def parse_args() -> argparse.Namespace:
+	names = [stage["name"] for stage in STAGES]
+	parser = argparse.ArgumentParser(description="Ejecutar el pipeline como DAG, saltando etapas sin cambios.")
+	parser.add_argument("command", choices=["run", "status"], help="run: ejecutar etapas desactualizadas; status: mostrar estado")
+	parser.add_argument(
+		"--only",
+		nargs="+",
+		choices=names,
+		default=None,
+		help="Ejecutar solo estas etapas (y las que necesitan)",
+	)
+	parser.add_argument(
+		"--force",
+		nargs="*",
+		choices=names,
+		default=None,
+		help="Re-ejecutar estas etapas aunque estén al día (sin nombres: todas)",
+	)
+	parser.add_argument(
+		"--workers",
+		type=int,
+		default=DEFAULT_WORKERS,
+		help=f"Etapas simultáneas como máximo (default: {DEFAULT_WORKERS})",
+	)
+	parser.add_argument(
+		"--dry-run",
+		action="store_true",
+		help="Mostrar qué etapas se ejecutarían sin ejecutarlas",
+	)
+	return parser.parse_args()
+
+
+def main():
+	"""Función principal del orquestador."""
+	args = parse_args()
+
+	if args.command == "status":
+		print_status()
+		return
+
+	start = time.perf_counter()
+	results = run_pipeline(args.only, args.force, args.workers, args.dry_run)
+	print_results(results, time.perf_counter() - start)
+	if any(result["status"] in ("failed", "blocked") for result in results.values()):
+		sys.exit(1)
+
+
+if __name__ == "__main__":
+	main()
@@ -0,0 +1,295 @@
+"""
+Modo prioritario: publicar primero el MVP y rellenar la historia después.
+
+Tras un rebuild completo el dashboard espera a que se normalice, combine,
+limpie y transforme toda la historia, aunque el MVP solo usa las seasons
+más recientes. En modo prioritario:
+
+1. Los CSV se normalizan de la semana más reciente a la más antigua
+   (source_week descendente), escribiendo también la parte semanal del
+   dashboard (normalize.py --dashboard).
+2. En cuanto aparece una semana de una season anterior a las del MVP, esas
+   seasons están completas: el MVP se arma con sus partes (cada season
+   ordenada como en Pipeline_transformación.py --from-parts) y se publica.
+3. El resto de la historia se rellena en segundo plano: un proceso aparte
+   (progressive.py --backfill, log en audit/pipeline_logs/backfill.log)
+   normaliza los CSV pendientes, audita y corre datacl run-all, que vuelve
+   a publicar el MVP desde el dataset completo con el mismo contenido.
+
+Supone, como combine.py, que source_week crece con el tiempo. Un CSV está
+pendiente si su Parquet o su parte falta o es más antiguo que el CSV; con
+--rebuild se reprocesan todos (el backfill recibe la hora de inicio y no
+repite los ya normalizados en la fase prioritaria).
+
+El tiempo hasta el MVP y el total quedan en audit/resource_usage.jsonl
+(etapas "priority" y "backfill").
+
+Uso:
+	python scripts/progressive.py
+	python scripts/progressive.py --rebuild --seasons 2024-2025,2023-2024
+	python scripts/progressive.py --foreground
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import List, Optional
+
+import polars as pl
+
+from combine import extract_week_number
+from create_mvp_dataset import DEFAULT_METRICS_PATH, DEFAULT_OUTPUT_PATH, DEFAULT_SEASONS, save_mvp_dataset
+from dashboard_columns import PARTS_SORT_COLUMNS
+from normalize import load_schema_master, normalize_files, process_weekly_file
+from parquet_profiles import PROFILES
+from resources import track_usage
+
+
+PROJECT_ROOT = Path(__file__).parent.parent
+SCRIPTS_DIR = PROJECT_ROOT / "scripts"
+DATA_RAW_DIR = PROJECT_ROOT / "data_raw"
+DATA_CLEAN_DIR = PROJECT_ROOT / "data_clean"
+PARTS_DIR = PROJECT_ROOT / "data_dashboard"
+BACKFILL_LOG = PROJECT_ROOT / "audit" / "pipeline_logs" / "backfill.log"
+
+
+def newest_first(csv_files: List[Path]) -> List[Path]:
+	"""CSVs ordenados por source_week descendente (sin número al final)."""
+	return sorted(csv_files, key=lambda path: extract_week_number(path.name) or -1, reverse=True)
+
+
+def is_pending(csv_path: Path, since: Optional[float] = None) -> bool:
+	"""
+	Si un CSV necesita normalizarse.
+
+	Args:
+		csv_path: CSV de data_raw/
+		since: Si se indica, también está pendiente si su Parquet o su parte
+			son anteriores a esta hora (epoch), p. ej. el inicio de un rebuild
+
+	Returns:
+		True si falta el Parquet o la parte, o alguno es más antiguo que el CSV
+	"""
+	outputs = [DATA_CLEAN_DIR / f"{csv_path.stem}.parquet", PARTS_DIR / f"{csv_path.stem}.parquet"]
+	if not all(path.exists() for path in outputs):
+		return True
+	oldest = min(path.stat().st_mtime for path in outputs)
+	return oldest < csv_path.stat().st_mtime or (since is not None and oldest < since)
+
+
+def part_seasons(part_path: Path) -> List[Optional[str]]:
+	"""Seasons presentes en una parte del dashboard."""
+	return pl.scan_parquet(part_path).select(pl.col("season").unique()).collect()["season"].to_list()
+
+
+def publish_priority_mvp(parts: List[Path], seasons: List[str], profile: str = "dashboard") -> dict:
+	"""
+	Publicar el MVP desde las partes semanales de sus seasons.
+
+	Mismo orden que el dataset del dashboard: seasons ascendentes y cada una
+	ordenada por PARTS_SORT_COLUMNS sobre las partes en orden de nombre
+	(como scan_dashboard_parts).
+
+	Args:
+		parts: Partes del dashboard que contienen las seasons del MVP
+		seasons: Seasons del MVP
+		profile: Perfil de escritura
+
+	Returns:
+		Métricas del MVP (ver create_mvp_dataset.finish_subset)
+	"""
+	lf = pl.scan_parquet(sorted(parts, key=lambda path: path.name)).filter(pl.col("season").is_in(seasons))
+	frames = [
+		lf.filter(pl.col("season") == season).collect().sort(PARTS_SORT_COLUMNS, maintain_order=True)
+		for season in sorted(seasons)
+	]
+	return save_mvp_dataset(
+		pl.concat(frames),
+		str(PARTS_DIR.relative_to(PROJECT_ROOT)),
+		PROJECT_ROOT / DEFAULT_OUTPUT_PATH,
+		PROJECT_ROOT / DEFAULT_METRICS_PATH,
+		profile=profile,
+	)
+
+
+def run_priority(
+	seasons: List[str],
+	rebuild: bool = False,
+	profile: str = "default",
+	dashboard_profile: str = "dashboard",
+	fixed_point: bool = False
+) -> float:
+	"""
+	Fase prioritaria: normalizar hacia atrás hasta completar las seasons del MVP y publicarlo.
+
+	Args:
+		seasons: Seasons del MVP
+		rebuild: Si True, reprocesa también los CSV ya normalizados
+		profile: Perfil de los Parquets semanales y de las partes
+		dashboard_profile: Perfil del MVP
+		fixed_point: Ver normalize.py --fixed-point
+
+	Returns:
+		Hora de inicio (epoch), para que el backfill no repita lo ya procesado
+	"""
+	started_at = time.time()
+	schema_master = load_schema_master(SCRIPTS_DIR)
+	oldest_season = min(seasons)
+	mvp_parts = []
+	processed = 0
+
+	with track_usage("priority"):
+		for csv_path in newest_first(list(DATA_RAW_DIR.glob("*.csv"))):
+			if is_pending(csv_path, started_at if rebuild else None):
+				if process_weekly_file(csv_path, DATA_CLEAN_DIR, schema_master, profile, fixed_point, PARTS_DIR) is None:
+					raise RuntimeError(f"No se pudo normalizar {csv_path.name}; corrige el CSV y vuelve a correr.")
+				processed += 1
+
+			part_path = PARTS_DIR / f"{csv_path.stem}.parquet"
+			found = part_seasons(part_path)
+			if any(season in seasons for season in found):
+				mvp_parts.append(part_path)
+			# Semana de una season anterior a las del MVP: ya están completas
+			if found and all(season is not None and season < oldest_season for season in found):
+				break
+
+		if not mvp_parts:
+			raise RuntimeError(f"Ninguna semana pertenece a las seasons del MVP: {seasons}")
+		print(f"\nSemanas normalizadas en la fase prioritaria: {processed} ({len(mvp_parts)} semanas del MVP)")
+		publish_priority_mvp(mvp_parts, seasons, dashboard_profile)
+
+	print(f"\n✓ MVP publicado en {time.time() - started_at:,.1f}s (la historia completa sigue en el backfill)")
+	return started_at
+
+
+def run_backfill(
+	since: Optional[float] = None,
+	profile: str = "default",
+	dashboard_profile: str = "dashboard",
+	fixed_point: bool = False,
+	seasons: Optional[List[str]] = None
+) -> None:
+	"""
+	Rellenar la historia: normalizar los CSV pendientes, auditar y correr run-all.
+
+	Args:
+		since: Hora de inicio del rebuild (ver is_pending)
+		profile, dashboard_profile, fixed_point: Ver run_priority
+		seasons: Seasons del MVP
+	"""
+	from datacl import print_timings, run_all, run_command
+
+	started_at = time.time()
+	with track_usage("backfill"):
+		pending = [csv_path for csv_path in sorted(DATA_RAW_DIR.glob("*.csv")) if is_pending(csv_path, since)]
+		print(f"CSV pendientes: {len(pending)}")
+		if pending:
+			_, failed = normalize_files(
+				pending, DATA_CLEAN_DIR, load_schema_master(SCRIPTS_DIR), profile, fixed_point, PARTS_DIR
+			)
+			if failed:
+				raise RuntimeError(f"{failed} CSV no se pudieron normalizar; el backfill se detiene.")
+		run_command("audit", [])
+		timings = run_all(profile=profile, dashboard_profile=dashboard_profile, seasons=seasons)
+	print_timings(timings)
+	print(f"\n✓ Backfill completado en {time.time() - started_at:,.1f}s")
+
+
+def start_backfill(since: Optional[float], argv: List[str]) -> subprocess.Popen:
+	"""
+	Lanzar el backfill en un proceso aparte que sigue aunque este termine.
+
+	Args:
+		since: Hora de inicio del rebuild (None si no es rebuild)
+		argv: Opciones de perfil y seasons a repetir en el backfill
+
+	Returns:
+		Proceso del backfill (su salida va a audit/pipeline_logs/backfill.log)
+	"""
+	BACKFILL_LOG.parent.mkdir(parents=True, exist_ok=True)
+	command = [sys.executable, str(SCRIPTS_DIR / "progressive.py"), "--backfill", *argv]
+	if since is not None:
+		command += ["--since", str(since)]
+	with open(BACKFILL_LOG, 'w', encoding='utf-8') as log:
+		return subprocess.Popen(
+			command,
+			cwd=PROJECT_ROOT,
+			stdout=log,
+			stderr=subprocess.STDOUT,
+			env={**os.environ, "PYTHONIOENCODING": "utf-8"},
+			start_new_session=True,
+		)
+
+
+def parse_args() -> argparse.Namespace:
+	parser = argparse.ArgumentParser(description="Publicar primero el MVP con las seasons recientes y rellenar la historia después.")
+	parser.add_argument(
+		"--seasons",
+		type=str,
+		default=",".join(DEFAULT_SEASONS),
+		help="Temporadas del MVP separadas por coma",
+	)
+	parser.add_argument(
+		"--rebuild",
+		action="store_true",
+		help="Reprocesar todos los CSV (no solo los pendientes)",
+	)
+	parser.add_argument(
+		"--foreground",
+		action="store_true",
+		help="Correr el backfill en este proceso en lugar de en segundo plano",
+	)
+	parser.add_argument(
+		"--profile",
+		choices=list(PROFILES),
+		default="default",
+		help="Perfil de los Parquets semanales, del maestro y del limpio (default: default)",
+	)
+	parser.add_argument(
+		"--dashboard-profile",
+		choices=list(PROFILES),
+		default="dashboard",
+		help="Perfil del dashboard y del MVP (default: dashboard)",
+	)
+	parser.add_argument(
+		"--fixed-point",
+		action="store_true",
+		help="Agregar net_weight_g (ver normalize.py --fixed-point)",
+	)
+	parser.add_argument("--backfill", action="store_true", help=argparse.SUPPRESS)
+	parser.add_argument("--since", type=float, default=None, help=argparse.SUPPRESS)
+	return parser.parse_args()
+
+
+def main():
+	"""Función principal del modo prioritario."""
+	args = parse_args()
+	os.chdir(PROJECT_ROOT)
+	seasons = [season.strip() for season in args.seasons.split(",") if season.strip()]
+
+	if args.backfill:
+		run_backfill(args.since, args.profile, args.dashboard_profile, args.fixed_point, seasons)
+		return
+
+	if not DATA_RAW_DIR.exists():
+		print(f"Error: Directorio {DATA_RAW_DIR} no existe")
+		sys.exit(1)
+
+	since = run_priority(seasons, args.rebuild, args.profile, args.dashboard_profile, args.fixed_point)
+	since = since if args.rebuild else None
+	if args.foreground:
+		run_backfill(since, args.profile, args.dashboard_profile, args.fixed_point, seasons)
+		return
+
+	argv = ["--seasons", ",".join(seasons), "--profile", args.profile, "--dashboard-profile", args.dashboard_profile]
+	if args.fixed_point:
+		argv.append("--fixed-point")
+	process = start_backfill(since, argv)
+	print(f"Backfill en segundo plano (pid {process.pid}), log en {BACKFILL_LOG.relative_to(PROJECT_ROOT)}")
+
+
+if __name__ == "__main__":
+	main()
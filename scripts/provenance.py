@@ -0,0 +1,194 @@
+"""
+Procedencia de filas: de una fila normalizada a su registro original en data_raw/.
+
+Con normalize.py --provenance cada fila lleva source_row (UInt32), su
+ordinal entre los registros de datos del CSV. Junto con source_week (el
+número del archivo, ver combine.py) identifica el registro de origen.
+normalize escribe además un índice por CSV en data_provenance/<csv>.offsets:
+el byte de inicio de cada registro como uint64 little-endian, así que el
+registro r está en el byte 8 × r del índice y locate_raw() llega a la línea
+original con dos lecturas posicionadas, sin recorrer el CSV.
+
+Los registros se cuentan como los cuenta Polars al leer el CSV: un salto de
+línea dentro de comillas no corta el registro y las líneas vacías cuentan
+como filas (nulas). Si el conteo no coincide con las filas leídas, no se
+escribe índice y source_row queda nulo para ese archivo.
+
+Para consultar registros: python scripts/view_audit.py --rows / --locate.
+"""
+
+import os
+import sys
+import uuid
+from array import array
+from pathlib import Path
+from typing import Any, Dict, Mapping, Optional
+
+import polars as pl
+
+
+PROJECT_ROOT = Path(__file__).parent.parent
+DATA_RAW_DIR = PROJECT_ROOT / "data_raw"
+INDEX_DIR = PROJECT_ROOT / "data_provenance"
+
+ROW_COLUMN = "source_row"
+SOURCE_COLUMN = "source_week"
+
+# Bytes por entrada del índice (uint64 little-endian)
+OFFSET_SIZE = 8
+
+
+def index_path(csv_name: str, index_dir: Path = INDEX_DIR) -> Path:
+	"""Ruta del índice de offsets de un CSV."""
+	return index_dir / f"{Path(csv_name).stem}.offsets"
+
+
+def csv_name(source_week: int) -> str:
+	"""Nombre del CSV de data_raw/ de un source_week (ver combine.extract_week_number)."""
+	return f"datos_semana_{source_week}.csv"
+
+
+def record_offsets(csv_path: Path) -> array:
+	"""
+	Byte de inicio de cada registro de datos de un CSV (sin el encabezado).
+
+	Args:
+		csv_path: CSV de data_raw/
+
+	Returns:
+		array('Q') con un offset por registro, en orden
+	"""
+	offsets = array("Q")
+	position = 0
+	in_quotes = False
+	with open(csv_path, 'rb') as f:
+		for line in f:
+			if not in_quotes:
+				offsets.append(position)
+			# Comillas impares: el registro sigue en la línea siguiente
+			if line.count(b'"') % 2:
+				in_quotes = not in_quotes
+			position += len(line)
+	return offsets[1:]
+
+
+def write_offset_index(offsets: array, csv_path: Path, index_dir: Path = INDEX_DIR) -> Path:
+	"""
+	Guardar el índice de offsets de un CSV (reemplazo atómico).
+
+	Args:
+		offsets: Resultado de record_offsets()
+		csv_path: CSV indexado
+		index_dir: Directorio de índices
+
+	Returns:
+		Path del índice
+	"""
+	index_dir.mkdir(parents=True, exist_ok=True)
+	output_path = index_path(csv_path.name, index_dir)
+	tmp_path = output_path.with_name(f".{output_path.name}.{uuid.uuid4().hex}.tmp")
+	if sys.byteorder != "little":
+		offsets = array("Q", offsets)
+		offsets.byteswap()
+	try:
+		with open(tmp_path, 'wb') as f:
+			offsets.tofile(f)
+		os.replace(tmp_path, output_path)
+	finally:
+		tmp_path.unlink(missing_ok=True)
+	return output_path
+
+
+def add_row_ordinals(df: pl.DataFrame, csv_path: Path, index_dir: Path = INDEX_DIR) -> pl.DataFrame:
+	"""
+	Agregar source_row a las filas de un CSV y escribir su índice.
+
+	Args:
+		df: Una fila por registro del CSV, en su orden (p. ej. el resultado
+			de normalize.normalize_schema)
+		csv_path: CSV de origen
+		index_dir: Directorio de índices
+
+	Returns:
+		df con source_row como última columna (nulo si el conteo de
+		registros no coincide)
+	"""
+	offsets = record_offsets(csv_path)
+	if len(offsets) != df.height:
+		print(f"  ⚠️  {csv_path.name}: {len(offsets)} registros en el CSV y {df.height} filas leídas; "
+			"sin índice de procedencia")
+		index_path(csv_path.name, index_dir).unlink(missing_ok=True)
+		return df.with_columns(pl.lit(None, dtype=pl.UInt32).alias(ROW_COLUMN))
+
+	write_offset_index(offsets, csv_path, index_dir)
+	return df.with_columns(pl.int_range(pl.len(), dtype=pl.UInt32).alias(ROW_COLUMN))
+
+
+def read_offset(index_file: Path, row: int) -> Optional[int]:
+	"""
+	Offset de un registro leído directamente de su posición en el índice.
+
+	Args:
+		index_file: Índice de offsets
+		row: source_row
+
+	Returns:
+		Byte de inicio del registro, o None si row está fuera del índice
+	"""
+	with open(index_file, 'rb') as f:
+		f.seek(row * OFFSET_SIZE)
+		data = f.read(OFFSET_SIZE)
+	if len(data) < OFFSET_SIZE:
+		return None
+	return int.from_bytes(data, "little")
+
+
+def locate_raw(
+	row: Mapping[str, Any],
+	data_raw_dir: Path = DATA_RAW_DIR,
+	index_dir: Path = INDEX_DIR
+) -> Dict[str, Any]:
+	"""
+	Registro original en data_raw/ de una fila del pipeline.
+
+	Args:
+		row: Fila con source_week y source_row (p. ej. de df.iter_rows(named=True))
+		data_raw_dir: Directorio de los CSV
+		index_dir: Directorio de índices
+
+	Returns:
+		Dict con file, source_row, offset y line (el registro decodificado,
+		sin el salto de línea final)
+	"""
+	source_week = row.get(SOURCE_COLUMN)
+	source_row = row.get(ROW_COLUMN)
+	if source_week is None or source_week < 0 or source_row is None:
+		raise ValueError(f"La fila no tiene {SOURCE_COLUMN}/{ROW_COLUMN} (normaliza con --provenance)")
+
+	csv_path = data_raw_dir / csv_name(source_week)
+	index_file = index_path(csv_path.name, index_dir)
+	if not index_file.exists():
+		raise FileNotFoundError(f"No hay índice de procedencia para {csv_path.name}. "
+			"Ejecuta: python scripts/normalize.py --provenance")
+	if index_file.stat().st_mtime < csv_path.stat().st_mtime:
+		raise RuntimeError(f"El índice de {csv_path.name} es anterior al CSV; vuelve a normalizar con --provenance")
+
+	start = read_offset(index_file, source_row)
+	if start is None:
+		raise IndexError(f"{csv_path.name} no tiene el registro {source_row}")
+	end = read_offset(index_file, source_row + 1)
+
+	# Mismo encoding que normalize.load_csv
+	from normalize import detect_csv_encoding_and_separator
+	encoding, _ = detect_csv_encoding_and_separator(csv_path)
+	with open(csv_path, 'rb') as f:
+		f.seek(start)
+		data = f.read(end - start) if end is not None else f.read()
+
+	return {
+		"file": csv_path.name,
+		ROW_COLUMN: source_row,
+		"offset": start,
+		"line": data.decode(encoding, errors="replace").rstrip("\r\n"),
+	}
+
@@ -0,0 +1,234 @@
+"""
+Configuración de ejecución y planificación de recursos por etapa.
+
+Polars usa por defecto un hilo por núcleo, así que un pool de N procesos con
+Polars en cada uno compite por los mismos núcleos (N × núcleos hilos). Este
+módulo decide por etapa cuántos procesos correr y cuántos hilos de Polars
+recibe cada uno (POLARS_MAX_THREADS, fijado antes de que el proceso hijo
+importe Polars), con un presupuesto de memoria:
+
+- Cada etapa declara en EXECUTION_CONFIG si reparte trabajo en procesos y
+  cuánta memoria usa por byte de entrada (memory_factor).
+- plan_stage() limita los procesos por CPUs disponibles, unidades de trabajo
+  y presupuesto de memoria, y marca streaming=True cuando una unidad no cabe
+  en la memoria de su proceso (la etapa usa entonces el motor streaming).
+- process_pool() crea el pool (spawn) con POLARS_MAX_THREADS ya fijado.
+- track_usage() mide tiempo de pared y de CPU (propio e hijos) y registra la
+  utilización en audit/resource_usage.jsonl.
+
+Polars no permite fijar un tope duro de memoria: el presupuesto decide
+cuántos procesos corren a la vez y cuándo pasar a streaming.
+
+Variables de entorno:
+	DATACL_CPUS       CPUs a usar (default: las asignadas al proceso)
+	DATACL_MEMORY_MB  Presupuesto de memoria (default: 70% de la disponible)
+"""
+
+import json
+import multiprocessing
+import os
+import resource
+import time
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterable, Optional
+
+
+USAGE_PATH = Path(__file__).parent.parent / "audit" / "resource_usage.jsonl"
+
+# Fracción de la memoria disponible usada como presupuesto por defecto
+DEFAULT_MEMORY_FRACTION = 0.7
+
+# Por etapa: parallel = reparte unidades (archivos, particiones) en procesos;
+# memory_factor = bytes en memoria por byte de entrada (estimación conservadora)
+EXECUTION_CONFIG = {
+	"normalize": {"parallel": True, "memory_factor": 8.0},
+	"audit": {"parallel": True, "memory_factor": 8.0},
+	"combine": {"parallel": False, "memory_factor": 4.0},
+	"validate": {"parallel": True, "memory_factor": 4.0},
+}
+
+
+def available_cpus() -> int:
+	"""CPUs disponibles para el proceso (DATACL_CPUS o la afinidad del proceso)."""
+	if os.environ.get("DATACL_CPUS"):
+		return max(1, int(os.environ["DATACL_CPUS"]))
+	try:
+		return len(os.sched_getaffinity(0))
+	except AttributeError:
+		return os.cpu_count() or 1
+
+
+def available_memory() -> Optional[int]:
+	"""
+	Memoria disponible en bytes (límite del cgroup o MemAvailable).
+
+	Returns:
+		Bytes disponibles, o None si no se puede determinar (p. ej. fuera de Linux)
+	"""
+	limits = []
+	try:
+		with open("/sys/fs/cgroup/memory.max", 'r') as f:
+			value = f.read().strip()
+		if value != "max":
+			limits.append(int(value))
+	except (OSError, ValueError):
+		pass
+	try:
+		with open("/proc/meminfo", 'r') as f:
+			for line in f:
+				if line.startswith("MemAvailable:"):
+					limits.append(int(line.split()[1]) * 1024)
+					break
+	except (OSError, ValueError):
+		pass
+	return min(limits) if limits else None
+
+
+def memory_budget() -> Optional[int]:
+	"""Presupuesto de memoria en bytes (DATACL_MEMORY_MB o 70% de la disponible)."""
+	if os.environ.get("DATACL_MEMORY_MB"):
+		return int(float(os.environ["DATACL_MEMORY_MB"]) * 1024 * 1024)
+	memory = available_memory()
+	return int(memory * DEFAULT_MEMORY_FRACTION) if memory is not None else None
+
+
+def plan_stage(
+	stage: str,
+	unit_bytes: int,
+	units: int = 1,
+	requested_workers: Optional[int] = None
+) -> Dict[str, Any]:
+	"""
+	Decidir procesos, hilos de Polars y modo de ejecución de una etapa.
+
+	Args:
+		stage: Nombre de la etapa (ver EXECUTION_CONFIG)
+		unit_bytes: Tamaño en disco de la unidad de trabajo más grande
+			(un CSV, un Parquet semanal, el dataset completo)
+		units: Número de unidades de trabajo
+		requested_workers: Procesos pedidos por el usuario (None = automático)
+
+	Returns:
+		Dict con workers, polars_threads, memory_budget (bytes o None),
+		unit_memory (estimación por unidad) y streaming
+	"""
+	config = EXECUTION_CONFIG[stage]
+	cpus = available_cpus()
+	budget = memory_budget()
+	unit_memory = int(unit_bytes * config["memory_factor"])
+
+	workers = 1
+	if config["parallel"]:
+		workers = min(requested_workers or cpus, max(units, 1))
+		if budget is not None and unit_memory > 0:
+			workers = min(workers, max(1, budget // unit_memory))
+		workers = max(1, workers)
+
+	per_worker = budget // workers if budget is not None else None
+	return {
+		"stage": stage,
+		"workers": workers,
+		"polars_threads": max(1, cpus // workers),
+		"memory_budget": budget,
+		"unit_memory": unit_memory,
+		"streaming": per_worker is not None and unit_memory > per_worker,
+	}
+
+
+def collect_engine(plan: Dict[str, Any]) -> str:
+	"""Motor de collect() para el plan: "streaming" si la unidad no cabe en memoria."""
+	return "streaming" if plan["streaming"] else "auto"
+
+
+def total_bytes(paths: Iterable[Path]) -> int:
+	"""Suma de tamaños en disco."""
+	return sum(Path(path).stat().st_size for path in paths)
+
+
+def print_plan(plan: Dict[str, Any]) -> None:
+	"""Imprimir el plan de recursos de una etapa."""
+	budget = plan["memory_budget"]
+	budget_text = f"{budget / (1024 * 1024):,.0f} MB" if budget is not None else "sin límite conocido"
+	print(f"Recursos ({plan['stage']}): {plan['workers']} procesos × {plan['polars_threads']} hilos de Polars, "
+		f"presupuesto {budget_text}, ~{plan['unit_memory'] / (1024 * 1024):,.0f} MB por unidad"
+		f"{' → streaming' if plan['streaming'] else ''}")
+
+
+@contextmanager
+def polars_threads_env(threads: int):
+	"""Fijar POLARS_MAX_THREADS para los procesos hijos creados dentro del bloque."""
+	previous = os.environ.get("POLARS_MAX_THREADS")
+	os.environ["POLARS_MAX_THREADS"] = str(threads)
+	try:
+		yield
+	finally:
+		if previous is None:
+			os.environ.pop("POLARS_MAX_THREADS", None)
+		else:
+			os.environ["POLARS_MAX_THREADS"] = previous
+
+
+@contextmanager
+def process_pool(plan: Dict[str, Any]):
+	"""
+	Pool de procesos del plan, con POLARS_MAX_THREADS fijado en cada hijo.
+
+	Usa spawn: Polars no es seguro tras fork con hilos activos, y un proceso
+	nuevo lee POLARS_MAX_THREADS al importar Polars.
+
+	Args:
+		plan: Resultado de plan_stage()
+	"""
+	context = multiprocessing.get_context("spawn")
+	with polars_threads_env(plan["polars_threads"]):
+		with ProcessPoolExecutor(max_workers=plan["workers"], mp_context=context) as pool:
+			yield pool
+
+
+def cpu_seconds() -> float:
+	"""Segundos de CPU (usuario + sistema) del proceso y de sus hijos terminados."""
+	own = resource.getrusage(resource.RUSAGE_SELF)
+	children = resource.getrusage(resource.RUSAGE_CHILDREN)
+	return own.ru_utime + own.ru_stime + children.ru_utime + children.ru_stime
+
+
+@contextmanager
+def track_usage(stage: str, plan: Optional[Dict[str, Any]] = None, usage_path: Path = USAGE_PATH):
+	"""
+	Medir la utilización de CPU de una etapa y registrarla.
+
+	Utilización = segundos de CPU / (segundos de pared × CPUs disponibles).
+	Agrega una línea a audit/resource_usage.jsonl al terminar el bloque.
+
+	Args:
+		stage: Nombre de la etapa
+		plan: Plan usado (se registra junto a la medición)
+		usage_path: Path del registro
+	"""
+	cpus = available_cpus()
+	start_wall = time.perf_counter()
+	start_cpu = cpu_seconds()
+	try:
+		yield
+	finally:
+		wall = time.perf_counter() - start_wall
+		cpu = cpu_seconds() - start_cpu
+		utilization = cpu / (wall * cpus) if wall > 0 else 0.0
+		entry = {
+			"stage": stage,
+			"recorded_at": datetime.now(timezone.utc).isoformat(),
+			"wall_seconds": round(wall, 3),
+			"cpu_seconds": round(cpu, 3),
+			"cpus": cpus,
+			"utilization": round(utilization, 3),
+		}
+		if plan is not None:
+			entry["plan"] = {key: plan[key] for key in ("workers", "polars_threads", "memory_budget", "streaming")}
+		usage_path.parent.mkdir(parents=True, exist_ok=True)
+		with open(usage_path, 'a', encoding='utf-8') as f:
+			f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+		print(f"\nCPU ({stage}): {cpu:,.1f}s de CPU en {wall:,.1f}s de pared "
+			f"({utilization:.0%} de {cpus} CPUs)")
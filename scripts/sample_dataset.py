@@ -0,0 +1,303 @@
+"""
+Muestras estratificadas y ponderadas del dataset del dashboard.
+
+Genera datasets pequeños (1% y 5% por defecto) para desarrollo y CI con las
+mismas columnas y formas de consulta que el dataset completo:
+
+- Estratos: season × product × tier del exportador. El tier sale de la
+  participación acumulada en boxes de cada exportador en todo el dataset
+  (A: los que suman el primer 50%, B: hasta el 90%, C: el resto).
+- Dentro de cada estrato se toma una muestra sistemática sobre las filas
+  ordenadas por boxes (cubre todo el rango de tamaños), con al menos una
+  fila por estrato. Es determinista: la misma entrada da la misma muestra.
+- sample_weight calibra cada estrato para que las boxes ponderadas sean
+  exactamente las del estrato completo (total por season, producto y tier
+  preservado); filas y kilos ponderados son estimaciones.
+- El error relativo de filas y kilos ponderados (total y por season) se
+  mide contra el dataset completo y se guarda en las métricas; si supera
+  --max-error la muestra no se publica.
+
+analysis/kpis.py aplica sample_weight al sumar (como row_count en el
+dataset compactado). Las muestras están en el registro de datasets
+(dataset_registry.py) como sample_1pct y sample_5pct.
+
+Uso:
+	python scripts/sample_dataset.py
+	python scripts/sample_dataset.py --samples 1pct --max-error 0.05
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+from typing import Any, Dict, List
+
+import polars as pl
+
+from fixed_point import FIXED_KILOS_COLUMN, KILOS_COLUMN
+from lineage import NULL_SEASON, SEASON_COLUMN, season_totals
+from parquet_profiles import PROFILES
+from snapshots import publish_dataframe
+
+
+PROJECT_ROOT = Path(__file__).parent.parent
+DATA_DIR = PROJECT_ROOT / "data"
+
+# Nombre de la muestra -> fracción de filas
+SAMPLE_FRACTIONS = {
+	"1pct": 0.01,
+	"5pct": 0.05,
+}
+
+WEIGHT_COLUMN = "sample_weight"
+STRATA = ["season", "product", "exporter_tier"]
+
+# Tier del exportador -> participación acumulada de boxes hasta la que llega
+EXPORTER_TIERS = [("A", 0.5), ("B", 0.9)]
+LAST_TIER = "C"
+
+# Error relativo máximo de filas y kilos ponderados (total y por season)
+DEFAULT_MAX_ERROR = 0.02
+
+
+def sample_path(name: str) -> Path:
+	"""Ruta del Parquet de una muestra."""
+	return DATA_DIR / f"dataset_sample_{name}.parquet"
+
+
+def metrics_path(name: str) -> Path:
+	"""Ruta del JSON de métricas de una muestra."""
+	return DATA_DIR / f"dataset_sample_{name}_metrics.json"
+
+
+def exporter_tiers(lf: pl.LazyFrame) -> pl.LazyFrame:
+	"""
+	Tier de cada exportador según su participación acumulada en boxes.
+
+	Args:
+		lf: Dataset completo
+
+	Returns:
+		LazyFrame con exporter y exporter_tier
+	"""
+	totals = (
+		lf.group_by("exporter")
+		.agg(pl.col("boxes").sum().alias("exporter_boxes"))
+		.sort(["exporter_boxes", "exporter"], descending=[True, False], nulls_last=True)
+	)
+	# Participación acumulada antes de cada exportador (el primero empieza en 0)
+	share = (pl.col("exporter_boxes").cum_sum() - pl.col("exporter_boxes")) / pl.col("exporter_boxes").sum()
+	tier = pl.when(share < EXPORTER_TIERS[0][1]).then(pl.lit(EXPORTER_TIERS[0][0]))
+	for name, limit in EXPORTER_TIERS[1:]:
+		tier = tier.when(share < limit).then(pl.lit(name))
+	return totals.select("exporter", tier.otherwise(pl.lit(LAST_TIER)).alias("exporter_tier"))
+
+
+def stratified_sample(lf: pl.LazyFrame, fraction: float) -> pl.LazyFrame:
+	"""
+	Muestra sistemática por estrato con pesos calibrados a las boxes.
+
+	En un estrato de N filas se toman n = max(1, round(N × fraction)): la
+	fila de rango r (por boxes) entra si floor((2rn + N) / 2N) avanza
+	respecto de r - 1, lo que da exactamente n filas repartidas a lo largo
+	del estrato.
+
+	Args:
+		lf: Dataset completo (lazy)
+		fraction: Fracción de filas a conservar
+
+	Returns:
+		LazyFrame con las columnas de lf más sample_weight, en el orden de lf
+	"""
+	columns = lf.collect_schema().names()
+	over = [pl.col(col) for col in STRATA]
+	rows = pl.len().over(over).cast(pl.Int64)
+	size = (pl.len().over(over).cast(pl.Float64) * fraction).round().cast(pl.Int64).clip(lower_bound=1)
+	rank = pl.col("boxes").fill_null(0).rank("ordinal").over(over).cast(pl.Int64)
+
+	position = (2 * pl.col("_rank") * pl.col("_size") + pl.col("_rows")) // (2 * pl.col("_rows"))
+	previous = (2 * (pl.col("_rank") - 1) * pl.col("_size") + pl.col("_rows")) // (2 * pl.col("_rows"))
+	sampled_boxes = pl.col("boxes").fill_null(0).sum().over(over)
+	weight = (
+		pl.when(sampled_boxes > 0)
+		.then(pl.col("_stratum_boxes") / sampled_boxes)
+		.otherwise(pl.col("_rows") / pl.col("_size"))
+	)
+
+	return (
+		lf.join(exporter_tiers(lf), on="exporter", how="left", nulls_equal=True, maintain_order="left")
+		.with_columns([
+			rows.alias("_rows"),
+			size.alias("_size"),
+			rank.alias("_rank"),
+			pl.col("boxes").fill_null(0).sum().over(over).cast(pl.Float64).alias("_stratum_boxes"),
+		])
+		.filter(position > previous)
+		.with_columns(weight.cast(pl.Float64).alias(WEIGHT_COLUMN))
+		.select([*columns, WEIGHT_COLUMN])
+	)
+
+
+def weighted_season_totals(df: pl.DataFrame) -> Dict[str, Dict[str, float]]:
+	"""Filas, boxes y kilos ponderados por season de una muestra."""
+	kilos = pl.col(FIXED_KILOS_COLUMN) / 1000 if FIXED_KILOS_COLUMN in df.columns else pl.col(KILOS_COLUMN)
+	weight = pl.col(WEIGHT_COLUMN)
+	totals = df.group_by(SEASON_COLUMN).agg([
+		weight.sum().alias("rows"),
+		(pl.col("boxes") * weight).sum().alias("boxes"),
+		(kilos * weight).sum().alias("kilos"),
+	])
+	return {
+		NULL_SEASON if row[SEASON_COLUMN] is None else row[SEASON_COLUMN]: {
+			key: float(row[key] or 0) for key in ("rows", "boxes", "kilos")
+		}
+		for row in totals.iter_rows(named=True)
+	}
+
+
+def relative_error(estimate: float, actual: float) -> float:
+	"""Error relativo |estimado - real| / real (0 si ambos son 0)."""
+	if actual == 0:
+		return 0.0 if estimate == 0 else float("inf")
+	return abs(estimate - actual) / abs(actual)
+
+
+def sample_errors(full: Dict[str, Dict[str, int]], sample: Dict[str, Dict[str, float]]) -> Dict[str, Any]:
+	"""
+	Comparar los totales ponderados de la muestra con los del dataset completo.
+
+	Args:
+		full: season_totals del dataset completo (kilos en gramos)
+		sample: weighted_season_totals de la muestra
+
+	Returns:
+		Dict con totals (real, estimado y error por KPI), seasons (error por
+		season y KPI) y max_error (el mayor error de filas y kilos)
+	"""
+	def compare(actual: Dict[str, int], estimate: Dict[str, float]) -> Dict[str, Dict[str, float]]:
+		actual_values = {"rows": actual["rows"], "boxes": actual["boxes"], "kilos": actual["kilos_g"] / 1000}
+		return {
+			key: {
+				"actual": actual_values[key],
+				"estimate": round(estimate.get(key, 0.0), 3),
+				"error": relative_error(estimate.get(key, 0.0), actual_values[key]),
+			}
+			for key in ("rows", "boxes", "kilos")
+		}
+
+	empty = {"rows": 0.0, "boxes": 0.0, "kilos": 0.0}
+	overall = compare(
+		{key: sum(totals[key] for totals in full.values()) for key in ("rows", "boxes", "kilos_g")},
+		{key: sum(totals[key] for totals in sample.values()) for key in empty},
+	)
+	seasons = {season: compare(full[season], sample.get(season, empty)) for season in sorted(full)}
+
+	checked = [overall, *seasons.values()]
+	return {
+		"totals": overall,
+		"seasons": {season: {key: values["error"] for key, values in kpis.items()} for season, kpis in seasons.items()},
+		"max_error": max(kpis[key]["error"] for kpis in checked for key in ("rows", "kilos")),
+	}
+
+
+def create_sample(
+	lf: pl.LazyFrame,
+	name: str,
+	max_error: float = DEFAULT_MAX_ERROR,
+	profile: str = "dashboard"
+) -> Dict[str, Any]:
+	"""
+	Generar, verificar y publicar una muestra.
+
+	Args:
+		lf: Dataset completo (lazy)
+		name: Nombre de la muestra (ver SAMPLE_FRACTIONS)
+		max_error: Error relativo máximo de filas y kilos ponderados
+		profile: Perfil de escritura
+
+	Returns:
+		Métricas de la muestra (las mismas que se guardan en JSON)
+	"""
+	fraction = SAMPLE_FRACTIONS[name]
+	df = stratified_sample(lf, fraction).collect()
+	errors = sample_errors(season_totals(lf), weighted_season_totals(df))
+
+	output_path = sample_path(name)
+	stats = {
+		"sample": name,
+		"fraction": fraction,
+		"output_path": output_path.relative_to(PROJECT_ROOT).as_posix(),
+		"row_count": df.height,
+		"max_error_allowed": max_error,
+		**errors,
+	}
+
+	print(f"\nMuestra {name} ({fraction:.0%}): {df.height:,} filas")
+	for key, values in errors["totals"].items():
+		print(f"  {key:<6} real {values['actual']:>20,.0f}  estimado {values['estimate']:>20,.0f}  error {values['error']:.3%}")
+	print(f"  Mayor error (filas/kilos, total y por season): {errors['max_error']:.3%}")
+
+	if errors["max_error"] > max_error:
+		raise RuntimeError(
+			f"La muestra {name} supera el error máximo ({errors['max_error']:.3%} > {max_error:.3%}); no se publica."
+		)
+
+	publish_dataframe(df, output_path.stem, output_path, profile)
+	with open(metrics_path(name), 'w', encoding='utf-8') as f:
+		json.dump(stats, f, indent=2, ensure_ascii=False)
+	print(f"✓ Métricas guardadas en {metrics_path(name)}")
+	return stats
+
+
+def parse_args() -> argparse.Namespace:
+	parser = argparse.ArgumentParser(description="Generar muestras estratificadas y ponderadas del dataset del dashboard.")
+	parser.add_argument(
+		"--samples",
+		type=str,
+		default=",".join(SAMPLE_FRACTIONS),
+		help=f"Muestras a generar separadas por coma (default: {','.join(SAMPLE_FRACTIONS)})",
+	)
+	parser.add_argument(
+		"--max-error",
+		type=float,
+		default=DEFAULT_MAX_ERROR,
+		help=f"Error relativo máximo de filas y kilos ponderados (default: {DEFAULT_MAX_ERROR})",
+	)
+	parser.add_argument(
+		"--profile",
+		choices=list(PROFILES),
+		default="dashboard",
+		help="Perfil de escritura Parquet (default: dashboard)",
+	)
+	return parser.parse_args()
+
+
+def main():
+	"""Función principal del muestreo."""
+	from dataset_registry import scan_dataset
+
+	args = parse_args()
+	names: List[str] = [name.strip() for name in args.samples.split(",") if name.strip()]
+	unknown = set(names) - set(SAMPLE_FRACTIONS)
+	if unknown:
+		print(f"Error: muestras desconocidas: {sorted(unknown)} (disponibles: {list(SAMPLE_FRACTIONS)})")
+		raise SystemExit(2)
+
+	lf = scan_dataset("dashboard_ready")
+	failed = []
+	for name in names:
+		# Una muestra que no pasa el control de error no detiene las demás
+		try:
+			create_sample(lf, name, args.max_error, args.profile)
+		except RuntimeError as e:
+			print(f"  ⚠️  {e}")
+			failed.append(name)
+
+	if failed:
+		print(f"\n✗ Muestras no publicadas: {', '.join(failed)} ({len(names) - len(failed)} de {len(names)} publicadas)")
+		sys.exit(1)
+	print("\n✓ Muestreo completado.")
+
+
+if __name__ == "__main__":
+	main()
@@ -0,0 +1,412 @@
+"""
+Publicación de datasets como snapshots inmutables.
+
+Cada publicación escribe el dataset en data/snapshots/<dataset>/<snapshot_id>/
+y luego reemplaza atómicamente data/snapshots/manifest.json (os.replace), que
+indica el snapshot vigente de cada dataset. Los lectores (analysis/loader.py)
+resuelven el archivo a través del manifest, por lo que nunca ven un archivo a
+medio escribir y pueden consultar versiones anteriores por id.
+
+La ruta histórica (p. ej. data/exports_10_years.parquet) se actualiza también
+de forma atómica, como hard link al archivo del snapshot, para los lectores
+que aún no usan el manifest.
+
+Un snapshot puede tener varios archivos que se publican juntos (p. ej. el par
+caliente/frío de column_split.py): su entrada lista todos en "files" y el
+manifest cambia al par completo en un solo reemplazo.
+
+Uso:
+	python scripts/snapshots.py list
+	python scripts/snapshots.py gc --keep 3 --min-age-hours 24
+"""
+
+import argparse
+import json
+import os
+import shutil
+import time
+import uuid
+import polars as pl
+import pyarrow.parquet as pq
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+from parquet_profiles import write_parquet_profile
+
+try:
+	import fcntl
+except ImportError:  # Windows
+	fcntl = None
+	import msvcrt
+
+
+PROJECT_ROOT = Path(__file__).parent.parent
+SNAPSHOTS_DIR = PROJECT_ROOT / "data" / "snapshots"
+MANIFEST_PATH = SNAPSHOTS_DIR / "manifest.json"
+LOCK_PATH = SNAPSHOTS_DIR / ".lock"
+
+# Política de retención por defecto (aplicada tras cada publicación)
+DEFAULT_KEEP = 3
+DEFAULT_MIN_AGE_HOURS = 1.0
+
+
+def try_lock(fd: int) -> bool:
+	"""Intentar tomar el lock del sistema operativo sobre fd sin bloquear."""
+	try:
+		if fcntl is not None:
+			fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+		else:
+			msvcrt.locking(fd, msvcrt.LK_NBLCK, 1)
+		return True
+	except OSError:
+		return False
+
+
+def unlock(fd: int) -> None:
+	"""Liberar el lock tomado con try_lock()."""
+	if fcntl is not None:
+		fcntl.flock(fd, fcntl.LOCK_UN)
+	else:
+		os.lseek(fd, 0, os.SEEK_SET)
+		msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
+
+
+@contextmanager
+def file_lock(lock_path: Path, timeout: float = 60.0):
+	"""
+	Lock exclusivo del sistema operativo sobre un archivo de lock.
+
+	El lock (flock, o msvcrt.locking en Windows) es del proceso: si el
+	proceso muere, el sistema lo libera y el siguiente no queda bloqueado.
+	El archivo de lock se conserva (borrarlo permitiría que dos procesos
+	tomen locks sobre archivos distintos).
+
+	Args:
+		lock_path: Archivo de lock (se crea si no existe)
+		timeout: Segundos máximos de espera por el lock
+	"""
+	lock_path.parent.mkdir(parents=True, exist_ok=True)
+	fd = os.open(lock_path, os.O_CREAT | os.O_RDWR, 0o644)
+	try:
+		deadline = time.monotonic() + timeout
+		while not try_lock(fd):
+			if time.monotonic() > deadline:
+				raise TimeoutError(f"No se pudo obtener el lock {lock_path}")
+			time.sleep(0.1)
+		try:
+			yield
+		finally:
+			unlock(fd)
+	finally:
+		os.close(fd)
+
+
+def manifest_lock(timeout: float = 60.0):
+	"""
+	Serializar publicadores concurrentes (ver file_lock).
+
+	Los lectores no toman el lock: solo leen el manifest, que se reemplaza
+	de forma atómica.
+
+	Args:
+		timeout: Segundos máximos de espera por el lock
+	"""
+	return file_lock(LOCK_PATH, timeout)
+
+
+def read_manifest() -> Dict[str, Any]:
+	"""
+	Leer el manifest de snapshots.
+
+	Returns:
+		Dict con la clave "datasets" (vacío si aún no hay manifest)
+	"""
+	if not MANIFEST_PATH.exists():
+		return {"datasets": {}}
+	with open(MANIFEST_PATH, 'r', encoding='utf-8') as f:
+		return json.load(f)
+
+
+def write_manifest(manifest: Dict[str, Any]) -> None:
+	"""
+	Escribir el manifest de forma atómica (archivo temporal + os.replace).
+
+	Args:
+		manifest: Contenido completo del manifest
+	"""
+	tmp_path = MANIFEST_PATH.with_suffix(f".{uuid.uuid4().hex}.tmp")
+	with open(tmp_path, 'w', encoding='utf-8') as f:
+		json.dump(manifest, f, indent=2, ensure_ascii=False)
+		f.flush()
+		os.fsync(f.fileno())
+	os.replace(tmp_path, MANIFEST_PATH)
+
+
+def new_snapshot_id() -> str:
+	"""Generar un id de snapshot ordenable por fecha (UTC) y único."""
+	return datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ") + "-" + uuid.uuid4().hex[:6]
+
+
+def replace_legacy_path(snapshot_file: Path, legacy_path: Path) -> None:
+	"""
+	Apuntar la ruta histórica al archivo del snapshot de forma atómica.
+
+	Usa un hard link (sin copiar datos); si el sistema de archivos no lo
+	soporta, copia a un temporal. En ambos casos el reemplazo final es un
+	os.replace, así que los lectores ven el archivo anterior o el nuevo.
+
+	Args:
+		snapshot_file: Archivo Parquet dentro del snapshot
+		legacy_path: Ruta histórica (p. ej. data/exports_10_years.parquet)
+	"""
+	tmp_path = legacy_path.with_name(f".{legacy_path.name}.{uuid.uuid4().hex}.tmp")
+	try:
+		os.link(snapshot_file, tmp_path)
+	except OSError:
+		shutil.copy2(snapshot_file, tmp_path)
+	os.replace(tmp_path, legacy_path)
+
+
+def publish_dataframe(
+	df: pl.DataFrame,
+	dataset: str,
+	legacy_path: Optional[Path] = None,
+	profile: str = "default",
+	row_group_size: Optional[int] = None
+) -> Dict[str, Any]:
+	"""
+	Publicar un DataFrame como nuevo snapshot inmutable del dataset.
+
+	Args:
+		df: DataFrame a publicar
+		dataset: Nombre lógico del dataset (p. ej. "exports_10_years")
+		legacy_path: Ruta histórica a actualizar atómicamente (opcional)
+		profile: Perfil de escritura (ver parquet_profiles.PROFILES)
+		row_group_size: Filas por row group (None = el del perfil)
+
+	Returns:
+		Entrada del manifest del snapshot publicado
+	"""
+	return publish_file(
+		lambda path: write_parquet_profile(df, path, profile, row_group_size),
+		dataset,
+		legacy_path
+	)
+
+
+def publish_file(
+	write: Callable[[Path], Any],
+	dataset: str,
+	legacy_path: Optional[Path] = None
+) -> Dict[str, Any]:
+	"""
+	Publicar como snapshot el Parquet que escribe `write` (p. ej. por lotes).
+
+	Args:
+		write: Función que escribe el Parquet completo en el path recibido
+		dataset: Nombre lógico del dataset (p. ej. "exports_10_years")
+		legacy_path: Ruta histórica a actualizar atómicamente (opcional)
+
+	Returns:
+		Entrada del manifest del snapshot publicado
+	"""
+	name = f"{dataset}.parquet"
+	return publish_files({name: write}, dataset, {name: legacy_path} if legacy_path is not None else None)
+
+
+def publish_files(
+	writes: Dict[str, Callable[[Path], Any]],
+	dataset: str,
+	legacy_paths: Optional[Dict[str, Path]] = None
+) -> Dict[str, Any]:
+	"""
+	Publicar varios Parquets como un único snapshot (visibles todos a la vez).
+
+	Args:
+		writes: Nombre de archivo -> función que lo escribe en el path recibido
+		dataset: Nombre lógico del dataset
+		legacy_paths: Nombre de archivo -> ruta histórica a actualizar (opcional)
+
+	Returns:
+		Entrada del manifest del snapshot publicado ("file" es el primer
+		archivo; con más de uno, "files" los lista por nombre)
+	"""
+	snapshot_id = new_snapshot_id()
+	snapshot_dir = SNAPSHOTS_DIR / dataset / snapshot_id
+	snapshot_dir.mkdir(parents=True, exist_ok=False)
+
+	# El snapshot se escribe completo antes de ser visible en el manifest
+	files = {}
+	for name, write in writes.items():
+		files[name] = snapshot_dir / name
+		write(files[name])
+
+	snapshot_file = next(iter(files.values()))
+	entry = {
+		"id": snapshot_id,
+		"file": snapshot_file.relative_to(PROJECT_ROOT).as_posix(),
+		"created_at": datetime.now(timezone.utc).isoformat(),
+		"rows": pq.read_metadata(snapshot_file).num_rows,
+		"size_bytes": sum(path.stat().st_size for path in files.values()),
+	}
+	if len(files) > 1:
+		entry["files"] = {name: path.relative_to(PROJECT_ROOT).as_posix() for name, path in files.items()}
+
+	with manifest_lock():
+		manifest = read_manifest()
+		info = manifest["datasets"].setdefault(dataset, {"current": None, "snapshots": []})
+		info["snapshots"].append(entry)
+		info["current"] = snapshot_id
+		write_manifest(manifest)
+
+		for name, legacy_path in (legacy_paths or {}).items():
+			replace_legacy_path(files[name], legacy_path)
+
+	print(f"✓ Snapshot publicado: {dataset}@{snapshot_id}")
+
+	gc_snapshots(dataset)
+	return entry
+
+
+def unpublish(dataset: str, legacy_path: Optional[Path] = None) -> List[str]:
+	"""
+	Retirar un dataset publicado (p. ej. al pasar a virtual).
+
+	El manifest deja al dataset sin snapshot vigente, se borra la ruta
+	histórica y se eliminan sus snapshots sin esperar la retención: quien
+	retira el dataset quiere liberar su copia. Una nueva publicación vuelve
+	a fijar el vigente.
+
+	Args:
+		dataset: Nombre lógico del dataset
+		legacy_path: Ruta histórica a borrar (opcional)
+
+	Returns:
+		Lista de "dataset@id" eliminados
+	"""
+	with manifest_lock():
+		manifest = read_manifest()
+		info = manifest["datasets"].get(dataset)
+		if info is not None and info["current"] is not None:
+			info["current"] = None
+			write_manifest(manifest)
+		if legacy_path is not None:
+			legacy_path.unlink(missing_ok=True)
+
+	return gc_snapshots(dataset, keep=0, min_age_hours=0)
+
+
+def gc_snapshots(
+	dataset: Optional[str] = None,
+	keep: int = DEFAULT_KEEP,
+	min_age_hours: float = DEFAULT_MIN_AGE_HOURS
+) -> List[str]:
+	"""
+	Eliminar snapshots antiguos según la política de retención.
+
+	Nunca elimina el snapshot vigente, los `keep` más recientes ni los creados
+	hace menos de `min_age_hours` (lectores que aún puedan tenerlos fijados).
+
+	Args:
+		dataset: Dataset a limpiar (None = todos)
+		keep: Número de snapshots recientes a conservar (0 = solo el vigente)
+		min_age_hours: Edad mínima para poder eliminar un snapshot
+
+	Returns:
+		Lista de "dataset@id" eliminados
+	"""
+	removed = []
+	cutoff = datetime.now(timezone.utc) - timedelta(hours=min_age_hours)
+
+	with manifest_lock():
+		manifest = read_manifest()
+		names = [dataset] if dataset else list(manifest["datasets"])
+
+		for name in names:
+			info = manifest["datasets"].get(name)
+			if info is None:
+				continue
+
+			snapshots = sorted(info["snapshots"], key=lambda s: s["id"])
+			recent = snapshots[-keep:] if keep > 0 else []
+			protected = {s["id"] for s in recent} | {info["current"]}
+
+			remaining = []
+			for snap in snapshots:
+				created_at = datetime.fromisoformat(snap["created_at"])
+				if snap["id"] in protected or created_at > cutoff:
+					remaining.append(snap)
+				else:
+					removed.append((name, snap))
+
+			info["snapshots"] = remaining
+
+		# Primero se quitan las entradas del manifest, luego se borran los archivos
+		write_manifest(manifest)
+		for name, snap in removed:
+			shutil.rmtree((PROJECT_ROOT / snap["file"]).parent, ignore_errors=True)
+
+	removed = [f"{name}@{snap['id']}" for name, snap in removed]
+
+	for item in removed:
+		print(f"  Snapshot eliminado: {item}")
+
+	return removed
+
+
+def print_snapshots() -> None:
+	"""Imprimir los snapshots registrados en el manifest."""
+	manifest = read_manifest()
+	if not manifest["datasets"]:
+		print("No hay snapshots publicados.")
+		return
+
+	for name, info in manifest["datasets"].items():
+		print(f"\n{name}")
+		for snap in info["snapshots"]:
+			marker = "*" if snap["id"] == info["current"] else " "
+			print(f"  {marker} {snap['id']}  {snap['rows']:>12,} filas  "
+				f"{snap['size_bytes'] / (1024*1024):>8.2f} MB  {snap['created_at']}")
+
+
+def non_negative_int(value: str) -> int:
+	"""Tipo de argparse: entero >= 0."""
+	number = int(value)
+	if number < 0:
+		raise argparse.ArgumentTypeError(f"debe ser >= 0: {value}")
+	return number
+
+
+def parse_args() -> argparse.Namespace:
+	parser = argparse.ArgumentParser(description="Administrar snapshots de datasets.")
+	subparsers = parser.add_subparsers(dest="command", required=True)
+
+	subparsers.add_parser("list", help="Listar snapshots (* = vigente)")
+
+	gc_parser = subparsers.add_parser("gc", help="Eliminar snapshots antiguos")
+	gc_parser.add_argument("--dataset", type=str, default=None, help="Dataset a limpiar (default: todos)")
+	gc_parser.add_argument("--keep", type=non_negative_int, default=DEFAULT_KEEP, help=f"Snapshots a conservar; 0 = solo el vigente (default: {DEFAULT_KEEP})")
+	gc_parser.add_argument(
+		"--min-age-hours",
+		type=float,
+		default=DEFAULT_MIN_AGE_HOURS,
+		help=f"Edad mínima para eliminar (default: {DEFAULT_MIN_AGE_HOURS})",
+	)
+	return parser.parse_args()
+
+
+def main():
+	"""Función principal: listar o limpiar snapshots."""
+	args = parse_args()
+
+	if args.command == "list":
+		print_snapshots()
+	elif args.command == "gc":
+		removed = gc_snapshots(args.dataset, args.keep, args.min_age_hours)
+		print(f"\n✓ {len(removed)} snapshots eliminados.")
+
+
+if __name__ == "__main__":
+	main()
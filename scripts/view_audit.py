@@ -6,12 +6,17 @@ Uso:
     python scripts/view_audit.py --head 20
     python scripts/view_audit.py --summary
     python scripts/view_audit.py --warnings
+    python scripts/view_audit.py --rows datos_semana_1042.csv
+    python scripts/view_audit.py --locate 1042:17
 """
 
 import polars as pl
 import argparse
 from pathlib import Path
 
+from combine import extract_week_number
+from provenance import ROW_COLUMN, SOURCE_COLUMN, locate_raw
+
 
 def view_audit_table(limit: int = None, summary: bool = False, warnings_only: bool = False):
 	"""
@@ -103,6 +108,65 @@ def view_audit_table(limit: int = None, summary: bool = False, warnings_only: bo
 	print("\n" + "="*80)
 
 
+def view_raw_rows(file_name: str, limit: int = 20):
+	"""
+	Filas de un archivo auditado con boxes o kilos nulos, junto a su registro original.
+
+	Los nulos son valores del CSV que no se pudieron convertir: la causa
+	habitual de un delta en la auditoría. Cada registro se lee directamente
+	del CSV con el índice de procedencia (normalize.py --provenance).
+
+	Args:
+		file_name: CSV del reporte (p. ej. datos_semana_1042.csv)
+		limit: Máximo de filas a mostrar
+	"""
+	parquet_path = Path(__file__).parent.parent / "data_clean" / f"{Path(file_name).stem}.parquet"
+	if not parquet_path.exists():
+		print(f"Error: No se encontró el archivo {parquet_path}")
+		return
+	
+	df = pl.read_parquet(parquet_path)
+	if ROW_COLUMN not in df.columns:
+		print(f"Error: {parquet_path.name} no tiene {ROW_COLUMN}. Ejecuta: python scripts/normalize.py --provenance")
+		return
+	
+	suspects = df.filter(pl.col("boxes").is_null() | pl.col("net_weight_kg").is_null())
+	print("="*80)
+	print(f"FILAS CON BOXES O KILOS NULOS: {file_name} ({len(suspects)} de {len(df)})")
+	print("="*80)
+	
+	source_week = extract_week_number(parquet_path.name)
+	for row in suspects.head(limit).iter_rows(named=True):
+		try:
+			raw = locate_raw({SOURCE_COLUMN: source_week, ROW_COLUMN: row[ROW_COLUMN]})
+		except (ValueError, FileNotFoundError, IndexError, RuntimeError) as e:
+			print(f"  ✗ registro {row[ROW_COLUMN]}: {e}")
+			continue
+		print(f"\n  registro {raw[ROW_COLUMN]} (byte {raw['offset']:,}): boxes={row['boxes']} kilos={row['net_weight_kg']}")
+		print(f"    {raw['line']}")
+	
+	if len(suspects) > limit:
+		print(f"\n  ... {len(suspects) - limit} filas más (usar --head)")
+	print("\n" + "="*80)
+
+
+def view_raw_record(value: str):
+	"""
+	Registro original de una fila del pipeline.
+
+	Args:
+		value: source_week:source_row (p. ej. de un outlier del dataset maestro)
+	"""
+	source_week, _, source_row = value.partition(":")
+	try:
+		raw = locate_raw({SOURCE_COLUMN: int(source_week), ROW_COLUMN: int(source_row)})
+	except (ValueError, FileNotFoundError, IndexError, RuntimeError) as e:
+		print(f"Error: {e}")
+		return
+	print(f"{raw['file']} registro {raw[ROW_COLUMN]} (byte {raw['offset']:,}):")
+	print(f"  {raw['line']}")
+
+
 def main():
 	"""Función principal."""
 	parser = argparse.ArgumentParser(
@@ -114,6 +178,8 @@ Ejemplos:
   python scripts/view_audit.py --head 20    # Mostrar primeras 20 filas
   python scripts/view_audit.py --summary    # Mostrar solo resumen
   python scripts/view_audit.py --warnings   # Mostrar solo archivos con WARNING
+  python scripts/view_audit.py --rows datos_semana_1042.csv   # Filas con nulos y su línea del CSV
+  python scripts/view_audit.py --locate 1042:17               # Línea del CSV de source_week:source_row
 		"""
 	)
 	
@@ -135,8 +201,28 @@ Ejemplos:
 		help="Mostrar solo archivos con WARNING"
 	)
 	
+	parser.add_argument(
+		"--rows",
+		type=str,
+		help="Archivo del reporte: mostrar sus filas con boxes o kilos nulos y su registro original"
+	)
+	
+	parser.add_argument(
+		"--locate",
+		type=str,
+		help="Mostrar el registro original de source_week:source_row"
+	)
+	
 	args = parser.parse_args()
 	
+	if args.locate:
+		view_raw_record(args.locate)
+		return
+	
+	if args.rows:
+		view_raw_rows(args.rows, args.head or 20)
+		return
+	
 	view_audit_table(
 		limit=args.head,
 		summary=args.summary,